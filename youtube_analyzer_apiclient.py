@@ -0,0 +1,100 @@
+"""
+YOUTUBE ANALYZER PRO - API CLIENT POOL
+- Discovery document loaded once per process: the copy bundled with
+  google-api-python-client, else a local JSON file (fetched once and kept)
+- Clients built from that document, never through build(), so a new analyzer
+  (e.g. after Save API Key) costs microseconds instead of a discovery round
+- One client per thread, each on its own keep-alive httplib2 transport
+  (a googleapiclient client shares one connection and is not thread-safe)
+- Collections (videos(), channels(), ...) built once per thread client:
+  googleapiclient rebuilds every method of a collection on each call (~2 ms)
+- ClientPool stands in for a client: pool.videos().list(...) works from any thread
+"""
+
+import json
+import os
+import threading
+import weakref
+from typing import Dict, Optional
+
+import requests
+
+# Optional: YouTube API
+try:
+    from googleapiclient.discovery import build_from_document
+    from googleapiclient.discovery_cache import get_static_doc
+    from googleapiclient.http import build_http
+    API_AVAILABLE = True
+except ImportError:
+    API_AVAILABLE = False
+
+DISCOVERY_FILE = "youtube.v3.discovery.json"
+DISCOVERY_URL = "https://www.googleapis.com/discovery/v1/apis/youtube/v3/rest"
+
+_document: Optional[Dict] = None
+_document_lock = threading.Lock()
+
+
+def discovery_document(path: str = DISCOVERY_FILE) -> Dict:
+    """The parsed YouTube v3 discovery document, loaded at most once per process."""
+    global _document
+    with _document_lock:
+        if _document is None:
+            text = get_static_doc('youtube', 'v3')
+            if text is None and os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    text = f.read()
+            if text is None:
+                # Client library without bundled documents: fetch once, keep a local copy
+                res = requests.get(DISCOVERY_URL, timeout=30)
+                res.raise_for_status()
+                text = res.text
+                tmp = path + '.tmp'
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                os.replace(tmp, path)
+            _document = json.loads(text)
+        return _document
+
+
+class ClientPool:
+    def __init__(self, api_key: str, client_options: Optional[Dict] = None):
+        """client_options: passed to every client (e.g. {'api_endpoint': ...} for a local fake API)."""
+        if not API_AVAILABLE:
+            raise RuntimeError("google-api-python-client is not installed")
+        self.api_key = api_key
+        self.client_options = client_options
+        self._collections = set(discovery_document().get('resources', {}))  # loaded here, not in a worker
+        self._local = threading.local()
+        self._transports = weakref.WeakSet()  # for close(); dead threads' transports just go away
+
+    def client(self):
+        """This thread's client (built on first use)."""
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            http = build_http()
+            client = self._local.client = build_from_document(
+                discovery_document(), developerKey=self.api_key, http=http, client_options=self.client_options)
+            self._local.resources = {}
+            self._transports.add(http)
+        return client
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name not in self._collections:
+            return getattr(self.client(), name)
+        client = self.client()
+        resources = self._local.resources
+
+        def collection():
+            res = resources.get(name)
+            if res is None:
+                res = resources[name] = getattr(client, name)()
+            return res
+        return collection
+
+    def close(self):
+        """Drop every thread's keep-alive connections."""
+        for http in list(self._transports):
+            http.close()
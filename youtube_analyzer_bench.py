@@ -0,0 +1,395 @@
+"""
+YOUTUBE ANALYZER PRO - OFFLINE BENCHMARK
+- Local fake YouTube Data API v3 and ReturnYouTubeDislike servers
+- Injected fake `yt_dlp` module (also installed in the yt-dlp pool's workers)
+- Configurable latency, error rate and 429 bursts for every fake
+- Optional local dummy forward proxies, each with its own upstream rate limit
+- Runs analyze_urls (GUI editions), analyze_bulk_from_file + exports (interactive)
+- Reports throughput, per-video latency percentiles and peak RSS
+- No network access needed; every scenario runs in a fresh process
+
+Usage:
+  python youtube_analyzer_bench.py --sizes 100,10000,100000 --backend api
+  python youtube_analyzer_bench.py --backend ytdlp --latency-ms 20 --error-rate 0.02 --burst-every 500 --burst-len 20
+"""
+
+import argparse
+import contextlib
+import hashlib
+import http.client
+import json
+import logging
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TARGETS = {
+    'gui': ('youtube_analyzer_gui', 'analyze_urls'),
+    'gui2': ('youtube_analyzer_gui2', 'analyze_urls'),
+    'interactive': ('youtube_analyzer_interactive', 'analyze_bulk_from_file'),
+}
+
+
+# ========================================
+#           FAULT MODEL
+# ========================================
+class FaultModel:
+    """Decides per request: sleep, then 'ok', 'error' or '429'."""
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0,
+                 burst_every: int = 0, burst_len: int = 0, seed: int = 1):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.burst_every = burst_every
+        self.burst_len = burst_len
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def next(self) -> str:
+        with self._lock:
+            n = self.calls
+            self.calls += 1
+            roll = self.rng.random()
+            delay = self.latency + self.rng.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+        if self.burst_every and n % self.burst_every >= self.burst_every - self.burst_len:
+            return '429'
+        if roll < self.error_rate:
+            return 'error'
+        return 'ok'
+
+
+def fake_video(video_id: str) -> Dict:
+    """Deterministic fake stats for a video id."""
+    h = int(hashlib.md5(video_id.encode()).hexdigest(), 16)
+    views = h % 50_000_000
+    return {
+        'id': video_id,
+        'title': f"Benchmark video {video_id} #bench #tag{h % 50}",
+        'description': ("Lorem ipsum dolor sit amet #bench " * (1 + h % 40)).strip(),
+        'published': f"20{15 + h % 10}-{1 + h % 12:02d}-{1 + h % 28:02d}",
+        'duration': 30 + h % 3600,
+        'views': views,
+        'likes': views // (20 + h % 80),
+        'comments': views // (200 + h % 800),
+        'dislikes': views // (500 + h % 1000),
+        'category': ['10', '17', '20', '24', '25', '27', '28'][h % 7],
+        'channel': f"UC{h % 100000:022d}",
+    }
+
+
+def api_item(video_id: str, parts: List[str]) -> Dict:
+    v = fake_video(video_id)
+    item = {'id': video_id}
+    if 'snippet' in parts:
+        item['snippet'] = {
+            'title': v['title'], 'description': v['description'],
+            'publishedAt': v['published'] + 'T12:00:00Z', 'channelTitle': 'Bench Channel',
+            'channelId': v['channel'], 'categoryId': v['category'], 'defaultLanguage': 'en',
+        }
+    if 'contentDetails' in parts:
+        d = v['duration']
+        item['contentDetails'] = {'duration': f"PT{d // 3600}H{d % 3600 // 60}M{d % 60}S"}
+    if 'statistics' in parts:
+        item['statistics'] = {'viewCount': str(v['views']), 'likeCount': str(v['likes']),
+                              'commentCount': str(v['comments'])}
+    return item
+
+
+# ========================================
+#           FAKE SERVERS
+# ========================================
+def start_fake_servers(api_fault: FaultModel, ryd_fault: FaultModel) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive, like the real endpoints
+        disable_nagle_algorithm = True  # headers and body go out separately; avoid delayed-ACK stalls
+
+        def _send(self, status: int, body: Dict, headers: Dict = None):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            q = parse_qs(url.query)
+            if url.path.startswith('/youtube/v3/videos'):
+                outcome = api_fault.next()
+                if outcome == '429':
+                    return self._send(429, {'error': {'code': 429, 'message': 'rateLimitExceeded'}}, {'Retry-After': '1'})
+                if outcome == 'error':
+                    return self._send(503, {'error': {'code': 503, 'message': 'backendError'}})
+                parts = q.get('part', ['id'])[0].split(',')
+                ids = [i for i in q.get('id', [''])[0].split(',') if i]
+                return self._send(200, {'kind': 'youtube#videoListResponse',
+                                        'items': [api_item(i, parts) for i in ids]})
+            if url.path.startswith('/votes'):
+                outcome = ryd_fault.next()
+                if outcome != 'ok':
+                    return self._send(429 if outcome == '429' else 500, {})
+                vid = q.get('videoId', [''])[0]
+                return self._send(200, {'id': vid, 'dislikes': fake_video(vid)['dislikes']})
+            self._send(404, {})
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_dummy_proxy(limit_rps: float) -> ThreadingHTTPServer:
+    """Plain-HTTP forward proxy that answers 429 above limit_rps (0 = unlimited)."""
+    lock = threading.Lock()
+    bucket = {'tokens': max(limit_rps, 1), 'ts': time.monotonic()}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+        upstream = None
+
+        def _allowed(self) -> bool:
+            if not limit_rps:
+                return True
+            with lock:
+                now = time.monotonic()
+                bucket['tokens'] = min(limit_rps, bucket['tokens'] + (now - bucket['ts']) * limit_rps)
+                bucket['ts'] = now
+                if bucket['tokens'] < 1:
+                    return False
+                bucket['tokens'] -= 1
+                return True
+
+        def do_GET(self):
+            if not self._allowed():
+                self.send_response(429)
+                self.send_header('Retry-After', '1')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            url = urlparse(self.path)
+            if self.upstream is None:  # one keep-alive upstream connection per client connection
+                self.upstream = http.client.HTTPConnection(url.netloc, timeout=30)
+            self.upstream.request('GET', url.path + ('?' + url.query if url.query else ''))
+            resp = self.upstream.getresponse()
+            body = resp.read()
+            self.send_response(resp.status)
+            self.send_header('Content-Type', resp.getheader('Content-Type', 'application/json'))
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ========================================
+#           FAKE yt_dlp MODULE
+# ========================================
+def make_fake_ytdlp(fault: FaultModel) -> types.ModuleType:
+    mod = types.ModuleType('yt_dlp')
+    utils = types.ModuleType('yt_dlp.utils')
+
+    class DownloadError(Exception):
+        pass
+
+    class YoutubeDL:
+        def __init__(self, params=None):
+            self.params = params or {}
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def extract_info(self, url, download=False):
+            outcome = fault.next()
+            if outcome == '429':
+                raise DownloadError('ERROR: Unable to download webpage: HTTP Error 429: Too Many Requests')
+            if outcome == 'error':
+                raise DownloadError('ERROR: [youtube] Unable to extract video data')
+            vid = parse_qs(urlparse(url).query).get('v', [url[-11:]])[0]
+            v = fake_video(vid)
+            return {
+                'id': vid, 'title': v['title'], 'description': v['description'],
+                'upload_date': v['published'].replace('-', ''), 'duration': v['duration'],
+                'view_count': v['views'], 'like_count': v['likes'], 'comment_count': v['comments'],
+                'uploader': 'Bench Channel', 'channel_id': v['channel'], 'categories': ['Music'],
+                'thumbnail': f"https://i.ytimg.com/vi/{vid}/hqdefault.jpg",
+                'url': f"https://rr1---sn-bench.googlevideo.com/videoplayback?id={vid}",
+            }
+
+    utils.DownloadError = DownloadError
+    mod.utils = utils
+    mod.YoutubeDL = YoutubeDL
+    mod.DownloadError = DownloadError
+    return mod
+
+
+def install_fake_ytdlp(fault_kw: Dict, seed: int = 3):
+    """Also used as the yt-dlp pool's worker initializer (workers are spawned, not forked)."""
+    mod = make_fake_ytdlp(FaultModel(**fault_kw, seed=seed + os.getpid()))
+    sys.modules['yt_dlp'] = mod
+    sys.modules['yt_dlp.utils'] = mod.utils
+
+
+# ========================================
+#           ONE SCENARIO (child process)
+# ========================================
+def run_one(cfg: Dict) -> Dict:
+    fault_kw = {k: cfg[k] for k in ('latency_ms', 'jitter_ms', 'error_rate', 'burst_every', 'burst_len')}
+    server = start_fake_servers(FaultModel(**fault_kw), FaultModel(**fault_kw, seed=2))
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    install_fake_ytdlp(fault_kw)
+    sys.path.insert(0, HERE)
+    module_name, entry = TARGETS[cfg['target']]
+    mod = __import__(module_name)
+    logging.getLogger('gui').setLevel(logging.CRITICAL)
+    if hasattr(mod, 'REQUEST_DELAY'):
+        mod.REQUEST_DELAY = (0, 0)
+
+    workdir = tempfile.mkdtemp(prefix='ytbench-')
+    os.chdir(workdir)  # snapshots, indexes and summaries stay out of the repo
+    urls = [f"https://www.youtube.com/watch?v={i:011d}" for i in range(cfg['size'])]
+
+    analyzer = mod.YouTubeAnalyzerPro(None)
+    analyzer.rtd_api = f"{base}/votes?videoId="
+    if cfg['proxies']:
+        from youtube_analyzer_proxies import ProxyPool
+        proxies = [start_dummy_proxy(cfg['proxy_limit']) for _ in range(cfg['proxies'])]
+        analyzer.proxies = ProxyPool([f"http://127.0.0.1:{p.server_port} {cfg['proxy_rate']}" for p in proxies])
+    if cfg['backend'] == 'api':
+        from youtube_analyzer_apiclient import ClientPool
+        analyzer.youtube = ClientPool('bench', client_options={'api_endpoint': base + '/'})
+        analyzer.use_api = True
+    else:
+        from youtube_analyzer_ytdlp_pool import YtdlpPool
+        analyzer.use_api = False
+        analyzer.ytdlp_pool = YtdlpPool(initializer=install_fake_ytdlp, initargs=(fault_kw,))
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        t0 = time.perf_counter()
+        if entry == 'analyze_urls':
+            results = analyzer.analyze_urls(urls)
+        else:
+            with open('urls.txt', 'w', encoding='utf-8') as f:
+                f.write('\n'.join(urls))
+            results = analyzer.analyze_bulk_from_file('urls.txt')
+        elapsed = time.perf_counter() - t0
+
+        exports = {}
+        if cfg['target'] == 'interactive':
+            for fmt in cfg['exports']:
+                t1 = time.perf_counter()
+                getattr(analyzer, {'csv': 'export_to_csv', 'xlsx': 'export_to_excel',
+                                   'json': 'export_to_json'}[fmt])(results, f"bench.{fmt}")
+                exports[fmt] = round(time.perf_counter() - t1, 3)
+
+    if analyzer.ytdlp_pool:
+        analyzer.ytdlp_pool.shutdown()
+    stages = analyzer.timer.summary()['stages']
+    video = stages.get('video', {})
+    failed = sum(1 for r in results if not r.get('views'))
+    return {
+        'target': cfg['target'], 'backend': cfg['backend'], 'size': cfg['size'],
+        'seconds': round(elapsed, 3),
+        'urls_per_s': round(len(urls) / elapsed, 1) if elapsed else 0,
+        'p50_ms': video.get('p50_ms'), 'p95_ms': video.get('p95_ms'), 'p99_ms': video.get('p99_ms'),
+        'failed': failed,
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'rss_growth_mb': round((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024, 1),
+        'exports_s': exports,
+        'stages': {k: {m: v[m] for m in ('count', 'p50_ms', 'p95_ms', 'errors')} for k, v in stages.items()},
+        'proxies': analyzer.proxies.stats() if analyzer.proxies.enabled else [],
+    }
+
+
+# ========================================
+#           DRIVER
+# ========================================
+def main():
+    ap = argparse.ArgumentParser(description="Offline throughput benchmark for YouTube Analyzer PRO")
+    ap.add_argument('--sizes', default='100,10000,100000', help="comma-separated URL counts")
+    ap.add_argument('--targets', default='gui2,interactive', help=f"any of: {', '.join(TARGETS)}")
+    ap.add_argument('--backend', choices=['api', 'ytdlp'], default='api')
+    ap.add_argument('--latency-ms', type=float, default=0)
+    ap.add_argument('--jitter-ms', type=float, default=0)
+    ap.add_argument('--error-rate', type=float, default=0)
+    ap.add_argument('--burst-every', type=int, default=0, help="every N requests ...")
+    ap.add_argument('--burst-len', type=int, default=0, help="... the last M of them get HTTP 429")
+    ap.add_argument('--exports', default='csv,json,xlsx', help="interactive exports to time ('' = none)")
+    ap.add_argument('--proxies', type=int, default=0, help="route requests through N local dummy proxies")
+    ap.add_argument('--proxy-limit', type=float, default=20, help="each dummy proxy answers 429 above this req/s")
+    ap.add_argument('--proxy-rate', type=float, default=20, help="client-side rate limit per proxy (req/s)")
+    ap.add_argument('--out', default='bench_results.json')
+    ap.add_argument('--child', help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        print(json.dumps(run_one(json.loads(args.child))))
+        return
+
+    rows = []
+    for target in args.targets.split(','):
+        for size in (int(s) for s in args.sizes.split(',')):
+            cfg = {
+                'target': target, 'backend': args.backend, 'size': size,
+                'latency_ms': args.latency_ms, 'jitter_ms': args.jitter_ms, 'error_rate': args.error_rate,
+                'burst_every': args.burst_every, 'burst_len': args.burst_len,
+                'exports': [e for e in args.exports.split(',') if e],
+                'proxies': args.proxies, 'proxy_limit': args.proxy_limit, 'proxy_rate': args.proxy_rate,
+            }
+            print(f"   {target:<12} {args.backend:<6} {size:>7,} URLs ...", end='', flush=True)
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', json.dumps(cfg)],
+                                  capture_output=True, text=True)
+            if proc.returncode != 0:
+                print(" FAILED")
+                print(proc.stderr[-2000:])
+                continue
+            row = json.loads(proc.stdout.strip().splitlines()[-1])
+            rows.append(row)
+            print(f" {row['seconds']:>8.2f}s  {row['urls_per_s']:>8.1f}/s")
+
+    print("\n" + "=" * 118)
+    print(f"{'Target':<12} {'Backend':<8} {'URLs':>8} {'Time s':>9} {'URL/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'Failed':>7} {'RSS MB':>8}  Exports (s)")
+    print("=" * 118)
+    for r in rows:
+        exports = ' '.join(f"{k}={v}" for k, v in r['exports_s'].items())
+        print(f"{r['target']:<12} {r['backend']:<8} {r['size']:>8,} {r['seconds']:>9.2f} {r['urls_per_s']:>9.1f} "
+              f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['failed']:>7} "
+              f"{r['peak_rss_mb']:>8.1f}  {exports}")
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(rows, f, indent=2)
+    print(f"\n   Results → {args.out}")
+
+
+if __name__ == '__main__':
+    main()
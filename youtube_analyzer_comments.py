@@ -0,0 +1,281 @@
+"""
+YOUTUBE ANALYZER PRO - COMMENT HARVESTER
+- API mode: pages commentThreads.list at 100 threads per page
+- Fallback: yt-dlp comment extraction (capped, it is not streamable)
+- Several videos fetched concurrently within a shared quota budget
+- Streams straight to NDJSON (or Parquet segments) - nothing held in RAM
+- Resumable: checkpoint.json keeps the next page token per video
+- Permanent failures (comments disabled, deleted or private video) are
+  checkpointed as done with their error; only transient ones stay pending
+"""
+
+import json
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Fallback: yt-dlp
+try:
+    import yt_dlp
+    YTDLP_AVAILABLE = True
+except ImportError:
+    YTDLP_AVAILABLE = False
+
+# Optional: Parquet output
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+from youtube_analyzer_apiclient import API_AVAILABLE, ClientPool
+from youtube_analyzer_retry import NOT_FOUND, PRIVATE, classify
+
+
+PAGE_SIZE = 100           # commentThreads.list maximum
+PAGE_COST = 1             # quota units per commentThreads.list call
+PAGES_PER_SEGMENT = 50    # Parquet: pages per file (checkpointed on close)
+YTDLP_MAX_COMMENTS = 5000 # yt-dlp keeps all comments in memory; keep it capped
+PERMANENT = (NOT_FOUND, PRIVATE)  # commentsDisabled is a 403, i.e. PRIVATE
+
+
+class QuotaExhausted(Exception):
+    pass
+
+
+FIELDS = ['video_id', 'comment_id', 'thread_id', 'parent_id', 'author', 'author_channel_id',
+          'text', 'like_count', 'published_at', 'updated_at', 'reply_count']
+
+
+def _api_record(video_id: str, thread_id: str, c: Dict, parent_id: Optional[str], replies: int) -> Dict:
+    sn = c.get('snippet', {})
+    return {
+        'video_id': video_id, 'comment_id': c.get('id'), 'thread_id': thread_id,
+        'parent_id': parent_id, 'author': sn.get('authorDisplayName'),
+        'author_channel_id': (sn.get('authorChannelId') or {}).get('value'),
+        'text': sn.get('textDisplay') or sn.get('textOriginal'),
+        'like_count': int(sn.get('likeCount') or 0),
+        'published_at': sn.get('publishedAt'), 'updated_at': sn.get('updatedAt'),
+        'reply_count': replies,
+    }
+
+
+def _thread_records(video_id: str, item: Dict) -> List[Dict]:
+    top = item['snippet']['topLevelComment']
+    replies = int(item['snippet'].get('totalReplyCount') or 0)
+    out = [_api_record(video_id, item['id'], top, None, replies)]
+    for reply in (item.get('replies') or {}).get('comments', []):
+        out.append(_api_record(video_id, item['id'], reply, item['id'], 0))
+    return out
+
+
+# ========================================
+#           STREAMING WRITERS
+# ========================================
+class NDJSONSink:
+    """Appends one JSON line per comment; resumes by truncating to the checkpointed offset."""
+
+    def __init__(self, path: str, offset: int):
+        self.path = path
+        self.f = open(path, 'a+b')
+        self.f.truncate(offset)
+        self.f.seek(offset)
+
+    def write(self, records: List[Dict]):
+        self.f.write(''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in records).encode('utf-8'))
+
+    def commit(self) -> int:
+        self.f.flush()
+        os.fsync(self.f.fileno())
+        return self.f.tell()
+
+    def close(self):
+        self.f.close()
+
+
+class ParquetSink:
+    """Writes numbered Parquet segments, one row group per page."""
+
+    SCHEMA = None
+
+    def __init__(self, base: str, segment: int):
+        if ParquetSink.SCHEMA is None:
+            ParquetSink.SCHEMA = pa.schema([
+                (f, pa.int64() if f in ('like_count', 'reply_count') else pa.string()) for f in FIELDS
+            ])
+        self.base = base
+        self.segment = segment
+        self.writer = None
+
+    def write(self, records: List[Dict]):
+        if self.writer is None:
+            path = f"{self.base}.{self.segment:05d}.parquet"
+            self.writer = pq.ParquetWriter(path + '.tmp', self.SCHEMA)
+            self._path = path
+        self.writer.write_table(pa.Table.from_pylist(records, schema=self.SCHEMA))
+
+    def commit(self) -> int:
+        """Close the open segment; returns the next segment number."""
+        if self.writer is not None:
+            self.writer.close()
+            os.replace(self._path + '.tmp', self._path)
+            self.writer = None
+            self.segment += 1
+        return self.segment
+
+    def close(self):
+        # An unclosed segment is discarded; its pages are re-fetched on resume
+        if self.writer is not None:
+            self.writer.close()
+            os.remove(self._path + '.tmp')
+            self.writer = None
+
+
+# ========================================
+#           HARVESTER
+# ========================================
+class CommentHarvester:
+    def __init__(self, api_key: Optional[str] = None, out_dir: str = "comments", fmt: str = 'ndjson',
+                 workers: int = 4, quota_budget: int = 2000, max_comments: Optional[int] = None):
+        if fmt == 'parquet' and not PARQUET_AVAILABLE:
+            raise RuntimeError("Parquet output needs: pip install pyarrow")
+        self.api_key = api_key
+        self.use_api = API_AVAILABLE and bool(api_key)
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self.workers = workers
+        self.quota_budget = quota_budget
+        self.quota_used = 0
+        self.max_comments = max_comments
+        os.makedirs(out_dir, exist_ok=True)
+        self.checkpoint_path = os.path.join(out_dir, "checkpoint.json")
+        self.state: Dict[str, Dict] = {}
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+        self._lock = threading.Lock()
+        self.youtube = ClientPool(api_key) if self.use_api else None  # one client per worker thread
+
+    # ---------------- bookkeeping ----------------
+
+    def _spend(self, units: int) -> bool:
+        with self._lock:
+            if self.quota_used + units > self.quota_budget:
+                return False
+            self.quota_used += units
+            return True
+
+    def _checkpoint(self, video_id: str, **changes):
+        with self._lock:
+            self.state.setdefault(video_id, {}).update(changes)
+            tmp = self.checkpoint_path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f, indent=1)
+            os.replace(tmp, self.checkpoint_path)
+
+    def _sink(self, video_id: str, st: Dict):
+        base = os.path.join(self.out_dir, video_id)
+        if self.fmt == 'parquet':
+            return ParquetSink(base, st.get('segment', 0))
+        return NDJSONSink(base + '.ndjson', st.get('offset', 0))
+
+    # ---------------- sources ----------------
+
+    def _api_pages(self, video_id: str, token: Optional[str]) -> Iterator[Tuple[List[Dict], Optional[str], bool]]:
+        while True:
+            if not self._spend(PAGE_COST):
+                raise QuotaExhausted()
+            res = self.youtube.commentThreads().list(
+                part='snippet,replies', videoId=video_id, maxResults=PAGE_SIZE,
+                pageToken=token or None, textFormat='plainText'
+            ).execute()
+            records = [r for item in res.get('items', []) for r in _thread_records(video_id, item)]
+            token = res.get('nextPageToken')
+            yield records, token, not token
+            if not token:
+                return
+
+    def _ytdlp_pages(self, video_id: str, skip: int) -> Iterator[Tuple[List[Dict], Optional[str], bool]]:
+        cap = min(self.max_comments or YTDLP_MAX_COMMENTS, YTDLP_MAX_COMMENTS)
+        opts = {
+            'quiet': True, 'no_warnings': True, 'skip_download': True, 'getcomments': True,
+            'extractor_args': {'youtube': {'max_comments': [str(cap)], 'comment_sort': ['top']}},
+        }
+        with yt_dlp.YoutubeDL(opts) as ydl:
+            info = ydl.extract_info(f'https://www.youtube.com/watch?v={video_id}', download=False) or {}
+        # No page tokens here: resume by skipping what was already written
+        comments = (info.get('comments') or [])[skip:]
+        if not comments:
+            yield [], None, True
+        for i in range(0, len(comments), PAGE_SIZE):
+            page = [{
+                'video_id': video_id, 'comment_id': c.get('id'),
+                'thread_id': c.get('id') if c.get('parent') in (None, 'root') else c.get('parent'),
+                'parent_id': None if c.get('parent') in (None, 'root') else c.get('parent'),
+                'author': c.get('author'), 'author_channel_id': c.get('author_id'),
+                'text': c.get('text'), 'like_count': int(c.get('like_count') or 0),
+                'published_at': str(c.get('timestamp') or ''), 'updated_at': None, 'reply_count': 0,
+            } for c in comments[i:i + PAGE_SIZE]]
+            yield page, None, i + PAGE_SIZE >= len(comments)
+
+    # ---------------- harvesting ----------------
+
+    def harvest_video(self, video_id: str) -> int:
+        st = dict(self.state.get(video_id, {}))
+        if st.get('done'):
+            return st.get('count', 0)
+        count = st.get('count', 0)
+        committed = (st.get('token'), count)
+        sink = self._sink(video_id, st)
+        pages = 0
+        try:
+            if self.use_api:
+                source = self._api_pages(video_id, st.get('token'))
+            else:
+                source = self._ytdlp_pages(video_id, count)
+            for records, token, last in source:
+                if self.max_comments:
+                    records = records[:max(0, self.max_comments - count)]
+                sink.write(records)
+                count += len(records)
+                pages += 1
+                done = last or bool(self.max_comments and count >= self.max_comments)
+                if self.fmt == 'ndjson':
+                    self._checkpoint(video_id, token=token, count=count, offset=sink.commit(), done=done)
+                elif done or pages % PAGES_PER_SEGMENT == 0:
+                    self._checkpoint(video_id, token=token, count=count, segment=sink.commit(), done=done)
+                    committed = (token, count)
+                if done:
+                    break
+        except QuotaExhausted:
+            if self.fmt == 'parquet':
+                count = committed[1]
+        except Exception as e:
+            cls, _ = classify(e)
+            # Permanent: never retried, so no quota is charged for it on later runs
+            self._checkpoint(video_id, error=f"{cls}: {e}"[:300], done=cls in PERMANENT)
+            if self.fmt == 'parquet':
+                count = committed[1]
+        finally:
+            sink.close()
+        return count
+
+    def harvest(self, video_ids: List[str], progress: Optional[Callable[[str, int], None]] = None) -> Dict[str, int]:
+        """Harvest several videos concurrently; returns comments written per video."""
+        if not self.use_api and not YTDLP_AVAILABLE:
+            raise RuntimeError("Need an API key or yt-dlp to harvest comments")
+        ids = list(dict.fromkeys(v for v in video_ids if v and v != 'N/A'))
+        random.shuffle(ids)  # spread hot videos across workers
+        totals: Dict[str, int] = {}
+
+        def one(vid: str):
+            totals[vid] = self.harvest_video(vid)
+            if progress:
+                progress(vid, totals[vid])
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            list(pool.map(one, ids))
+        return totals
@@ -0,0 +1,96 @@
+"""
+YOUTUBE ANALYZER PRO - RUN CONTROL
+- Cooperative cancel and pause/resume for a running analysis
+- Blocking I/O runs on a shared helper pool; the run thread waits on it and
+  returns within POLL seconds of a cancel, abandoning the call
+- on_cancel() hooks abort what can be aborted (close HTTP connections, kill
+  yt-dlp workers) so abandoned calls do not hold resources
+- Cancelled derives from BaseException so `except Exception` fallbacks in the
+  fetch paths do not swallow it
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait as futures_wait
+from typing import Callable, List
+
+POLL = 0.1          # seconds between cancel checks while waiting on I/O
+IO_THREADS = 32
+
+_io = ThreadPoolExecutor(max_workers=IO_THREADS, thread_name_prefix='run-io')
+
+
+class Cancelled(BaseException):
+    error_class = 'Cancelled'
+
+
+class RunControl:
+    def __init__(self):
+        self._go = threading.Event()       # cleared while paused
+        self._go.set()
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._hooks: List[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._go.is_set() and not self.cancelled
+
+    def pause(self):
+        self._go.clear()
+
+    def resume(self):
+        self._go.set()
+
+    def cancel(self):
+        with self._lock:
+            if self._cancel.is_set():
+                return
+            self._cancel.set()
+            hooks, self._hooks = self._hooks, []
+        self._go.set()  # wake a paused run so it can unwind
+        for hook in hooks:
+            try:
+                hook()
+            except Exception:
+                pass
+
+    def on_cancel(self, hook: Callable[[], None]):
+        """Run hook on cancel (immediately if already cancelled)."""
+        with self._lock:
+            if not self._cancel.is_set():
+                self._hooks.append(hook)
+                return
+        hook()
+
+    def checkpoint(self):
+        """Block while paused; raise Cancelled once cancelled."""
+        self._go.wait()
+        if self._cancel.is_set():
+            raise Cancelled()
+
+    def sleep(self, seconds: float):
+        if self._cancel.wait(seconds):
+            raise Cancelled()
+        self.checkpoint()
+
+    def wait(self, future: Future):
+        """future.result(), but raise Cancelled within POLL seconds of a cancel."""
+        while not futures_wait([future], timeout=POLL).done:
+            if self._cancel.is_set():
+                future.cancel()
+                raise Cancelled()
+        try:
+            return future.result()
+        except Exception:
+            if self._cancel.is_set():
+                raise Cancelled()  # failed because an on_cancel hook aborted it
+            raise
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """Run a blocking call on the helper pool so cancel can abandon it."""
+        self.checkpoint()
+        return self.wait(_io.submit(fn, *args, **kwargs))
@@ -0,0 +1,303 @@
+"""
+YOUTUBE ANALYZER PRO - NEAR-DUPLICATE DETECTION
+- MinHash signatures (NUM_PERM permutations) over word 3-gram shingles of
+  title + description, plus hashtags as tokens
+- LSH index (BANDS bands of ROWS rows) in SQLite: each video only meets the
+  videos sharing a band bucket, never the whole corpus, so adding N videos
+  is ~linear in N
+- Candidates are confirmed on the estimated Jaccard similarity (THRESHOLD);
+  confirmed pairs join clusters (union by size: a video is relabelled at most
+  log2(N) times)
+- Buckets stop growing at MAX_BUCKET members, so channel boilerplate cannot
+  turn one bucket into a quadratic hot spot (a full bucket still matches new
+  videos against the members it has)
+- Incremental and persistent: every add() commits, and videos already
+  indexed are skipped
+- Clusters report the earliest upload as the original and every member's
+  similarity to it (re-uploads, mirrored titles, templated descriptions)
+"""
+
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+NUM_PERM = 128
+BANDS = 32                # 32 bands x 4 rows: pairs above ~0.42 similarity become candidates
+ROWS = NUM_PERM // BANDS
+THRESHOLD = 0.6           # estimated Jaccard similarity that counts as a duplicate
+SHINGLE = 3               # words per shingle
+MAX_TEXT = 2000           # description characters used
+MAX_BUCKET = 50           # members kept per LSH bucket
+BATCH = 512               # rows per signature batch / transaction
+MAX_SHINGLES = 32768      # shingles hashed at once (bounds the NUM_PERM x shingles matrix)
+MEMBER_LIMIT = 200        # members listed per cluster
+CACHE_KB = 65536          # SQLite page cache: bucket inserts land all over the key space
+SEED = 20240601           # fixed: signatures must stay comparable across runs
+
+# Multiply-shift hashing ((a*x + b) mod 2**64) >> 32: a universal family without a modulo
+_rng = np.random.RandomState(SEED)
+PERM_A = _rng.randint(1, 2 ** 63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+PERM_B = _rng.randint(0, 2 ** 63, NUM_PERM, dtype=np.uint64)
+BAND_MIX = _rng.randint(1, 2 ** 63, (BANDS, ROWS), dtype=np.uint64) | np.uint64(1)  # odd multipliers
+
+WORD = re.compile(r'\w+')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id      TEXT PRIMARY KEY,
+    cluster       TEXT NOT NULL,         -- cluster label (a member's video_id)
+    match         TEXT,                  -- most similar video it matched when added
+    similarity    REAL,
+    title         TEXT,
+    channel_title TEXT,
+    upload_date   TEXT,
+    views         INTEGER,
+    sig           BLOB NOT NULL,         -- NUM_PERM x uint32
+    added         REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS videos_cluster ON videos(cluster);
+CREATE TABLE IF NOT EXISTS buckets (
+    key      INTEGER NOT NULL,
+    video_id TEXT NOT NULL,
+    PRIMARY KEY (key, video_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS clusters (     -- clusters of two or more
+    cluster TEXT PRIMARY KEY,
+    size    INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS clusters_size ON clusters(size);
+"""
+
+
+# ========================================
+#           SHINGLES / SIGNATURES
+# ========================================
+def shingles(row: Dict) -> Set[str]:
+    """Word 3-grams of title + description, plus '#tag' tokens."""
+    desc = row.get('description') or ''
+    if desc in ('N/A', 'Failed'):
+        desc = ''
+    words = WORD.findall(f"{row.get('title') or ''} {desc[:MAX_TEXT]}".lower())
+    grams = {' '.join(words[i:i + SHINGLE]) for i in range(max(1, len(words) - SHINGLE + 1))} if words else set()
+    tags = row.get('hashtags')
+    if isinstance(tags, (list, tuple)):
+        grams.update('#' + t.lower().lstrip('#') for t in tags if t)
+    return grams
+
+
+def signatures(sets: List[Set[str]]) -> np.ndarray:
+    """MinHash signatures (len(sets) x NUM_PERM, uint32); every set must be non-empty."""
+    out = np.empty((len(sets), NUM_PERM), dtype=np.uint32)
+    i = 0
+    while i < len(sets):
+        # Take rows until the shingle budget is used (at least one row)
+        j, total = i, 0
+        while j < len(sets) and (j == i or total + len(sets[j]) <= MAX_SHINGLES):
+            total += len(sets[j])
+            j += 1
+        lengths = [len(s) for s in sets[i:j]]
+        x = np.fromiter((zlib.crc32(g.encode('utf-8')) for s in sets[i:j] for g in s),
+                        dtype=np.uint64, count=total)
+        hv = (PERM_A[:, None] * x + PERM_B[:, None]) >> np.uint64(32)  # NUM_PERM x shingles: rows reduce contiguously
+        starts = np.concatenate(([0], np.cumsum(lengths[:-1]))).astype(np.intp)
+        out[i:j] = np.minimum.reduceat(hv, starts, axis=1).T
+        i = j
+    return out
+
+
+def band_keys(sigs: np.ndarray) -> np.ndarray:
+    """One signed 64-bit bucket key per (row, band); collisions only add candidates."""
+    bands = sigs.reshape(len(sigs), BANDS, ROWS).astype(np.uint64)
+    keys = (bands * BAND_MIX).sum(axis=2, dtype=np.uint64) + np.arange(BANDS, dtype=np.uint64)
+    return keys.view(np.int64)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Estimated Jaccard similarity of signature a against each row of b."""
+    return (b == a).mean(axis=-1)
+
+
+# ========================================
+#           DEDUP INDEX
+# ========================================
+class DedupIndex:
+    def __init__(self, path: str = "dedup.db", threshold: float = THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self._local = threading.local()
+        self._db().executescript(SCHEMA)
+
+    def _db(self) -> sqlite3.Connection:
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            db.execute(f'PRAGMA cache_size=-{CACHE_KB}')
+            db.execute("CREATE TEMP TABLE IF NOT EXISTS probe_keys (key INTEGER PRIMARY KEY)")
+            db.execute("CREATE TEMP TABLE IF NOT EXISTS probe_ids (video_id TEXT PRIMARY KEY)")
+        return db
+
+    @contextmanager
+    def _tx(self):
+        db = self._db()
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            yield db
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+
+    # ---------------- indexing ----------------
+
+    def _size(self, db: sqlite3.Connection, cluster: str) -> int:
+        row = db.execute("SELECT size FROM clusters WHERE cluster = ?", (cluster,)).fetchone()
+        return row[0] if row else 1
+
+    def _merge(self, db: sqlite3.Connection, clusters: Set[str]) -> str:
+        """Union by size: relabel the smaller clusters into the largest; returns its label."""
+        sizes = {c: self._size(db, c) for c in clusters}
+        target = max(sizes, key=lambda c: (sizes[c], c))
+        for c in clusters - {target}:
+            db.execute("UPDATE videos SET cluster = ? WHERE cluster = ?", (target, c))
+            db.execute("DELETE FROM clusters WHERE cluster = ?", (c,))
+        db.execute("INSERT OR REPLACE INTO clusters VALUES (?, ?)", (target, sum(sizes.values())))
+        return target
+
+    def _add_batch(self, rows: List[Dict], stats: Dict):
+        with self._tx() as db:
+            ids = [r['video_id'] for r in rows]
+            known = {vid for (vid,) in db.execute(
+                f"SELECT video_id FROM videos WHERE video_id IN ({','.join('?' * len(ids))})", ids)}
+            fresh, sets = [], []
+            for r in rows:
+                if r['video_id'] in known:
+                    stats['known'] += 1
+                    continue
+                s = shingles(r)
+                if not s:
+                    stats['skipped'] += 1
+                    continue
+                known.add(r['video_id'])  # a video twice in one batch
+                fresh.append(r)
+                sets.append(s)
+            if not fresh:
+                return
+            sigs = signatures(sets)
+            keys = band_keys(sigs).tolist()
+            # Every bucket the batch touches, in one indexed join instead of a query per row
+            db.execute("DELETE FROM temp.probe_keys")
+            db.executemany("INSERT OR IGNORE INTO temp.probe_keys VALUES (?)", ((k,) for row in keys for k in row))
+            buckets: Dict[int, List[str]] = {}
+            for key, other in db.execute("SELECT b.key, b.video_id FROM temp.probe_keys p CROSS JOIN buckets b ON b.key = p.key"):
+                buckets.setdefault(key, []).append(other)
+            # ... and the signatures of everything in them
+            db.execute("DELETE FROM temp.probe_ids")
+            db.executemany("INSERT OR IGNORE INTO temp.probe_ids VALUES (?)",
+                           ((v,) for members in buckets.values() for v in members))
+            sig_of = {vid: np.frombuffer(sig, dtype=np.uint32) for vid, sig in db.execute(
+                "SELECT v.video_id, v.sig FROM temp.probe_ids p CROSS JOIN videos v ON v.video_id = p.video_id")}
+            now = time.time()
+            new_buckets = []
+            for r, sig, row_keys in zip(fresh, sigs, keys):
+                vid = r['video_id']
+                candidates = list({other for k in row_keys for other in buckets.get(k, ())})
+                match, best, matched = None, None, []
+                if candidates:
+                    sims = similarity(sig, np.stack([sig_of[c] for c in candidates]))
+                    for other, sim in zip(candidates, sims.tolist()):
+                        if sim >= self.threshold:
+                            matched.append(other)
+                            if best is None or sim > best:
+                                match, best = other, sim
+                cluster = vid
+                if matched:
+                    # Current labels: earlier merges in this batch may have relabelled them
+                    clusters = {c for (c,) in db.execute(
+                        f"SELECT cluster FROM videos WHERE video_id IN ({','.join('?' * len(matched))})", matched)}
+                    cluster = self._merge(db, clusters) if len(clusters) > 1 else clusters.pop()
+                    db.execute("INSERT INTO clusters VALUES (?, 2) ON CONFLICT(cluster) DO UPDATE SET size = size + 1",
+                               (cluster,))
+                    stats['duplicates'] += 1
+                db.execute("INSERT INTO videos VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                           (vid, cluster, match, best, r.get('title'), r.get('channel_title'), r.get('upload_date'),
+                            r.get('views'), sig.tobytes(), now))
+                sig_of[vid] = sig
+                for k in row_keys:
+                    members = buckets.setdefault(k, [])
+                    if len(members) < MAX_BUCKET:
+                        members.append(vid)
+                        new_buckets.append((k, vid))
+                stats['added'] += 1
+            new_buckets.sort()  # key order: B-tree appends instead of random page writes
+            db.executemany("INSERT OR IGNORE INTO buckets VALUES (?, ?)", new_buckets)
+
+    def add(self, rows: Iterable[Dict], progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """Index result rows (failed placeholders and rows without text are skipped).
+
+        Streams: rows are hashed and committed BATCH at a time. Returns counts:
+        added, duplicates (added rows that matched an indexed video), known, skipped.
+        """
+        stats = {'added': 0, 'duplicates': 0, 'known': 0, 'skipped': 0}
+        batch = []
+        for r in rows:
+            if r.get('video_id') in (None, '', 'N/A') or r.get('error'):
+                stats['skipped'] += 1
+                continue
+            batch.append(r)
+            if len(batch) >= BATCH:
+                self._add_batch(batch, stats)
+                batch = []
+                if progress:
+                    progress(dict(stats))
+        if batch:
+            self._add_batch(batch, stats)
+        if progress:
+            progress(dict(stats))
+        return stats
+
+    # ---------------- reading ----------------
+
+    def _members(self, cluster: str, ref: Optional[np.ndarray] = None, limit: int = MEMBER_LIMIT) -> List[Dict]:
+        """Members, earliest upload first (taken as the original), with similarity to ref (default: the original)."""
+        rows = self._db().execute(
+            "SELECT video_id, title, channel_title, upload_date, views, sig FROM videos WHERE cluster = ? "
+            "ORDER BY upload_date, views DESC LIMIT ?", (cluster, limit)).fetchall()
+        if not rows:
+            return []
+        sigs = np.frombuffer(b''.join(r[5] for r in rows), dtype=np.uint32).reshape(len(rows), NUM_PERM)
+        sims = similarity(sigs[0] if ref is None else ref, sigs).tolist()
+        return [{'video_id': vid, 'title': title, 'channel_title': channel, 'upload_date': date, 'views': views,
+                 'similarity': round(sim, 3), 'url': f"https://www.youtube.com/watch?v={vid}"}
+                for (vid, title, channel, date, views, _), sim in zip(rows, sims)]
+
+    def clusters(self, min_size: int = 2, limit: int = 50) -> List[Dict]:
+        """Largest duplicate clusters: size, original (earliest upload) and members with similarity to it."""
+        out = []
+        for cluster, size in self._db().execute(
+                "SELECT cluster, size FROM clusters WHERE size >= ? ORDER BY size DESC LIMIT ?", (min_size, limit)):
+            members = self._members(cluster)
+            out.append({'cluster': cluster, 'size': size, 'original': members[0]['video_id'],
+                        'min_similarity': min(m['similarity'] for m in members), 'members': members})
+        return out
+
+    def duplicates_of(self, video_id: str) -> List[Dict]:
+        """The other members of a video's cluster, most similar to it first."""
+        row = self._db().execute("SELECT cluster, sig FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+        if not row:
+            return []
+        members = self._members(row[0], np.frombuffer(row[1], dtype=np.uint32))
+        return sorted((m for m in members if m['video_id'] != video_id), key=lambda m: -m['similarity'])
+
+    def stats(self) -> Dict:
+        db = self._db()
+        videos = db.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+        clusters, members = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM clusters").fetchone()
+        return {'videos': videos, 'clusters': clusters, 'duplicates': members - clusters}
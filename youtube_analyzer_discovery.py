@@ -0,0 +1,221 @@
+"""
+YOUTUBE ANALYZER PRO - DISCOVERY
+- Keyword search: search.list with publish-date window, region, language and order, paginated
+- Trending: videos.list chart=mostPopular for each region, regions fetched concurrently
+- Quota-aware: search.list costs 100 units per page, mostPopular 1; stops cleanly at the budget
+- Video IDs deduplicated across all sources (first-seen order, every source kept)
+- No API key: yt-dlp search extraction (ytsearch / ytsearchdate); trending needs the API
+- Results cached on disk per query; a repeat poll within the TTL costs no quota
+- A failing source (bad region, API error, yt-dlp error) is recorded in
+  `failures` with its error class; the other sources still merge and the cache is saved
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+# Fallback: yt-dlp
+try:
+    import yt_dlp
+    YTDLP_AVAILABLE = True
+except ImportError:
+    YTDLP_AVAILABLE = False
+
+from youtube_analyzer_apiclient import API_AVAILABLE, ClientPool
+from youtube_analyzer_retry import LABELS, classify
+
+
+SEARCH_COST = 100         # quota units per search.list page
+CHART_COST = 1            # quota units per videos.list page
+PAGE_SIZE = 50            # maxResults for both
+SEARCH_TTL = 6 * 3600     # seconds a cached search stays fresh
+TRENDING_TTL = 3600       # seconds a cached mostPopular chart stays fresh
+
+
+class QuotaExhausted(Exception):
+    pass
+
+
+def rfc3339(days_ago: float) -> str:
+    dt = datetime.now(timezone.utc) - timedelta(days=days_ago)
+    return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class Discovery:
+    def __init__(self, api_key: Optional[str] = None, cache_path: str = "discovery_cache.json",
+                 quota_budget: int = 1000, workers: int = 4):
+        self.api_key = api_key
+        self.use_api = API_AVAILABLE and bool(api_key)
+        self.cache_path = cache_path
+        self.quota_budget = quota_budget
+        self.quota_used = 0
+        self.workers = workers
+        self.cache_hits = 0
+        self.failures: List[Dict] = []  # {'source', 'error_class', 'error'} per source that raised
+        self.cache: Dict[str, Dict] = {}
+        if os.path.exists(cache_path):
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                self.cache = json.load(f)
+        self._lock = threading.Lock()
+        self.youtube = ClientPool(api_key) if self.use_api else None  # one client per worker thread
+
+    # ---------------- bookkeeping ----------------
+
+    def _spend(self, units: int):
+        with self._lock:
+            if self.quota_used + units > self.quota_budget:
+                raise QuotaExhausted()
+            self.quota_used += units
+
+    def _afford(self, units: int, fetched: List[Dict]) -> bool:
+        """Spend units for the next page. Out of quota: False if pages were already fetched, else raise."""
+        try:
+            self._spend(units)
+            return True
+        except QuotaExhausted:
+            if fetched:
+                return False
+            raise
+
+    def _cached(self, key: str, ttl: float) -> Optional[List[Dict]]:
+        with self._lock:
+            entry = self.cache.get(key)
+            if entry and time.time() - entry['ts'] < ttl:
+                self.cache_hits += 1
+                return entry['records']
+        return None
+
+    def _store(self, key: str, records: List[Dict]):
+        with self._lock:
+            self.cache[key] = {'ts': time.time(), 'records': records}
+
+    def save(self):
+        """Write the cache, dropping entries older than the longest TTL."""
+        with self._lock:
+            now = time.time()
+            self.cache = {k: v for k, v in self.cache.items() if now - v['ts'] < max(SEARCH_TTL, TRENDING_TTL)}
+            tmp = self.cache_path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.cache, f, ensure_ascii=False)
+            os.replace(tmp, self.cache_path)
+
+    # ---------------- sources ----------------
+
+    def search(self, query: str, max_results: int = 50, published_after: Optional[str] = None,
+               published_before: Optional[str] = None, region: Optional[str] = None,
+               language: Optional[str] = None, order: str = 'relevance') -> List[Dict]:
+        """Videos matching a keyword query; dates are RFC 3339 (see rfc3339())."""
+        params = {'q': query, 'n': max_results, 'after': published_after, 'before': published_before,
+                  'region': region, 'lang': language, 'order': order, 'api': self.use_api}
+        key = 'search:' + json.dumps(params, sort_keys=True)
+        cached = self._cached(key, SEARCH_TTL)
+        if cached is not None:
+            return cached
+        source = f"search:{query}"
+        if not self.use_api:
+            records = self._ytdlp_search(query, max_results, order, source)
+        else:
+            records, token = [], None
+            while len(records) < max_results:
+                if not self._afford(SEARCH_COST, records):
+                    return records  # partial: not cached, so the next poll completes it
+                res = self.youtube.search().list(
+                    part='snippet', type='video', q=query, maxResults=min(PAGE_SIZE, max_results - len(records)),
+                    pageToken=token, publishedAfter=published_after, publishedBefore=published_before,
+                    regionCode=region, relevanceLanguage=language, order=order,
+                    fields='nextPageToken,items(id/videoId,snippet(title,channelId,channelTitle,publishedAt))'
+                ).execute()
+                for item in res.get('items', []):
+                    sn = item.get('snippet', {})
+                    records.append({
+                        'video_id': item['id']['videoId'], 'title': sn.get('title'),
+                        'channel_id': sn.get('channelId'), 'channel_title': sn.get('channelTitle'),
+                        'published_at': sn.get('publishedAt'), 'source': source,
+                    })
+                token = res.get('nextPageToken')
+                if not token:
+                    break
+        self._store(key, records)
+        return records
+
+    def _ytdlp_search(self, query: str, max_results: int, order: str, source: str) -> List[Dict]:
+        if not YTDLP_AVAILABLE:
+            return []
+        prefix = 'ytsearchdate' if order == 'date' else 'ytsearch'
+        opts = {'quiet': True, 'no_warnings': True, 'extract_flat': True, 'skip_download': True}
+        with yt_dlp.YoutubeDL(opts) as ydl:
+            info = ydl.extract_info(f"{prefix}{max_results}:{query}", download=False) or {}
+        return [{
+            'video_id': e.get('id'), 'title': e.get('title'), 'channel_id': e.get('channel_id'),
+            'channel_title': e.get('channel') or e.get('uploader'), 'published_at': None, 'source': source,
+        } for e in info.get('entries') or [] if e and e.get('id')]
+
+    def trending(self, region: str, max_results: int = 50, category: Optional[str] = None) -> List[Dict]:
+        """videos.list chart=mostPopular for one region (API only)."""
+        if not self.use_api:
+            return []
+        key = 'trending:' + json.dumps({'region': region, 'n': max_results, 'cat': category}, sort_keys=True)
+        cached = self._cached(key, TRENDING_TTL)
+        if cached is not None:
+            return cached
+        records, token = [], None
+        while len(records) < max_results:
+            if not self._afford(CHART_COST, records):
+                return records
+            res = self.youtube.videos().list(
+                part='snippet', chart='mostPopular', regionCode=region, videoCategoryId=category,
+                maxResults=min(PAGE_SIZE, max_results - len(records)), pageToken=token,
+                fields='nextPageToken,items(id,snippet(title,channelId,channelTitle,publishedAt))'
+            ).execute()
+            for item in res.get('items', []):
+                sn = item.get('snippet', {})
+                records.append({
+                    'video_id': item['id'], 'title': sn.get('title'), 'channel_id': sn.get('channelId'),
+                    'channel_title': sn.get('channelTitle'), 'published_at': sn.get('publishedAt'),
+                    'source': f"trending:{region}",
+                })
+            token = res.get('nextPageToken')
+            if not token:
+                break
+        self._store(key, records)
+        return records
+
+    # ---------------- combined ----------------
+
+    def discover(self, queries: List[str] = (), regions: List[str] = (), max_results: int = 50,
+                 **search_filters) -> List[Dict]:
+        """Run every query and regional chart concurrently; one record per video, sources merged.
+
+        Sources that hit the quota budget are skipped and failing ones are recorded in
+        self.failures; whatever finished is returned, and the cache is saved either way.
+        """
+        jobs = [(self.search, q, search_filters, f"search:{q}") for q in queries]
+        jobs += [(self.trending, r, {}, f"trending:{r}") for r in regions]
+        merged: Dict[str, Dict] = {}
+        self.failures = []
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = [(pool.submit(fn, arg, max_results, **kw), source) for fn, arg, kw, source in jobs]
+                for f, source in futures:  # submission order keeps the merge deterministic
+                    try:
+                        records = f.result()
+                    except QuotaExhausted:
+                        continue
+                    except Exception as e:
+                        cls, _ = classify(e)
+                        self.failures.append({'source': source, 'error_class': cls,
+                                              'error': f"{LABELS.get(cls, cls)}: {e}"})
+                        continue
+                    for r in records:
+                        seen = merged.get(r['video_id'])
+                        if seen is None:
+                            merged[r['video_id']] = dict(r, sources=[r['source']])
+                        elif r['source'] not in seen['sources']:
+                            seen['sources'].append(r['source'])
+        finally:
+            self.save()  # keep what was paid for, even if something unexpected escapes
+        return list(merged.values())
@@ -0,0 +1,195 @@
+"""
+YOUTUBE ANALYZER PRO - DOWNLOAD ENGINE
+- Downloads run in-process through the yt_dlp API (no subprocess, no stdout parsing)
+- Resumable: interrupted downloads leave a .part file that the next attempt continues
+- Concurrent fragment fetching for fragmented (DASH/HLS) formats
+- One token bucket shapes the combined bandwidth of every concurrent download
+- Progress reported through a callback (throttled per file), never printed
+- A stored stream URL is used while it is valid; an expired (or rejected) one
+  triggers a fresh extraction from the watch URL
+- Routed through the proxy pool, sticky per video, so the stream URL is used
+  from the IP that resolved it
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+# Optional: yt-dlp
+try:
+    import yt_dlp
+    from yt_dlp.utils import DownloadCancelled, DownloadError
+    YTDLP_AVAILABLE = True
+except ImportError:
+    YTDLP_AVAILABLE = False
+
+from youtube_analyzer_proxies import ProxyPool
+
+DOWNLOAD_WORKERS = 3         # videos downloaded at once
+FRAGMENTS = 4                # concurrent fragments per fragmented download
+DEFAULT_RATE = 0             # bytes/s for all downloads together; 0 = unlimited
+EXPIRY_MARGIN = 600          # treat a stream URL as expired this many seconds early
+PROGRESS_INTERVAL = 1.0      # seconds between 'downloading' callbacks per file
+SHAPED_BLOCK = 64 * 1024     # fixed read size while rate-limited (yt-dlp otherwise grows it to MBs)
+DOWNLOAD_FORMAT = 'best[height<=720][ext=mp4]/best[ext=mp4]/best'
+OUTTMPL = '%(title).150B [%(id)s].%(ext)s'
+
+
+class TokenBucket:
+    """Byte-rate limiter shared by every download thread; rate 0 = unlimited."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst or max(rate, 64 * 1024)
+        self.tokens = self.burst
+        self.refilled = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, n: int):
+        """Take n bytes of allowance, sleeping while the bucket is in debt."""
+        if self.rate <= 0 or n <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.refilled) * self.rate)
+            self.refilled = now
+            self.tokens -= n
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+
+def url_expired(url: Optional[str], margin: float = EXPIRY_MARGIN) -> bool:
+    """googlevideo URLs carry an 'expire' unix timestamp; no timestamp counts as expired."""
+    if not url:
+        return True
+    expire = parse_qs(urlparse(url).query).get('expire')
+    try:
+        return int(expire[0]) < time.time() + margin
+    except (TypeError, ValueError):
+        return True
+
+
+class Downloader:
+    def __init__(self, folder: str, rate: float = DEFAULT_RATE, workers: int = DOWNLOAD_WORKERS,
+                 fragments: int = FRAGMENTS, proxies: Optional[ProxyPool] = None,
+                 progress: Optional[Callable[[Dict], None]] = None, ydl_opts: Optional[Dict] = None):
+        """progress(event) gets dicts with video_id, status (downloading/finished/failed/cancelled),
+        downloaded, total, speed, eta and filename."""
+        self.folder = folder
+        self.bucket = TokenBucket(rate)
+        self.workers = workers
+        self.fragments = fragments
+        self.proxies = proxies or ProxyPool()
+        self.progress = progress or (lambda event: None)
+        self.ydl_opts = ydl_opts or {}
+        self.stats = {'done': 0, 'failed': 0, 'cancelled': 0, 'fresh': 0, 'resumed': 0, 'bytes': 0}
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        """Stop every download; their .part files stay for the next attempt."""
+        self._cancel.set()
+
+    def _count(self, key: str, n: int = 1):
+        with self._lock:
+            self.stats[key] += n
+
+    def _hook(self, video_id: str, resumed: int) -> Callable[[Dict], None]:
+        seen = {'bytes': resumed, 'emitted': 0.0}  # bytes already in the .part are not charged
+
+        def hook(d: Dict):
+            if self._cancel.is_set():
+                raise DownloadCancelled()
+            done = d.get('downloaded_bytes') or 0
+            if done > seen['bytes']:
+                delta, seen['bytes'] = done - seen['bytes'], done
+                self._count('bytes', delta)
+                self.bucket.consume(delta)  # blocks this download (or fragment) thread
+            now = time.monotonic()
+            if d['status'] == 'downloading' and now - seen['emitted'] < PROGRESS_INTERVAL:
+                return
+            seen['emitted'] = now
+            self.progress({
+                'video_id': video_id, 'status': d['status'], 'downloaded': done,
+                'total': d.get('total_bytes') or d.get('total_bytes_estimate'),
+                'speed': d.get('speed'), 'eta': d.get('eta'), 'filename': d.get('filename'),
+            })
+        return hook
+
+    def _opts(self, video_id: str, resumed: int, proxy_opts: Dict) -> Dict:
+        shaping = {'buffersize': SHAPED_BLOCK, 'noresizebuffer': True} if self.bucket.rate > 0 else {}
+        return {
+            'quiet': True, 'no_warnings': True, 'noprogress': True,
+            'format': DOWNLOAD_FORMAT,
+            'paths': {'home': self.folder}, 'outtmpl': OUTTMPL,
+            'continuedl': True,                      # resume .part files
+            'concurrent_fragment_downloads': self.fragments,
+            'retries': 3, 'fragment_retries': 3, 'socket_timeout': 30,
+            'progress_hooks': [self._hook(video_id, resumed)],
+            **shaping, **self.ydl_opts, **proxy_opts,
+        }
+
+    def _fetch(self, row: Dict, resumed: int, proxy_opts: Dict) -> Dict:
+        vid = row.get('video_id')
+        watch = row.get('url') or f"https://www.youtube.com/watch?v={vid}"
+        stream = row.get('download_url')
+        with yt_dlp.YoutubeDL(self._opts(vid, resumed, proxy_opts)) as ydl:
+            if not url_expired(stream):
+                # Stored stream URL still valid: no extraction round trip
+                info = {'id': vid, 'title': row.get('title') or vid, 'url': stream, 'ext': 'mp4',
+                        'webpage_url': watch, 'extractor': 'youtube', 'extractor_key': 'Youtube'}
+                try:
+                    info = ydl.process_ie_result(info, download=True)
+                    return {'filename': ydl.prepare_filename(info), 'fresh': False}
+                except DownloadError:
+                    if self._cancel.is_set():
+                        raise
+                    # expired early or IP-locked: fall through to a fresh extraction
+            self._count('fresh')
+            info = ydl.extract_info(watch, download=True)
+            return {'filename': ydl.prepare_filename(info), 'fresh': True}
+
+    def download(self, row: Dict) -> Dict:
+        vid = row.get('video_id')
+        result = {'video_id': vid, 'status': 'failed', 'filename': None, 'error': None}
+        if self._cancel.is_set():
+            result['status'] = 'cancelled'
+            self._count('cancelled')
+            return result
+        resumed = sum(os.path.getsize(os.path.join(self.folder, f)) for f in os.listdir(self.folder)
+                      if f.endswith('.part') and f"[{vid}]" in f)
+        if resumed:
+            self._count('resumed')
+        try:
+            key = row.get('url')  # same sticky endpoint that resolved the stream URL
+            result.update(self.proxies.call(lambda p: self._fetch(row, resumed, p.ytdlp_opts), key=key))
+            result['status'] = 'done'
+            self._count('done')
+        except DownloadCancelled:
+            result['status'] = 'cancelled'
+            self._count('cancelled')
+        except Exception as e:
+            if self._cancel.is_set():
+                result['status'] = 'cancelled'
+                self._count('cancelled')
+            else:
+                result['error'] = str(e)
+                self._count('failed')
+        if result['status'] != 'done':
+            self.progress({'video_id': vid, 'status': result['status'], 'downloaded': None, 'total': None,
+                           'speed': None, 'eta': None, 'filename': None, 'error': result['error']})
+        return result
+
+    def download_all(self, rows: List[Dict]) -> List[Dict]:
+        """Download every analyzed row (video_id, no error), WORKERS at a time; one result dict per row, in order."""
+        if not YTDLP_AVAILABLE:
+            raise RuntimeError("yt-dlp is not installed")
+        os.makedirs(self.folder, exist_ok=True)
+        # Failed placeholders (rows with an 'error' class) are known deleted/private/blocked: no extraction
+        rows = [r for r in rows if r.get('video_id') not in (None, '', 'N/A') and not r.get('error')]
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='download') as pool:
+            return list(pool.map(self.download, rows))
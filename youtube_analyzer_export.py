@@ -0,0 +1,145 @@
+"""
+YOUTUBE ANALYZER PRO - EXPORT
+- CSV, Excel and JSON written in one pass over the rows: each row is formatted
+  once and handed to every selected writer
+- Streaming throughout: csv module, a hand-rolled JSON array, openpyxl
+  write-only (no DataFrame copy of the results)
+- Runs on a worker thread over a snapshot of the results; progress(done, total)
+  every PROGRESS_EVERY rows
+- Cancellable through a RunControl (pause works too); files are written under
+  a .part name and only replace the targets once every format is complete, so
+  a cancelled or failed export leaves no half-written file behind
+"""
+
+import csv
+import json
+import math
+import os
+from typing import Callable, Dict, Iterable, List, Optional
+
+from youtube_analyzer_control import RunControl
+from youtube_analyzer_xlsx import XlsxStreamWriter
+
+FORMATS = ('csv', 'xlsx', 'json')
+PROGRESS_EVERY = 2000   # rows between progress callbacks (and cancel checks)
+BUFFER = 1 << 20        # bytes of text buffered per output file
+
+
+def export_paths(path: str, formats: Iterable[str]) -> Dict[str, str]:
+    """One target per format next to `path`: report.csv + ['xlsx', 'json'] -> report.xlsx, report.json."""
+    base = os.path.splitext(path)[0]
+    return {fmt: f"{base}.{fmt}" for fmt in FORMATS if fmt in formats}
+
+
+def _text(value):
+    """Flat cell value for CSV/JSON: lists joined like the hashtags column; None and NaN/inf -> None."""
+    if isinstance(value, (list, tuple)):
+        return ', '.join(str(v) for v in value)
+    if isinstance(value, float) and not math.isfinite(value):
+        return None  # empty CSV cell / JSON null, as DataFrame.to_csv / to_json wrote it
+    return value
+
+
+class _CsvSink:
+    def __init__(self, path: str, columns: List[str]):
+        self.f = open(path, 'w', encoding='utf-8', newline='', buffering=BUFFER)
+        self.writer = csv.writer(self.f, lineterminator='\n')  # same line endings as DataFrame.to_csv
+        self.writer.writerow(columns)
+
+    def write(self, values: List, row: Dict):
+        self.writer.writerow(['' if v is None else json.dumps(v, ensure_ascii=False) if isinstance(v, dict) else v
+                              for v in values])
+
+    def close(self):
+        self.f.close()
+
+    abort = close
+
+
+class _JsonSink:
+    """Same layout as DataFrame.to_json(orient='records', indent=2): an array of objects."""
+
+    def __init__(self, path: str, columns: List[str]):
+        self.f = open(path, 'w', encoding='utf-8', buffering=BUFFER)
+        self.columns = columns
+        self.rows = 0
+        self.f.write('[')
+
+    def write(self, values: List, row: Dict):
+        record = json.dumps(dict(zip(self.columns, values)), ensure_ascii=False, indent=2,
+                            default=str, allow_nan=False)
+        self.f.write((',\n  ' if self.rows else '\n  ') + record.replace('\n', '\n  '))
+        self.rows += 1
+
+    def close(self):
+        self.f.write('\n]' if self.rows else ']')
+        self.f.close()
+
+    def abort(self):
+        self.f.close()
+
+
+class _XlsxSink:
+    def __init__(self, path: str, columns: List[str]):
+        self.writer = XlsxStreamWriter(path, columns)
+
+    def write(self, values: List, row: Dict):
+        self.writer.append(row)  # native lists/numbers, for its own cell formats
+
+    def close(self):
+        self.writer.close()
+
+    def abort(self):
+        self.writer.discard()
+
+
+SINKS = {'csv': _CsvSink, 'json': _JsonSink, 'xlsx': _XlsxSink}
+
+
+def export_rows(rows: List[Dict], paths: Dict[str, str], columns: List[str],
+                defaults: Optional[Dict] = None, control: Optional[RunControl] = None,
+                progress: Optional[Callable[[int, int], None]] = None) -> int:
+    """Write rows to every {format: path} in one pass; returns the number of rows written.
+
+    defaults: value for an empty cell per column (e.g. {'download_url': 'N/A'}).
+    Raises Cancelled if control is cancelled; no target file is touched in that case.
+    """
+    defaults = defaults or {}
+    parts = {fmt: path + '.part' for fmt, path in paths.items()}
+    sinks = []
+    total = len(rows)
+    try:
+        for fmt, part in parts.items():
+            sinks.append(SINKS[fmt](part, columns))
+        flat = any(fmt != 'xlsx' for fmt in parts)
+        for n, row in enumerate(rows, 1):
+            if defaults:
+                row = {**row, **{c: v for c, v in defaults.items() if not row.get(c)}}
+            values = [_text(row.get(c)) for c in columns] if flat else None
+            for sink in sinks:
+                sink.write(values, row)
+            if n % PROGRESS_EVERY == 0:
+                if control:
+                    control.checkpoint()
+                if progress:
+                    progress(n, total)
+        for sink in sinks:
+            sink.close()
+        sinks = []
+        if control:
+            control.checkpoint()  # last chance to back out before the targets are replaced
+        for fmt, part in parts.items():
+            os.replace(part, paths[fmt])
+    except BaseException:
+        for sink in sinks:
+            try:
+                sink.abort()  # no xlsx save: the zip of a multi-GB sheet takes a while
+            except Exception:
+                pass
+        for part in parts.values():
+            if os.path.exists(part):
+                os.remove(part)
+        raise
+    if progress:
+        progress(total, total)
+    return total
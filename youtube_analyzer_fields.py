@@ -0,0 +1,84 @@
+"""
+YOUTUBE ANALYZER PRO - API FIELD MASKS
+- Maps result columns to the Data API parts/fields they need
+- Builds 'part' + 'fields=' partial-response masks for videos.list
+- Shared by the GUI and interactive editions
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# ========================================
+#           COLUMN -> API FIELD MAP
+# ========================================
+# Columns with an empty mapping are derived locally (or from other services)
+# and never cost any API payload.
+API_COLUMN_FIELDS: Dict[str, Dict[str, List[str]]] = {
+    'video_id': {},
+    'title': {'snippet': ['title']},
+    'upload_date': {'snippet': ['publishedAt']},
+    'upload_time': {'snippet': ['publishedAt']},
+    'upload_datetime': {'snippet': ['publishedAt']},
+    'duration': {'contentDetails': ['duration']},
+    'views': {'statistics': ['viewCount']},
+    'likes': {'statistics': ['likeCount']},
+    'dislikes': {},
+    'comments': {'statistics': ['commentCount']},
+    'engagement_rate_%': {'statistics': ['viewCount', 'likeCount']},
+    'like_dislike_ratio': {'statistics': ['likeCount']},
+    'views_per_day': {'snippet': ['publishedAt'], 'statistics': ['viewCount']},
+    'performance_score': {'snippet': ['publishedAt', 'categoryId'],
+                          'statistics': ['viewCount', 'likeCount']},
+    'description': {'snippet': ['description']},
+    'channel_title': {'snippet': ['channelTitle']},
+    'channel_id': {'snippet': ['channelId']},
+    'country': {'snippet': ['defaultLanguage']},
+    'category': {'snippet': ['categoryId']},
+    'category_id': {'snippet': ['categoryId']},
+    'channel_subscribers': {'snippet': ['channelId']},  # channels.list, cached per channel
+    'channel_videos': {'snippet': ['channelId']},
+    'channel_views': {'snippet': ['channelId']},
+    'hashtags': {'snippet': ['title', 'description']},
+    'thumbnail': {},
+    'url': {},
+    'download_url': {},
+}
+
+# Order parts the same way the API documents them
+PART_ORDER = ['snippet', 'contentDetails', 'statistics', 'topicDetails']
+
+
+def parse_columns(text: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated column list; empty means 'all columns'."""
+    if not text:
+        return None
+    cols = [c.strip() for c in text.split(',') if c.strip()]
+    unknown = [c for c in cols if c not in API_COLUMN_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown column(s): {', '.join(unknown)}")
+    return cols or None
+
+
+def build_api_request(columns: Optional[Iterable[str]] = None) -> Tuple[str, str]:
+    """Return (part, fields) for videos.list covering only the given columns."""
+    wanted = list(columns) if columns else list(API_COLUMN_FIELDS)
+    needed: Dict[str, List[str]] = {}
+    for col in wanted:
+        for part, names in API_COLUMN_FIELDS.get(col, {}).items():
+            bucket = needed.setdefault(part, [])
+            for name in names:
+                if name not in bucket:
+                    bucket.append(name)
+
+    parts = [p for p in PART_ORDER if p in needed]
+    # 'id' is always requested so responses can be matched to the input
+    selectors = ['id'] + [f"{p}({','.join(needed[p])})" for p in parts]
+    part = ','.join(parts) if parts else 'id'
+    return part, f"items({','.join(selectors)})"
+
+
+def wants(columns: Optional[Iterable[str]], *names: str) -> bool:
+    """True when any of the named columns is selected (None selects all)."""
+    if not columns:
+        return True
+    return any(n in columns for n in names)
@@ -13,23 +13,21 @@ Author: Grok (xAI) | @YLdplayer85479 (Pakistan)
 import os
 import sys
 import json
-import pandas as pd
-import requests
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from datetime import datetime
 from typing import List, Dict, Optional
 import re
 import subprocess
-from threading import Thread
+from threading import Thread, local
 import webbrowser
 import time
 import random
 
 # Optional: YouTube API
 try:
-    from googleapiclient.discovery import build
     from googleapiclient.errors import HttpError
+    from googleapiclient.http import build_http
     API_AVAILABLE = True
 except ImportError:
     API_AVAILABLE = False
@@ -41,8 +39,39 @@ try:
 except ImportError:
     YTDLP_AVAILABLE = False
 
+from youtube_analyzer_fields import build_api_request, wants
+from youtube_analyzer_apiclient import ClientPool
+from youtube_analyzer_snapshots import SnapshotStore
+from youtube_analyzer_metrics import apply_metrics
+from youtube_analyzer_index import TagIndex
+from youtube_analyzer_thumbs import ThumbnailCache, PREVIEW_SIZE
+from youtube_analyzer_timing import StageTimer, serve_metrics
+from youtube_analyzer_profile import RunProfiler, profile_base
+from youtube_analyzer_ytdlp_pool import shared_pool
+from youtube_analyzer_proxies import ProxyPool
+from youtube_analyzer_xlsx import export_columns
+from youtube_analyzer_export import export_rows, export_paths, FORMATS
+from youtube_analyzer_control import RunControl, Cancelled
+from youtube_analyzer_reference import ReferenceData, CHANNEL_COLUMNS
+from youtube_analyzer_store import ResultsStore
+from youtube_analyzer_transcripts import TranscriptIndex
+from youtube_analyzer_dedup import DedupIndex
+from youtube_analyzer_retry import RetryPolicy, FetchError, LABELS, NOT_FOUND, EXTRACTOR, as_fetch_error, check_response
+from youtube_analyzer_download import Downloader, DEFAULT_RATE, DOWNLOAD_WORKERS
+
 # Config
 CONFIG_FILE = "config.json"
+SNAPSHOT_DIR = "snapshots"
+TAG_INDEX_FILE = "tag_index.json"
+TAG_INDEX_SKETCH = 0  # >0: bounded top-K sketch with this many counters
+THUMB_DIR = "thumbnails"
+RUN_SUMMARY_FILE = "run_summary.json"
+REFERENCE_CACHE = "reference_cache.json"
+RESULTS_DB = "results.db"  # every run upserted here; the Results filter box queries it
+TRANSCRIPTS_DB = "transcripts.db"  # optional stage (config: fetch_transcripts, transcript_langs)
+DEDUP_DB = "dedup.db"  # MinHash/LSH near-duplicate clusters, updated every run
+METRICS_FILE = "metrics.prom"
+REQUEST_DELAY = (5, 2)  # base seconds + random jitter between videos
 THEME = {
     "bg": "#1a1a1a",
     "fg": "#ffffff",
@@ -80,17 +109,31 @@ def update_ytdlp():
 #           YOUTUBE ANALYZER PRO CLASS (BULK FIXED)
 # ========================================
 class YouTubeAnalyzerPro:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, columns: Optional[List[str]] = None,
+                 proxies: Optional[ProxyPool] = None):
         self.api_key = api_key
+        self.columns = columns
+        self.api_part, self.api_fields = build_api_request(columns)
+        self.response_bytes = 0
+        self.snapshots = SnapshotStore(SNAPSHOT_DIR)
+        self.tag_index = TagIndex(TAG_INDEX_FILE, TAG_INDEX_SKETCH)
+        self.store = ResultsStore(RESULTS_DB)
+        self.dedup = DedupIndex(DEDUP_DB)
+        self.timer = StageTimer()
+        self.ytdlp_pool = shared_pool() if YTDLP_AVAILABLE else None
+        self.proxies = proxies or ProxyPool()
+        self.retry = RetryPolicy()
+        self._local = local()  # per-run state: control, API transport
         self.use_api = API_AVAILABLE and bool(self.api_key)
         self.youtube = None
         if self.use_api:
             try:
-                self.youtube = build('youtube', 'v3', developerKey=self.api_key)
+                self.youtube = ClientPool(self.api_key)  # per-thread clients, discovery doc cached per process
                 self.youtube.videos().list(part='id', id='dQw4w9WgXcQ').execute()
             except Exception as e:
                 print(f"API Error: {e}")
                 self.use_api = False
+        self.reference = ReferenceData(self.youtube, REFERENCE_CACHE, self._execute) if self.use_api else None
         self.rtd_api = "https://returnyoutubedislikeapi.com/votes?videoId="
 
     def extract_video_id(self, url: str) -> Optional[str]:
@@ -117,74 +160,120 @@ class YouTubeAnalyzerPro:
             parts = [int(p) for p in d.split() if p.isdigit()]
             h, m, s = (parts + [0, 0, 0])[:3]
             return f"{h:02d}:{m:02d}:{s:02d}"
-        except:
+        except ValueError:
             return "N/A"
 
-    def get_dislikes(self, video_id: str) -> int:
-        try:
-            r = requests.get(self.rtd_api + video_id, timeout=5)
-            return r.json().get("dislikes", 0) if r.status_code == 200 else 0
-        except:
-            return 0
+    def _control(self) -> Optional[RunControl]:
+        return getattr(self._local, 'control', None)
 
-    def get_video_data_api(self, video_id: str) -> Optional[Dict]:
-        try:
-            req = self.youtube.videos().list(
-                part='snippet,contentDetails,statistics',
-                id=video_id
-            )
-            res = req.execute()
-            if not res['items']:
+    def _io(self, fn, *args, **kwargs):
+        """Blocking call that the current run's Cancel can abandon."""
+        control = self._control()
+        return control.call(fn, *args, **kwargs) if control else fn(*args, **kwargs)
+
+    def _retry(self, fn):
+        """fn() under the retry policy; backoff sleeps go through the run's control so Cancel cuts them short."""
+        control = self._control()
+        return self.retry.call(fn, sleep=control.sleep if control else time.sleep,
+                               on_retry=lambda e, wait: print(f"Retry in {wait:.1f}s ({e.error_class}): {e}"))
+
+    def get_dislikes(self, video_id: str) -> Optional[int]:
+        """None when the dislike service has no answer; the video itself is fine."""
+        with self.timer.stage('dislikes') as st:
+            try:
+                return self._retry(lambda: check_response(
+                    self._io(self.proxies.get, self.rtd_api + video_id, timeout=5)).json().get("dislikes", 0))
+            except FetchError as e:
+                st.error(e)
                 return None
 
-            item = res['items'][0]
-            sn, st, cd = item['snippet'], item['statistics'], item['contentDetails']
-
-            views = int(st.get('viewCount', 0)) if st.get('viewCount') else 0
-            likes = int(st.get('likeCount', 0)) if st.get('likeCount') else 0
-            comments = int(st.get('commentCount', 0)) if st.get('commentCount') else 0
-            dislikes = self.get_dislikes(video_id)
-            duration = self.format_duration(cd.get('duration', ''))
-            engagement = round((likes / views * 100), 2) if views > 0 else 0
-            score = min(100, (views // 10000) + (likes // 1000) + int(engagement * 10))
-
-            country = sn.get('country', 'Global')
-            lang_map = {'en': 'US', 'ur': 'PK', 'hi': 'IN', 'es': 'ES', 'ar': 'SA'}
-            if country == 'Global' and sn.get('defaultLanguage'):
-                country = lang_map.get(sn['defaultLanguage'][:2], 'Global')
-
-            cat_map = {
-                '10': 'Music', '17': 'Sports', '20': 'Gaming', '22': 'Blogs',
-                '24': 'Entertainment', '25': 'News', '27': 'Education', '28': 'Tech'
-            }
-            category = cat_map.get(sn.get('categoryId', ''), 'Other')
-
-            dt = datetime.fromisoformat(sn['publishedAt'].replace('Z', '+00:00'))
-
-            return {
-                'video_id': video_id,
-                'title': sn['title'],
-                'upload_date': dt.date().isoformat(),
-                'upload_time': dt.time().strftime('%H:%M:%S'),
-                'duration': duration,
-                'views': views,
-                'likes': likes,
-                'dislikes': dislikes,
-                'comments': comments,
-                'engagement_rate_%': engagement,
-                'performance_score': score,
-                'description': sn['description'][:500] + '...' if len(sn['description']) > 500 else sn['description'],
-                'channel_title': sn['channelTitle'],
-                'country': country,
-                'category': category,
-                'hashtags': self.extract_hashtags(sn['description'] + ' ' + sn['title']),
-                'thumbnail': f"https://img.youtube.com/vi/{video_id}/maxresdefault.jpg",
-                'url': f'https://www.youtube.com/watch?v={video_id}',
-                'download_url': None
-            }
-        except Exception as e:
-            print(f"API Error: {e}")
-            return None
+    def _execute(self, req):
+        # Count raw payload bytes before googleapiclient parses the JSON
+        postproc = req.postproc
+        def counting(resp, content):
+            self.response_bytes += len(content or b'')
+            return postproc(resp, content)
+        req.postproc = counting
+        return self._io(req.execute, http=getattr(self._local, 'http', None))
+
+    def enrich(self, rows: List[Dict]):
+        """Channel stats + category names from the cached reference data (API mode only)."""
+        if not self.reference or not rows:
+            return
+        with self.timer.stage('reference') as st:
+            try:
+                self.reference.enrich(rows, channels=wants(self.columns, *CHANNEL_COLUMNS),
+                                      categories=wants(self.columns, 'category', 'performance_score'))
+            except Exception as e:
+                st.error(e)
+                print(f"Reference data failed: {e}")
+
+    def get_video_data_api(self, video_id: str) -> Dict:
+        """Raises FetchError (classified) when the video cannot be fetched."""
+        with self.timer.stage('api') as st:
+            try:
+                res = self._retry(lambda: self._execute(self.youtube.videos().list(
+                    part=self.api_part,
+                    id=video_id,
+                    fields=self.api_fields
+                )))
+            except FetchError as e:
+                st.error(e)
+                raise
+            if not res.get('items'):
+                st.error(NOT_FOUND)
+                raise FetchError(NOT_FOUND, f"{video_id}: deleted, private or never existed")
+
+        item = res['items'][0]
+        sn = item.get('snippet', {})
+        stats = item.get('statistics', {})
+        cd = item.get('contentDetails', {})
+
+        views = int(stats.get('viewCount', 0)) if stats.get('viewCount') else 0
+        likes = int(stats.get('likeCount', 0)) if stats.get('likeCount') else 0
+        comments = int(stats.get('commentCount', 0)) if stats.get('commentCount') else 0
+        dislikes = self.get_dislikes(video_id) if wants(self.columns, 'dislikes', 'like_dislike_ratio') else 0
+        duration = self.format_duration(cd.get('duration', ''))
+
+        country = sn.get('country', 'Global')
+        lang_map = {'en': 'US', 'ur': 'PK', 'hi': 'IN', 'es': 'ES', 'ar': 'SA'}
+        if country == 'Global' and sn.get('defaultLanguage'):
+            country = lang_map.get(sn['defaultLanguage'][:2], 'Global')
+
+        cat_map = {
+            '10': 'Music', '17': 'Sports', '20': 'Gaming', '22': 'Blogs',
+            '24': 'Entertainment', '25': 'News', '27': 'Education', '28': 'Tech'
+        }
+        category = cat_map.get(sn.get('categoryId', ''), 'Other')
+
+        published = sn.get('publishedAt')
+        dt = datetime.fromisoformat(published.replace('Z', '+00:00')) if published else None
+        description = sn.get('description', '')
+        title = sn.get('title', 'N/A')
+
+        return {
+            'video_id': video_id,
+            'title': title,
+            'upload_date': dt.date().isoformat() if dt else 'N/A',
+            'upload_time': dt.time().strftime('%H:%M:%S') if dt else 'N/A',
+            'duration': duration,
+            'views': views,
+            'likes': likes,
+            'dislikes': dislikes,
+            'comments': comments,
+            'engagement_rate_%': 0,  # filled by the metrics stage
+            'performance_score': 0,
+            'description': description[:500] + '...' if len(description) > 500 else description,
+            'channel_title': sn.get('channelTitle', 'N/A'),
+            'channel_id': sn.get('channelId', 'N/A'),
+            'country': country,
+            'category': category,
+            'category_id': sn.get('categoryId', ''),
+            'hashtags': self.extract_hashtags(description + ' ' + sn.get('title', '')),
+            'thumbnail': f"https://img.youtube.com/vi/{video_id}/maxresdefault.jpg",
+            'url': f'https://www.youtube.com/watch?v={video_id}',
+            'download_url': None
+        }
 
     def get_download_url_ytdlp(self, url: str) -> Optional[str]:
         if not YTDLP_AVAILABLE:
@@ -211,24 +300,27 @@ class YouTubeAnalyzerPro:
             },
         }
 
-        try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
+        token = self._control()
+        with self.timer.stage('ytdlp_download_url') as st:
+            try:
+                info = self._retry(lambda: self._io(self.proxies.call, lambda p: self.ytdlp_pool.extract(
+                    url, {**ydl_opts, **p.ytdlp_opts}, want='url', token=token), key=url))
                 return info.get('url') if info else None
-        except Exception as e:
-            print(f"Download URL failed: {e}")
-            return None
+            except FetchError as e:
+                st.error(e)
+                print(f"Download URL failed ({e.error_class}): {e}")
+                return None
 
-    def get_video_data_ytdlp(self, url: str) -> Optional[Dict]:
+    def get_video_data_ytdlp(self, url: str) -> Dict:
+        """Raises FetchError (classified) when the video cannot be fetched."""
         if not YTDLP_AVAILABLE:
-            return None
+            raise FetchError(EXTRACTOR, "yt-dlp is not installed")
 
         ydl_opts = {
             'quiet': True,
             'no_warnings': True,
             'extract_flat': True,
             'skip_download': True,
-            'ignoreerrors': True,
             'retries': 3,
             'fragment_retries': 3,
             'extractor_retries': 3,
@@ -244,99 +336,155 @@ class YouTubeAnalyzerPro:
             },
         }
 
-        try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                if not info or 'entries' in info:
-                    return None
-
-                vid = info.get('id')
-                if not vid:
-                    return None
-
-                upload = info.get('upload_date')
-                dt = datetime.strptime(upload, '%Y%m%d') if upload else datetime.now()
-                dur = info.get('duration', 0)
-                dur_str = f"{dur//3600:02d}:{(dur%3600)//60:02d}:{dur%60:02d}" if dur else "N/A"
-
-                views = info.get('view_count', 0) or 0
-                likes = info.get('like_count', 0) or 0
-                comments = info.get('comment_count', 0) or 0
-                dislikes = self.get_dislikes(vid)
-
-                engagement = round((likes / views * 100), 2) if views > 0 else 0
-                score = min(100, (views // 10000) + (likes // 1000) + int(engagement * 10))
-
-                download_url = self.get_download_url_ytdlp(url)
-
-                return {
-                    'video_id': vid,
-                    'title': info.get('title', 'N/A'),
-                    'upload_date': dt.date().isoformat(),
-                    'upload_time': dt.time().strftime('%H:%M:%S'),
-                    'duration': dur_str,
-                    'views': views,
-                    'likes': likes,
-                    'dislikes': dislikes,
-                    'comments': comments,
-                    'engagement_rate_%': engagement,
-                    'performance_score': score,
-                    'description': (info.get('description', 'N/A')[:500] + '...') if info.get('description') else 'N/A',
-                    'channel_title': info.get('uploader', 'N/A'),
-                    'country': 'N/A',
-                    'category': info.get('categories', ['Other'])[0] if info.get('categories') else 'Other',
-                    'hashtags': self.extract_hashtags(info.get('description', '') + ' ' + info.get('title', '')),
-                    'thumbnail': info.get('thumbnail', ''),
-                    'url': url,
-                    'download_url': download_url
-                }
-        except Exception as e:
-            print(f"yt-dlp failed: {e}")
-            return None
+        token = self._control()
+        with self.timer.stage('ytdlp_metadata') as st:
+            try:
+                info = self._retry(lambda: self._io(self.proxies.call, lambda p: self.ytdlp_pool.extract(
+                    url, {**ydl_opts, **p.ytdlp_opts}, token=token), key=url))
+            except FetchError as e:
+                st.error(e)
+                raise
+            if not info or 'entries' in info or not info.get('id'):
+                st.error(NOT_FOUND)
+                raise FetchError(NOT_FOUND, f"No single video at {url}")
+
+        vid = info['id']
+
+        upload = info.get('upload_date')
+        dt = datetime.strptime(upload, '%Y%m%d') if upload else datetime.now()
+        dur = info.get('duration', 0)
+        dur_str = f"{dur//3600:02d}:{(dur%3600)//60:02d}:{dur%60:02d}" if dur else "N/A"
+
+        views = info.get('view_count', 0) or 0
+        likes = info.get('like_count', 0) or 0
+        comments = info.get('comment_count', 0) or 0
+        dislikes = self.get_dislikes(vid)
+
+        download_url = self.get_download_url_ytdlp(url)
+
+        return {
+            'video_id': vid,
+            'title': info.get('title', 'N/A'),
+            'upload_date': dt.date().isoformat(),
+            'upload_time': dt.time().strftime('%H:%M:%S'),
+            'duration': dur_str,
+            'views': views,
+            'likes': likes,
+            'dislikes': dislikes,
+            'comments': comments,
+            'engagement_rate_%': 0,  # filled by the metrics stage
+            'performance_score': 0,
+            'description': (info.get('description', 'N/A')[:500] + '...') if info.get('description') else 'N/A',
+            'channel_title': info.get('uploader', 'N/A'),
+            'country': 'N/A',
+            'category': info.get('categories', ['Other'])[0] if info.get('categories') else 'Other',
+            'hashtags': self.extract_hashtags(info.get('description', '') + ' ' + info.get('title', '')),
+            'thumbnail': info.get('thumbnail', ''),
+            'url': url,
+            'download_url': download_url
+        }
 
-    def analyze_single(self, url: str) -> Optional[Dict]:
-        vid = self.extract_video_id(url)
+    def analyze_single(self, url: str) -> Dict:
+        """Row for one video; raises FetchError (classified) on failure."""
+        with self.timer.stage('extract_video_id') as st:
+            vid = self.extract_video_id(url)
+            if not vid:
+                st.error(NOT_FOUND)
         if not vid:
-            return None
+            raise FetchError(NOT_FOUND, f"Invalid URL: {url}")
 
-        if self.use_api:
-            return self.get_video_data_api(vid)
-        else:
-            return self.get_video_data_ytdlp(url)
+        try:
+            if self.use_api:
+                return self.get_video_data_api(vid)
+            else:
+                return self.get_video_data_ytdlp(url)
+        except Exception as e:
+            raise as_fetch_error(e) from e  # parse errors etc. get a class too
 
-    def analyze_urls(self, urls: List[str]) -> List[Dict]:
+    def analyze_urls(self, urls: List[str], control: Optional[RunControl] = None) -> List[Dict]:
+        """Analyze in order; on cancel, stop and return what was gathered so far (not stored or summarized)."""
         results = []
         total = len(urls)
-        for idx, url in enumerate(urls):
-            print(f"Analyzing {idx+1}/{total}: {url}")
-            data = self.analyze_single(url)
-            if data:
-                results.append(data)
-            else:
-                vid = self.extract_video_id(url) or 'N/A'
-                results.append({
-                    'video_id': vid,
-                    'title': 'TIMEOUT: Try Again',
-                    'upload_date': 'N/A',
-                    'upload_time': 'N/A',
-                    'duration': 'N/A',
-                    'views': 0,
-                    'likes': 0,
-                    'dislikes': 0,
-                    'comments': 0,
-                    'engagement_rate_%': 0,
-                    'performance_score': 0,
-                    'description': 'Check internet or use API key',
-                    'channel_title': 'N/A',
-                    'country': 'N/A',
-                    'category': 'N/A',
-                    'hashtags': [],
-                    'thumbnail': '',
-                    'url': url,
-                    'download_url': None
-                })
-            # Pakistan ISP Fix: Delay + Random
-            time.sleep(5 + random.uniform(0, 2))
+        self.response_bytes = 0
+        self.timer.reset()
+        control = control or RunControl()
+        self._local.control = control
+        if self.ytdlp_pool:
+            control.on_cancel(lambda: self.ytdlp_pool.abort(control))
+        if self.use_api:
+            # Per-run transport: closing it on cancel aborts the request in flight
+            http = self._local.http = build_http()
+            control.on_cancel(http.close)
+        try:
+            for idx, url in enumerate(urls):
+                control.checkpoint()
+                print(f"Analyzing {idx+1}/{total}: {url}")
+                with self.timer.stage('video') as st:
+                    try:
+                        data, error = self.analyze_single(url), None
+                    except FetchError as e:
+                        data, error = None, e
+                        st.error(e)
+                if data:
+                    results.append(data)
+                    self.snapshots.append([data])
+                    self.tag_index.add(data)
+                else:
+                    print(f"Failed ({error.error_class}): {error}")
+                    vid = self.extract_video_id(url) or 'N/A'
+                    results.append({
+                        'video_id': vid,
+                        'title': f"FAILED: {LABELS[error.error_class]}",
+                        'upload_date': 'N/A',
+                        'upload_time': 'N/A',
+                        'duration': 'N/A',
+                        'views': 0,
+                        'likes': 0,
+                        'dislikes': 0,
+                        'comments': 0,
+                        'engagement_rate_%': 0,
+                        'performance_score': 0,
+                        'description': str(error),
+                        'channel_title': 'N/A',
+                        'country': 'N/A',
+                        'category': 'N/A',
+                        'hashtags': [],
+                        'thumbnail': '',
+                        'url': url,
+                        'download_url': None,
+                        'error': error.error_class,
+                    })
+                # Pakistan ISP Fix: Delay + Random
+                with self.timer.stage('sleep'):
+                    control.sleep(REQUEST_DELAY[0] + random.uniform(0, REQUEST_DELAY[1]))
+        except Cancelled:
+            print(f"Cancelled after {len(results)}/{total} videos; keeping partial results.")
+        finally:
+            self._local.control = None
+            self._local.http = None
+        if control.cancelled:
+            # Start is live again, so a new run may already share this analyzer: nothing that
+            # cannot be cancelled (reference calls, store, dedup) and no timer or summary writes
+            apply_metrics(results)  # CPU only; the partial rows still get their scores
+            return results
+        self.enrich(results)
+        with self.timer.stage('metrics'):
+            apply_metrics(results)
+        self.tag_index.save()
+        with self.timer.stage('store'):
+            run = self.store.record_run(results, 'gui', 'api' if self.use_api else 'ytdlp')
+        print(f"Stored as run {run} in {RESULTS_DB}")
+        with self.timer.stage('dedup'):
+            dup = self.dedup.add(results)
+        if dup['duplicates']:
+            print(f"Near-duplicates: {dup['duplicates']} of {dup['added']} new videos match earlier ones → {DEDUP_DB}")
+        if self.use_api:
+            print(f"API payload: {self.response_bytes / 1024:.1f} KB for {total} videos")
+        self.timer.write_json(RUN_SUMMARY_FILE)
+        self.timer.write_prometheus(METRICS_FILE)
+        print(f"Timing: {self.timer.readout()}")
+        if self.proxies.enabled:
+            print(f"Proxies: {self.proxies.stats()}")
         return results
 
 
@@ -354,10 +502,24 @@ class YouTubeAnalyzerGUI:
         self.config = self.load_config()
         self.analyzer = None
         self.results = []
+        self.thumbs = ThumbnailCache(THUMB_DIR)
+        self._thumb_images = []  # keep PhotoImage refs alive
+        self.profiler = None      # last profiled run; saved next to the next export
+        self.control = None       # RunControl of the current run
+        self.downloader = None    # running Download All, if any
+        self.exporting = None     # RunControl of the running export, if any
+        self.running = False
 
         self.setup_ui()
         self.load_api_key()
+        if self.config.get("metrics_port"):
+            port = int(self.config["metrics_port"])
+            try:
+                serve_metrics(lambda: self.analyzer.timer, port)
+            except OSError as e:
+                print(f"Metrics port {port} busy ({e}); running without the /metrics endpoint")
         Thread(target=update_ytdlp, daemon=True).start()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def load_config(self):
         if os.path.exists(CONFIG_FILE):
@@ -422,6 +584,18 @@ class YouTubeAnalyzerGUI:
         self.analyze_btn = tk.Button(btn_frame, text="START BULK ANALYSIS", font=('Segoe UI', 12, 'bold'),
                                      command=self.start_analysis, bg=THEME["success"], fg="white", width=25, height=2)
         self.analyze_btn.pack()
+        run_frame = tk.Frame(btn_frame, bg=THEME["bg"])
+        run_frame.pack(pady=(8, 0))
+        self.pause_btn = tk.Button(run_frame, text="Pause", command=self.toggle_pause, state='disabled',
+                                   bg=THEME["btn_bg"], fg=THEME["btn_fg"], width=12)
+        self.pause_btn.pack(side='left', padx=4)
+        self.cancel_btn = tk.Button(run_frame, text="Cancel", command=self.cancel_analysis, state='disabled',
+                                    bg=THEME["btn_bg"], fg=THEME["btn_fg"], width=12)
+        self.cancel_btn.pack(side='left', padx=4)
+        self.profile_var = tk.BooleanVar(value=bool(self.config.get("profile_runs")))
+        tk.Checkbutton(btn_frame, text="Profile runs (cProfile + tracemalloc)", variable=self.profile_var,
+                       command=self.toggle_profiling, fg="#888", bg=THEME["bg"], selectcolor=THEME["entry_bg"],
+                       activebackground=THEME["bg"]).pack(pady=(8, 0))
 
         self.status_label = tk.Label(frame, text="Ready - Use API Key for 100% Success", fg="#888", bg=THEME["bg"])
         self.status_label.pack(pady=5)
@@ -433,18 +607,44 @@ class YouTubeAnalyzerGUI:
 
         export_frame = tk.Frame(frame, bg=THEME["bg"])
         export_frame.pack(fill='x', pady=10, padx=20)
-        tk.Button(export_frame, text="Export CSV", command=lambda: self.export('csv'), bg=THEME["success"], fg="white").pack(side='left', padx=5)
-        tk.Button(export_frame, text="Export Excel", command=lambda: self.export('xlsx'), bg=THEME["btn_bg"], fg="white").pack(side='left', padx=5)
-        tk.Button(export_frame, text="Export JSON", command=lambda: self.export('json'), bg=THEME["accent"], fg="white").pack(side='left', padx=5)
+        chosen = self.config.get("export_formats", ['csv'])
+        self.format_vars = {}
+        for fmt, label in zip(FORMATS, ("CSV", "Excel", "JSON")):
+            var = self.format_vars[fmt] = tk.BooleanVar(value=fmt in chosen)
+            tk.Checkbutton(export_frame, text=label, variable=var, fg=THEME["fg"], bg=THEME["bg"],
+                           selectcolor=THEME["entry_bg"], activebackground=THEME["bg"]).pack(side='left')
+        self.export_btn = tk.Button(export_frame, text="Export", command=self.export, bg=THEME["success"], fg="white")
+        self.export_btn.pack(side='left', padx=5)
+        self.export_cancel_btn = tk.Button(export_frame, text="Cancel Export", command=self.cancel_export,
+                                           state='disabled', bg=THEME["btn_bg"], fg=THEME["btn_fg"])
+        self.export_cancel_btn.pack(side='left', padx=5)
+        tk.Button(export_frame, text="Thumbnails", command=self.fetch_thumbnails, bg="#9c27b0", fg="white").pack(side='left', padx=5)
         tk.Button(export_frame, text="Download All", command=self.download_all, bg="#e91e63", fg="white").pack(side='right', padx=5)
         tk.Button(export_frame, text="Clear", command=self.clear_results, bg=THEME["danger"], fg="white").pack(side='right', padx=5)
 
+        export_status = tk.Frame(frame, bg=THEME["bg"])
+        export_status.pack(fill='x', padx=20)
+        self.export_progress = ttk.Progressbar(export_status, mode='determinate', length=300)
+        self.export_progress.pack(side='left')
+        self.export_label = tk.Label(export_status, text="", fg="#888", bg=THEME["bg"])
+        self.export_label.pack(side='left', padx=10)
+
+        filter_frame = tk.Frame(frame, bg=THEME["bg"])
+        filter_frame.pack(fill='x', padx=20)
+        tk.Label(filter_frame, text="Filter all runs:", fg=THEME["fg"], bg=THEME["bg"]).pack(side='left')
+        self.filter_entry = tk.Entry(filter_frame, width=60, bg=THEME["entry_bg"], fg=THEME["fg"], insertbackground=THEME["fg"])
+        self.filter_entry.pack(side='left', padx=5)
+        self.filter_entry.bind('<Return>', self.apply_filter)
+        tk.Button(filter_frame, text="Filter", command=self.apply_filter, bg=THEME["btn_bg"], fg="white").pack(side='left', padx=5)
+        tk.Label(filter_frame, text="e.g. channel:\"Name\" category:Music views>1m after:2024-01-01 sort:-likes",
+                 fg="#888", bg=THEME["bg"]).pack(side='left', padx=5)
+
         tree_frame = tk.Frame(frame, bg=THEME["bg"])
         tree_frame.pack(fill='both', expand=True, padx=20, pady=10)
 
         self.tree = ttk.Treeview(tree_frame, columns=(
             'title', 'views', 'likes', 'duration', 'country', 'score', 'eng', 'download'
-        ), show='headings', height=15)
+        ), show='tree headings', height=15)
 
         vsb = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
         hsb = ttk.Scrollbar(tree_frame, orient="horizontal", command=self.tree.xview)
@@ -454,6 +654,8 @@ class YouTubeAnalyzerGUI:
         vsb.pack(side='right', fill='y')
         hsb.pack(side='bottom', fill='x')
 
+        self.tree.heading('#0', text='Thumb')
+        self.tree.column('#0', width=PREVIEW_SIZE[0] + 10, stretch=False)
         self.tree.heading('title', text='Title')
         self.tree.heading('views', text='Views')
         self.tree.heading('likes', text='Likes')
@@ -477,7 +679,7 @@ class YouTubeAnalyzerGUI:
     def load_api_key(self):
         key = self.config.get("api_key", "")
         self.api_entry.insert(0, key)
-        self.analyzer = YouTubeAnalyzerPro(key)
+        self.analyzer = YouTubeAnalyzerPro(key, self.config.get("api_columns"), ProxyPool(self.config.get("proxies")))
         self.update_status()
 
     def update_status(self):
@@ -495,7 +697,7 @@ class YouTubeAnalyzerGUI:
             return
         self.config["api_key"] = key
         self.save_config()
-        self.analyzer = YouTubeAnalyzerPro(key)
+        self.analyzer = YouTubeAnalyzerPro(key, self.config.get("api_columns"), ProxyPool(self.config.get("proxies")))
         self.update_status()
         messagebox.showinfo("Success", "API Key Saved!")
 
@@ -505,16 +707,59 @@ class YouTubeAnalyzerGUI:
             self.file_entry.delete(0, tk.END)
             self.file_entry.insert(0, path)
 
+    def toggle_profiling(self):
+        self.config["profile_runs"] = self.profile_var.get()
+        self.save_config()
+
     def start_analysis(self):
         if not self.analyzer:
             messagebox.showerror("Error", "Save API Key first!")
             return
 
+        if self.running:
+            return
+
+        self.profiler = RunProfiler() if self.profile_var.get() else None
+        self.control = RunControl()
+        self.running = True
         self.analyze_btn.config(state='disabled', text="Analyzing...")
+        self.pause_btn.config(state='normal', text="Pause")
+        self.cancel_btn.config(state='normal')
         self.progress.start(10)
-        Thread(target=self.run_analysis, daemon=True).start()
+        Thread(target=self.run_analysis, args=(self.control,), daemon=True).start()
 
-    def run_analysis(self):
+    def toggle_pause(self):
+        if not self.running:
+            return
+        if self.control.paused:
+            self.control.resume()
+            self.pause_btn.config(text="Pause")
+            self.analyze_btn.config(text="Analyzing...")
+            self.progress.start(10)
+        else:
+            self.control.pause()
+            self.pause_btn.config(text="Resume")
+            self.analyze_btn.config(text="Paused")
+            self.progress.stop()
+
+    def cancel_analysis(self):
+        """Abort the run; its partial results still land in the table. A new run can start at once."""
+        if not self.running:
+            return
+        self.control.cancel()
+        print("Cancelling...")
+        self.stop_analysis()
+
+    def on_close(self):
+        if self.control:
+            self.control.cancel()
+        if self.downloader:
+            self.downloader.cancel()  # .part files stay; the next Download All resumes them
+        if self.exporting:
+            self.exporting.cancel()
+        self.root.destroy()
+
+    def run_analysis(self, control: RunControl):
         urls = []
         url = self.url_entry.get().strip()
         file_path = self.file_entry.get().strip()
@@ -535,41 +780,114 @@ class YouTubeAnalyzerGUI:
             self.root.after(0, self.stop_analysis)
             return
 
-        self.results = self.analyzer.analyze_urls(urls)
-        self.root.after(0, self.show_results)
+        profiler = self.profiler
+        if profiler:
+            profiler.start()
+        try:
+            results = self.analyzer.analyze_urls(urls, control)
+            if self.config.get("fetch_thumbnails") and not control.cancelled:
+                self.thumbs.fetch_all(results)
+            if self.config.get("fetch_transcripts") and self.analyzer.ytdlp_pool and not control.cancelled:
+                index = TranscriptIndex(TRANSCRIPTS_DB, self.analyzer.ytdlp_pool, self.analyzer.proxies,
+                                        self.config.get("transcript_langs"))
+                st = index.index([r.get('video_id') for r in results])
+                print(f"Transcripts: {st['indexed']} indexed, {st['none']} without captions, "
+                   f"{st['cached']} cached, {st['failed']} failed → {TRANSCRIPTS_DB}")
+        finally:
+            if profiler:
+                profiler.stop()
+        if control is not self.control:
+            return  # superseded by a newer run; leave its table alone
+        self.results = results
+        if profiler:
+            print(profiler.report())
+            print("Profile will be saved next to the next export.")
+        self.root.after(0, lambda: self.show_results(notify=not control.cancelled))
         self.root.after(0, self.stop_analysis)
 
-    def show_results(self):
+    def show_results(self, notify=True):
         for item in self.tree.get_children():
             self.tree.delete(item)
+        self._thumb_images = []
 
         if not self.results:
             messagebox.showinfo("No Data", "No videos analyzed.")
             return
 
+        previews = self.thumbs.previews
+        if any(previews.get(r.get('video_id')) for r in self.results):
+            ttk.Style().configure("Treeview", rowheight=PREVIEW_SIZE[1] + 6)
+
         for r in self.results:
             # FIXED: Use .get() to avoid KeyError
             title = r.get('title', 'N/A')[:50] + '...' if len(r.get('title', '')) > 50 else r.get('title', 'N/A')
             views = f"{r.get('views', 0)//1000}K" if r.get('views', 0) >= 1000 else str(r.get('views', 0))
             likes = f"{r.get('likes', 0)//1000}K" if r.get('likes', 0) >= 1000 else str(r.get('likes', 0))
             dl_text = "Download" if r.get('download_url') else "Not Available"
+            img = ''
+            preview = previews.get(r.get('video_id'))
+            if preview:
+                try:
+                    img = tk.PhotoImage(file=preview)
+                    self._thumb_images.append(img)
+                except tk.TclError:
+                    img = ''
 
-            self.tree.insert('', 'end', values=(
+            self.tree.insert('', 'end', image=img, values=(
                 title, views, likes, r.get('duration', 'N/A'), r.get('country', 'N/A'),
                 r.get('performance_score', 0), f"{r.get('engagement_rate_%', 0):.1f}%", dl_text
             ), tags=(r.get('download_url'),))
 
-        messagebox.showinfo("Complete", f"Analyzed {len(self.results)} videos!")
+        if notify:
+            messagebox.showinfo("Complete", f"Analyzed {len(self.results)} videos!")
 
     def stop_analysis(self):
+        self.running = False
         self.progress.stop()
         self.analyze_btn.config(state='normal', text="START BULK ANALYSIS")
+        self.pause_btn.config(state='disabled', text="Pause")
+        self.cancel_btn.config(state='disabled')
 
     def clear_results(self):
+        if self.running:
+            self.control.cancel()
+            self.stop_analysis()
+            self.control = None  # drop the cancelled run's partial results too
         self.results = []
+        self._thumb_images = []
         for item in self.tree.get_children():
             self.tree.delete(item)
 
+    def apply_filter(self, event=None):
+        """Query the results store (every stored run) and show the matches; empty filter = last run."""
+        if not self.analyzer:
+            messagebox.showerror("Error", "Save API Key first!")
+            return
+        text = self.filter_entry.get().strip() or 'run:last'
+        Thread(target=self._apply_filter, args=(text,), daemon=True).start()
+
+    def _apply_filter(self, text):
+        try:
+            rows = self.analyzer.store.query(text)
+        except ValueError as e:
+            self.root.after(0, lambda: messagebox.showerror("Filter", str(e)))
+            return
+        print(f"Filter '{text}': {len(rows)} rows")
+        self.results = rows
+        self.root.after(0, lambda: self.show_results(notify=False))
+
+    def fetch_thumbnails(self):
+        if not self.results:
+            messagebox.showwarning("No Data", "Analyze first!")
+            return
+        Thread(target=self._fetch_thumbnails, args=(list(self.results),), daemon=True).start()
+
+    def _fetch_thumbnails(self, rows):
+        self.thumbs.fetch_all(rows)
+        st = self.thumbs.stats
+        print(f"Thumbnails: {st['downloads']} downloaded, {st['hits']} cached, {st['missing']} missing")
+        self.root.after(0, lambda: self.show_results(notify=False))
+
     def open_download_link(self, event):
         item = self.tree.selection()
         if not item:
@@ -587,37 +905,106 @@ class YouTubeAnalyzerGUI:
         if not folder:
             return
         messagebox.showinfo("Starting", "Downloading all videos...")
-        Thread(target=self._download_all, args=(folder,), daemon=True).start()
-
-    def _download_all(self, folder):
-        for r in self.results:
-            url = r.get('download_url')
-            if url:
-                try:
-                    subprocess.run(["yt-dlp", "-o", f"{folder}/%(title)s.%(ext)s", url], check=True)
-                except:
-                    pass
-
-    def export(self, format_type):
+        Thread(target=self._download_all, args=(folder, list(self.results)), daemon=True).start()
+
+    def _download_all(self, folder, rows):
+        if self.downloader:
+            self.downloader.cancel()
+        downloader = self.downloader = Downloader(
+            folder, float(self.config.get("download_rate", DEFAULT_RATE)),
+            int(self.config.get("download_workers", DOWNLOAD_WORKERS)),
+            proxies=self.analyzer.proxies if self.analyzer else None, progress=self._download_progress)
+        try:
+            downloader.download_all(rows)
+        except RuntimeError as e:
+            print(f"Download failed: {e}")
+            return
+        st = downloader.stats
+        print(f"Downloads: {st['done']} done, {st['failed']} failed, {st['cancelled']} cancelled | "
+              f"{st['resumed']} resumed, {st['fresh']} re-extracted | {st['bytes'] / 2**20:.1f} MB")
+
+    def _download_progress(self, ev):
+        if ev['status'] == 'downloading' and ev['total']:
+            speed = f" at {ev['speed'] / 2**20:.1f} MB/s" if ev['speed'] else ''
+            print(f"Downloading {ev['video_id']}: {100 * ev['downloaded'] / ev['total']:.0f}%{speed}")
+        elif ev['status'] == 'finished':
+            print(f"Downloaded: {os.path.basename(ev['filename'] or '')}")
+        elif ev['status'] == 'failed':
+            print(f"Download failed {ev['video_id']}: {ev.get('error')}")
+
+    def export(self):
         if not self.results:
             messagebox.showwarning("No Data", "Analyze first!")
             return
+        if self.exporting:
+            messagebox.showinfo("Export Running", "Wait for the current export or cancel it.")
+            return
+        formats = [fmt for fmt in FORMATS if self.format_vars[fmt].get()]
+        if not formats:
+            messagebox.showwarning("No Format", "Tick CSV, Excel and/or JSON.")
+            return
+        self.config["export_formats"] = formats
+        self.save_config()
 
-        path = filedialog.asksaveasfilename(defaultextension=f".{format_type}")
+        path = filedialog.asksaveasfilename(defaultextension=f".{formats[0]}")
         if not path:
             return
-
-        df = pd.DataFrame(self.results)
-        df['hashtags'] = df['hashtags'].apply(lambda x: ', '.join(x) if isinstance(x, list) else '')
-        df['download_url'] = df['download_url'].apply(lambda x: x or 'N/A')
-
-        if format_type == 'csv':
-            df.to_csv(path, index=False, encoding='utf-8')
-        elif format_type == 'xlsx':
-            df.to_excel(path, index=False)
-        elif format_type == 'json':
-            df.to_json(path, orient='records', indent=2, force_ascii=False)
-        messagebox.showinfo("Exported", f"Saved to {path}")
+        paths = export_paths(path, formats)
+
+        # Snapshot: a run finishing (or Clear) mid-export swaps self.results, not this list
+        rows = list(self.results)
+        control = self.exporting = RunControl()
+        self.export_btn.config(state='disabled')
+        self.export_cancel_btn.config(state='normal')
+        self.export_progress.config(maximum=len(rows), value=0)
+        self.export_label.config(text=f"Exporting {len(rows)} rows...")
+        Thread(target=self._export, args=(rows, paths, control), daemon=True).start()
+
+    def cancel_export(self):
+        if self.exporting:
+            self.exporting.cancel()
+            self.export_label.config(text="Cancelling export...")
+
+    def _export(self, rows, paths, control):
+        profiler = self.profiler
+        if profiler:
+            profiler.start()
+        error = None
+        try:
+            columns = export_columns(rows, self.analyzer.columns if self.analyzer else None)
+            export_rows(rows, paths, columns, defaults={'download_url': 'N/A'}, control=control,
+                        progress=lambda done, total: self.root.after(0, self._export_progress, done, total))
+        except Cancelled:
+            error = "cancelled"
+        except Exception as e:
+            error = str(e)
+        finally:
+            if profiler:
+                profiler.stop()
+        if error is None and profiler:
+            prof = profiler.write(profile_base(next(iter(paths.values()))))
+            print(profiler.report())
+            print(f"Profile: {prof['prof']} | flamegraph stacks: {prof['collapsed']}")
+        self.root.after(0, self._export_done, paths, error)
+
+    def _export_progress(self, done, total):
+        self.export_progress.config(value=done)
+        self.export_label.config(text=f"Exporting {done}/{total} rows...")
+
+    def _export_done(self, paths, error):
+        self.exporting = None
+        self.export_btn.config(state='normal')
+        self.export_cancel_btn.config(state='disabled')
+        if error == "cancelled":
+            self.export_progress.config(value=0)
+            self.export_label.config(text="Export cancelled")
+            print("Export cancelled; no files written.")
+        elif error:
+            self.export_label.config(text="Export failed")
+            messagebox.showerror("Export Failed", error)
+        else:
+            self.export_label.config(text="Export complete")
+            messagebox.showinfo("Exported", "Saved to:\n" + "\n".join(paths.values()))
 
 
 # ========================================
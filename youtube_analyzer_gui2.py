@@ -13,24 +13,23 @@ Updated: November 17, 2025 10:40 AM PKT
 import os
 import sys
 import json
-import pandas as pd
-import requests
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 from datetime import datetime
 from typing import List, Dict, Optional
 import re
 import subprocess
-from threading import Thread
+from threading import Thread, Lock, local
 import webbrowser
 import time
 import random
 import logging
+from collections import deque
 
 # Optional: YouTube API
 try:
-    from googleapiclient.discovery import build
     from googleapiclient.errors import HttpError
+    from googleapiclient.http import build_http
     API_AVAILABLE = True
 except ImportError:
     API_AVAILABLE = False
@@ -42,8 +41,42 @@ try:
 except ImportError:
     YTDLP_AVAILABLE = False
 
+from youtube_analyzer_fields import build_api_request, wants
+from youtube_analyzer_apiclient import ClientPool
+from youtube_analyzer_snapshots import SnapshotStore
+from youtube_analyzer_metrics import apply_metrics
+from youtube_analyzer_index import TagIndex
+from youtube_analyzer_thumbs import ThumbnailCache, PREVIEW_SIZE
+from youtube_analyzer_timing import StageTimer, serve_metrics
+from youtube_analyzer_profile import RunProfiler, profile_base
+from youtube_analyzer_ytdlp_pool import shared_pool
+from youtube_analyzer_proxies import ProxyPool
+from youtube_analyzer_xlsx import export_columns
+from youtube_analyzer_export import export_rows, export_paths, FORMATS
+from youtube_analyzer_control import RunControl, Cancelled
+from youtube_analyzer_reference import ReferenceData, CHANNEL_COLUMNS
+from youtube_analyzer_store import ResultsStore
+from youtube_analyzer_transcripts import TranscriptIndex
+from youtube_analyzer_dedup import DedupIndex
+from youtube_analyzer_retry import RetryPolicy, FetchError, LABELS, NOT_FOUND, EXTRACTOR, as_fetch_error, check_response
+from youtube_analyzer_download import Downloader, DEFAULT_RATE, DOWNLOAD_WORKERS
+
 # Config
 CONFIG_FILE = "config.json"
+SNAPSHOT_DIR = "snapshots"
+TAG_INDEX_FILE = "tag_index.json"
+TAG_INDEX_SKETCH = 0  # >0: bounded top-K sketch with this many counters
+THUMB_DIR = "thumbnails"
+RUN_SUMMARY_FILE = "run_summary.json"
+REFERENCE_CACHE = "reference_cache.json"
+RESULTS_DB = "results.db"  # every run upserted here; the Results filter box queries it
+TRANSCRIPTS_DB = "transcripts.db"  # optional stage (config: fetch_transcripts, transcript_langs)
+DEDUP_DB = "dedup.db"  # MinHash/LSH near-duplicate clusters, updated every run
+METRICS_FILE = "metrics.prom"
+REQUEST_DELAY = (5, 2)  # yt-dlp mode: base seconds + random jitter between videos
+TIMING_READOUT_MS = 3000  # live p50/p95 line in the terminal pane
+LOG_MAX_LINES = 5000     # terminal pane ring buffer (config: log_max_lines)
+LOG_FLUSH_MS = 100       # terminal pane batch interval
 
 # ========================================
 #           PROFESSIONAL 3D THEME
@@ -74,17 +107,60 @@ USER_AGENTS = [
 #           CUSTOM LOGGER WITH GUI OUTPUT
 # ========================================
 class GUILogger(logging.Handler):
-    def __init__(self, text_widget):
-        super().__init__()
+    """Buffers formatted lines from any thread; the Tk thread flushes them in one insert per tick.
+
+    Records below the handler level are dropped by logging before format() runs.
+    The pane keeps at most max_lines lines; a backlog larger than that is cut to the newest lines.
+    """
+
+    def __init__(self, text_widget, max_lines: int = LOG_MAX_LINES, level=logging.INFO,
+                 flush_ms: int = LOG_FLUSH_MS):
+        super().__init__(level)
         self.text_widget = text_widget
+        self.max_lines = max_lines
+        self.flush_ms = flush_ms
         self.setFormatter(logging.Formatter('%(asctime)s | %(message)s', '%H:%M:%S'))
+        self._pending = deque(maxlen=max_lines)
+        self._dropped = 0
+        self._buf_lock = Lock()
+        self._job = text_widget.after(flush_ms, self._flush)
 
     def emit(self, record):
-        msg = self.format(record)
-        self.text_widget.config(state='normal')
-        self.text_widget.insert('end', msg + '\n')
-        self.text_widget.see('end')
-        self.text_widget.config(state='disabled')
+        try:
+            msg = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        with self._buf_lock:
+            if len(self._pending) == self.max_lines:
+                self._dropped += 1
+            self._pending.append(msg)
+
+    def _flush(self):
+        with self._buf_lock:
+            lines, self._pending = self._pending, deque(maxlen=self.max_lines)
+            dropped, self._dropped = self._dropped, 0
+        if lines:
+            text = '\n'.join(lines) + '\n'
+            if dropped:
+                text = f"... {dropped} older log lines skipped ...\n" + text
+            w = self.text_widget
+            follow = w.yview()[1] >= 0.999  # only auto-scroll if the user is at the bottom
+            w.config(state='normal')
+            w.insert('end', text)
+            excess = int(w.index('end-1c').split('.')[0]) - 1 - self.max_lines
+            if excess > 0:
+                w.delete('1.0', f'{excess + 1}.0')
+            w.config(state='disabled')
+            if follow:
+                w.see('end')
+        self._job = self.text_widget.after(self.flush_ms, self._flush)
+
+    def close(self):
+        if self._job:
+            self.text_widget.after_cancel(self._job)
+            self._job = None
+        super().close()
 
 # ========================================
 #           AUTO UPDATE yt-dlp
@@ -103,18 +179,32 @@ def update_ytdlp():
 #           YOUTUBE ANALYZER PRO CLASS
 # ========================================
 class YouTubeAnalyzerPro:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, columns: Optional[List[str]] = None,
+                 proxies: Optional[ProxyPool] = None):
         self.api_key = api_key
+        self.columns = columns
+        self.api_part, self.api_fields = build_api_request(columns)
+        self.response_bytes = 0
+        self.snapshots = SnapshotStore(SNAPSHOT_DIR)
+        self.tag_index = TagIndex(TAG_INDEX_FILE, TAG_INDEX_SKETCH)
+        self.store = ResultsStore(RESULTS_DB)
+        self.dedup = DedupIndex(DEDUP_DB)
+        self.timer = StageTimer()
+        self.ytdlp_pool = shared_pool() if YTDLP_AVAILABLE else None
+        self.proxies = proxies or ProxyPool()
+        self.retry = RetryPolicy()
+        self._local = local()  # per-run state: control, API transport
         self.use_api = API_AVAILABLE and bool(self.api_key)
         self.youtube = None
         if self.use_api:
             try:
-                self.youtube = build('youtube', 'v3', developerKey=self.api_key)
+                self.youtube = ClientPool(self.api_key)  # per-thread clients, discovery doc cached per process
                 self.youtube.videos().list(part='id', id='dQw4w9WgXcQ').execute()
                 logging.getLogger('gui').info("YouTube API connected.")
             except Exception as e:
                 logging.getLogger('gui').error(f"API Error: {e}")
                 self.use_api = False
+        self.reference = ReferenceData(self.youtube, REFERENCE_CACHE, self._execute) if self.use_api else None
         self.rtd_api = "https://returnyoutubedislikeapi.com/votes?videoId="
 
     def extract_video_id(self, url: str) -> Optional[str]:
@@ -139,53 +229,97 @@ class YouTubeAnalyzerPro:
             parts = [int(p) for p in d.split() if p.isdigit()]
             h, m, s = (parts + [0, 0, 0])[:3]
             return f"{h:02d}:{m:02d}:{s:02d}"
-        except: return "N/A"
+        except ValueError: return "N/A"
 
-    def get_dislikes(self, video_id: str) -> int:
-        try:
-            r = requests.get(self.rtd_api + video_id, timeout=5)
-            return r.json().get("dislikes", 0) if r.status_code == 200 else 0
-        except: return 0
+    def _control(self) -> Optional[RunControl]:
+        return getattr(self._local, 'control', None)
 
-    def get_video_data_api(self, video_id: str) -> Optional[Dict]:
-        try:
-            req = self.youtube.videos().list(part='snippet,contentDetails,statistics', id=video_id)
-            res = req.execute()
-            if not res['items']: return None
-            item = res['items'][0]
-            sn, st, cd = item['snippet'], item['statistics'], item['contentDetails']
-
-            views = int(st.get('viewCount', 0)) if st.get('viewCount') else 0
-            likes = int(st.get('likeCount', 0)) if st.get('likeCount') else 0
-            comments = int(st.get('commentCount', 0)) if st.get('commentCount') else 0
-            dislikes = self.get_dislikes(video_id)
-            duration = self.format_duration(cd.get('duration', ''))
-            engagement = round((likes / views * 100), 2) if views > 0 else 0
-            score = min(100, (views // 10000) + (likes // 1000) + int(engagement * 10))
-
-            country = sn.get('country', 'Global')
-            lang_map = {'en': 'US', 'ur': 'PK', 'hi': 'IN'}
-            if country == 'Global' and sn.get('defaultLanguage'):
-                country = lang_map.get(sn['defaultLanguage'][:2], 'Global')
-
-            cat_map = {'10': 'Music', '17': 'Sports', '20': 'Gaming', '24': 'Entertainment', '25': 'News', '27': 'Education'}
-            category = cat_map.get(sn.get('categoryId', ''), 'Other')
-
-            dt = datetime.fromisoformat(sn['publishedAt'].replace('Z', '+00:00'))
-
-            return {
-                'video_id': video_id, 'title': sn['title'], 'upload_date': dt.date().isoformat(),
-                'upload_time': dt.time().strftime('%H:%M:%S'), 'duration': duration, 'views': views,
-                'likes': likes, 'dislikes': dislikes, 'comments': comments, 'engagement_rate_%': engagement,
-                'performance_score': score, 'description': sn['description'][:500] + '...' if len(sn['description']) > 500 else sn['description'],
-                'channel_title': sn['channelTitle'], 'country': country, 'category': category,
-                'hashtags': self.extract_hashtags(sn['description'] + ' ' + sn['title']),
-                'thumbnail': f"https://img.youtube.com/vi/{video_id}/maxresdefault.jpg",
-                'url': f'https://www.youtube.com/watch?v={video_id}', 'download_url': None
-            }
-        except Exception as e:
-            logging.getLogger('gui').error(f"API fetch failed: {e}")
-            return None
+    def _io(self, fn, *args, **kwargs):
+        """Blocking call that the current run's Cancel can abandon."""
+        control = self._control()
+        return control.call(fn, *args, **kwargs) if control else fn(*args, **kwargs)
+
+    def _retry(self, fn):
+        """fn() under the retry policy; backoff sleeps go through the run's control so Cancel cuts them short."""
+        control = self._control()
+        log = logging.getLogger('gui')
+        return self.retry.call(fn, sleep=control.sleep if control else time.sleep,
+                               on_retry=lambda e, wait: log.warning(f"Retry in {wait:.1f}s ({e.error_class}): {e}"))
+
+    def get_dislikes(self, video_id: str) -> Optional[int]:
+        """None when the dislike service has no answer; the video itself is fine."""
+        with self.timer.stage('dislikes') as st:
+            try:
+                return self._retry(lambda: check_response(
+                    self._io(self.proxies.get, self.rtd_api + video_id, timeout=5)).json().get("dislikes", 0))
+            except FetchError as e:
+                st.error(e); return None
+
+    def _execute(self, req):
+        # Count raw payload bytes before googleapiclient parses the JSON
+        postproc = req.postproc
+        def counting(resp, content):
+            self.response_bytes += len(content or b'')
+            return postproc(resp, content)
+        req.postproc = counting
+        return self._io(req.execute, http=getattr(self._local, 'http', None))
+
+    def enrich(self, rows: List[Dict]):
+        """Channel stats + category names from the cached reference data (API mode only)."""
+        if not self.reference or not rows:
+            return
+        with self.timer.stage('reference') as st:
+            try:
+                self.reference.enrich(rows, channels=wants(self.columns, *CHANNEL_COLUMNS),
+                                      categories=wants(self.columns, 'category', 'performance_score'))
+            except Exception as e:
+                st.error(e)
+                logging.getLogger('gui').warning(f"Reference data failed: {e}")
+
+    def get_video_data_api(self, video_id: str) -> Dict:
+        """Raises FetchError (classified) when the video cannot be fetched."""
+        with self.timer.stage('api') as st:
+            try:
+                res = self._retry(lambda: self._execute(
+                    self.youtube.videos().list(part=self.api_part, id=video_id, fields=self.api_fields)))
+            except FetchError as e:
+                st.error(e); raise
+            if not res.get('items'):
+                st.error(NOT_FOUND)
+                raise FetchError(NOT_FOUND, f"{video_id}: deleted, private or never existed")
+        item = res['items'][0]
+        sn, stats, cd = item.get('snippet', {}), item.get('statistics', {}), item.get('contentDetails', {})
+
+        views = int(stats.get('viewCount', 0)) if stats.get('viewCount') else 0
+        likes = int(stats.get('likeCount', 0)) if stats.get('likeCount') else 0
+        comments = int(stats.get('commentCount', 0)) if stats.get('commentCount') else 0
+        dislikes = self.get_dislikes(video_id) if wants(self.columns, 'dislikes', 'like_dislike_ratio') else 0
+        duration = self.format_duration(cd.get('duration', ''))
+
+        country = sn.get('country', 'Global')
+        lang_map = {'en': 'US', 'ur': 'PK', 'hi': 'IN'}
+        if country == 'Global' and sn.get('defaultLanguage'):
+            country = lang_map.get(sn['defaultLanguage'][:2], 'Global')
+
+        cat_map = {'10': 'Music', '17': 'Sports', '20': 'Gaming', '24': 'Entertainment', '25': 'News', '27': 'Education'}
+        category = cat_map.get(sn.get('categoryId', ''), 'Other')
+
+        published = sn.get('publishedAt')
+        dt = datetime.fromisoformat(published.replace('Z', '+00:00')) if published else None
+        desc = sn.get('description', '')
+
+        return {
+            'video_id': video_id, 'title': sn.get('title', 'N/A'),
+            'upload_date': dt.date().isoformat() if dt else 'N/A',
+            'upload_time': dt.time().strftime('%H:%M:%S') if dt else 'N/A', 'duration': duration, 'views': views,
+            'likes': likes, 'dislikes': dislikes, 'comments': comments, 'engagement_rate_%': 0,
+            'performance_score': 0, 'description': desc[:500] + '...' if len(desc) > 500 else desc,
+            'channel_title': sn.get('channelTitle', 'N/A'), 'channel_id': sn.get('channelId', 'N/A'),
+            'country': country, 'category': category, 'category_id': sn.get('categoryId', ''),
+            'hashtags': self.extract_hashtags(desc + ' ' + sn.get('title', '')),
+            'thumbnail': f"https://img.youtube.com/vi/{video_id}/maxresdefault.jpg",
+            'url': f'https://www.youtube.com/watch?v={video_id}', 'download_url': None
+        }
 
     def get_download_url_ytdlp(self, url: str) -> Optional[str]:
         if not YTDLP_AVAILABLE: return None
@@ -195,90 +329,148 @@ class YouTubeAnalyzerPro:
             'http_headers': {'User-Agent': random.choice(USER_AGENTS)},
             'extractor_args': {'youtube': {'skip': ['hls', 'dash', 'sabr'], 'player_client': ['android', 'ios']}}
         }
-        try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
+        token = self._control()
+        with self.timer.stage('ytdlp_download_url') as st:
+            try:
+                info = self._retry(lambda: self._io(self.proxies.call, lambda p: self.ytdlp_pool.extract(
+                    url, {**ydl_opts, **p.ytdlp_opts}, want='url', token=token), key=url))
                 return info.get('url') if info else None
-        except Exception as e:
-            logging.getLogger('gui').warning(f"Direct URL failed: {e}")
-            return None
-
-    def get_video_data_ytdlp(self, url: str) -> Optional[Dict]:
-        if not YTDLP_AVAILABLE: return None
+            except FetchError as e:
+                st.error(e)
+                logging.getLogger('gui').warning(f"Direct URL failed ({e.error_class}): {e}")
+                return None
+
+    def get_video_data_ytdlp(self, url: str) -> Dict:
+        """Raises FetchError (classified) when the video cannot be fetched."""
+        if not YTDLP_AVAILABLE: raise FetchError(EXTRACTOR, "yt-dlp is not installed")
         ydl_opts = {
             'quiet': True, 'no_warnings': True, 'extract_flat': True, 'skip_download': True,
-            'ignoreerrors': True, 'retries': 3, 'socket_timeout': 30,
+            'retries': 3, 'socket_timeout': 30,
             'http_headers': {'User-Agent': random.choice(USER_AGENTS)},
             'extractor_args': {'youtube': {'skip': ['hls', 'dash', 'sabr'], 'player_client': ['android', 'ios']}}
         }
-        try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                if not info or 'entries' in info: return None
-                vid = info.get('id')
-                if not vid: return None
-                upload = info.get('upload_date')
-                dt = datetime.strptime(upload, '%Y%m%d') if upload else datetime.now()
-                dur = info.get('duration', 0)
-                dur_str = f"{dur//3600:02d}:{(dur%3600)//60:02d}:{dur%60:02d}" if dur else "N/A"
-                views = info.get('view_count', 0) or 0
-                likes = info.get('like_count', 0) or 0
-                comments = info.get('comment_count', 0) or 0
-                dislikes = self.get_dislikes(vid)
-                engagement = round((likes / views * 100), 2) if views > 0 else 0
-                score = min(100, (views // 10000) + (likes // 1000) + int(engagement * 10))
-                download_url = self.get_download_url_ytdlp(url)
-                return {
-                    'video_id': vid, 'title': info.get('title', 'N/A'), 'upload_date': dt.date().isoformat(),
-                    'upload_time': dt.time().strftime('%H:%M:%S'), 'duration': dur_str, 'views': views,
-                    'likes': likes, 'dislikes': dislikes, 'comments': comments, 'engagement_rate_%': engagement,
-                    'performance_score': score, 'description': (info.get('description', 'N/A')[:500] + '...') if info.get('description') else 'N/A',
-                    'channel_title': info.get('uploader', 'N/A'), 'country': 'N/A',
-                    'category': info.get('categories', ['Other'])[0] if info.get('categories') else 'Other',
-                    'hashtags': self.extract_hashtags(info.get('description', '') + ' ' + info.get('title', '')),
-                    'thumbnail': info.get('thumbnail', ''), 'url': url, 'download_url': download_url
-                }
-        except Exception as e:
-            logging.getLogger('gui').error(f"yt-dlp failed: {e}")
-            return None
+        token = self._control()
+        with self.timer.stage('ytdlp_metadata') as st:
+            try:
+                info = self._retry(lambda: self._io(self.proxies.call, lambda p: self.ytdlp_pool.extract(
+                    url, {**ydl_opts, **p.ytdlp_opts}, token=token), key=url))
+            except FetchError as e:
+                st.error(e); raise
+            if not info or 'entries' in info or not info.get('id'):
+                st.error(NOT_FOUND)
+                raise FetchError(NOT_FOUND, f"No single video at {url}")
+        vid = info['id']
+        upload = info.get('upload_date')
+        dt = datetime.strptime(upload, '%Y%m%d') if upload else datetime.now()
+        dur = info.get('duration', 0)
+        dur_str = f"{dur//3600:02d}:{(dur%3600)//60:02d}:{dur%60:02d}" if dur else "N/A"
+        views = info.get('view_count', 0) or 0
+        likes = info.get('like_count', 0) or 0
+        comments = info.get('comment_count', 0) or 0
+        dislikes = self.get_dislikes(vid)
+        download_url = self.get_download_url_ytdlp(url)
+        return {
+            'video_id': vid, 'title': info.get('title', 'N/A'), 'upload_date': dt.date().isoformat(),
+            'upload_time': dt.time().strftime('%H:%M:%S'), 'duration': dur_str, 'views': views,
+            'likes': likes, 'dislikes': dislikes, 'comments': comments, 'engagement_rate_%': 0,
+            'performance_score': 0, 'description': (info.get('description', 'N/A')[:500] + '...') if info.get('description') else 'N/A',
+            'channel_title': info.get('uploader', 'N/A'), 'country': 'N/A',
+            'category': info.get('categories', ['Other'])[0] if info.get('categories') else 'Other',
+            'hashtags': self.extract_hashtags(info.get('description', '') + ' ' + info.get('title', '')),
+            'thumbnail': info.get('thumbnail', ''), 'url': url, 'download_url': download_url
+        }
 
-    def analyze_single(self, url: str) -> Optional[Dict]:
-        vid = self.extract_video_id(url)
+    def analyze_single(self, url: str) -> Dict:
+        """Row for one video; raises FetchError (classified) on failure."""
+        with self.timer.stage('extract_video_id') as st:
+            vid = self.extract_video_id(url)
+            if not vid: st.error(NOT_FOUND)
         if not vid:
-            logging.getLogger('gui').warning(f"Invalid URL: {url}")
-            return None
+            raise FetchError(NOT_FOUND, f"Invalid URL: {url}")
         log = logging.getLogger('gui')
         log.info(f"Analyzing: {url}")
-        if self.use_api:
-            return self.get_video_data_api(vid)
-        else:
-            return self.get_video_data_ytdlp(url)
+        try:
+            if self.use_api:
+                return self.get_video_data_api(vid)
+            else:
+                return self.get_video_data_ytdlp(url)
+        except Exception as e:
+            raise as_fetch_error(e) from e  # parse errors etc. get a class too
 
-    def analyze_urls(self, urls: List[str]) -> List[Dict]:
+    def analyze_urls(self, urls: List[str], control: Optional[RunControl] = None) -> List[Dict]:
+        """Analyze in order; on cancel, stop and return what was gathered so far (not stored or summarized)."""
         results = []
         log = logging.getLogger('gui')
         total = len(urls)
-        for idx, url in enumerate(urls):
-            log.info(f"[{idx+1}/{total}] Processing...")
-            data = self.analyze_single(url)
-            if data:
-                results.append(data)
-                log.info(f"Success: {data.get('title', 'N/A')[:50]}...")
-            else:
-                vid = self.extract_video_id(url) or 'N/A'
-                results.append({
-                    'video_id': vid, 'title': 'FAILED: Timeout/Blocked', 'upload_date': 'N/A',
-                    'upload_time': 'N/A', 'duration': 'N/A', 'views': 0, 'likes': 0, 'dislikes': 0,
-                    'comments': 0, 'engagement_rate_%': 0, 'performance_score': 0,
-                    'description': 'Try API key or better network', 'channel_title': 'N/A',
-                    'country': 'N/A', 'category': 'N/A', 'hashtags': [], 'thumbnail': '',
-                    'url': url, 'download_url': None
-                })
-                log.error(f"Failed: {url}")
-            if not self.use_api:
-                delay = 5 + random.uniform(0, 2)
-                log.info(f"Waiting {delay:.1f}s...")
-                time.sleep(delay)
+        self.response_bytes = 0
+        self.timer.reset()
+        control = control or RunControl()
+        self._local.control = control
+        if self.ytdlp_pool:
+            control.on_cancel(lambda: self.ytdlp_pool.abort(control))
+        if self.use_api:
+            # Per-run transport: closing it on cancel aborts the request in flight
+            http = self._local.http = build_http()
+            control.on_cancel(http.close)
+        try:
+            for idx, url in enumerate(urls):
+                control.checkpoint()
+                log.info(f"[{idx+1}/{total}] Processing...")
+                with self.timer.stage('video') as st:
+                    try:
+                        data, error = self.analyze_single(url), None
+                    except FetchError as e:
+                        data, error = None, e
+                        st.error(e)
+                if data:
+                    results.append(data)
+                    self.snapshots.append([data])
+                    self.tag_index.add(data)
+                    log.info(f"Success: {data.get('title', 'N/A')[:50]}...")
+                else:
+                    vid = self.extract_video_id(url) or 'N/A'
+                    results.append({
+                        'video_id': vid, 'title': f"FAILED: {LABELS[error.error_class]}", 'upload_date': 'N/A',
+                        'upload_time': 'N/A', 'duration': 'N/A', 'views': 0, 'likes': 0, 'dislikes': 0,
+                        'comments': 0, 'engagement_rate_%': 0, 'performance_score': 0,
+                        'description': str(error), 'channel_title': 'N/A',
+                        'country': 'N/A', 'category': 'N/A', 'hashtags': [], 'thumbnail': '',
+                        'url': url, 'download_url': None, 'error': error.error_class
+                    })
+                    log.error(f"Failed ({error.error_class}): {url} - {error}")
+                if not self.use_api and idx + 1 < total:
+                    delay = REQUEST_DELAY[0] + random.uniform(0, REQUEST_DELAY[1])
+                    log.info(f"Waiting {delay:.1f}s...")
+                    with self.timer.stage('sleep'):
+                        control.sleep(delay)
+        except Cancelled:
+            log.warning(f"Cancelled after {len(results)}/{total} videos; keeping partial results.")
+        finally:
+            self._local.control = None
+            self._local.http = None
+        if control.cancelled:
+            # Start is live again, so a new run may already share this analyzer: nothing that
+            # cannot be cancelled (reference calls, store, dedup) and no timer or summary writes
+            apply_metrics(results)  # CPU only; the partial rows still get their scores
+            return results
+        self.enrich(results)
+        with self.timer.stage('metrics'):
+            apply_metrics(results)
+        self.tag_index.save()
+        with self.timer.stage('store'):
+            run = self.store.record_run(results, 'gui', 'api' if self.use_api else 'ytdlp')
+        log.info(f"Stored as run {run} in {RESULTS_DB}")
+        with self.timer.stage('dedup'):
+            dup = self.dedup.add(results)
+        if dup['duplicates']:
+            log.info(f"Near-duplicates: {dup['duplicates']} of {dup['added']} new videos match earlier ones → {DEDUP_DB}")
+        if self.use_api:
+            log.info(f"API payload: {self.response_bytes / 1024:.1f} KB for {total} videos")
+        self.timer.write_json(RUN_SUMMARY_FILE)
+        self.timer.write_prometheus(METRICS_FILE)
+        log.info(f"Timing: {self.timer.readout()}")
+        if self.proxies.enabled:
+            log.info(f"Proxies: {self.proxies.stats()}")
         return results
 
 
@@ -296,13 +488,28 @@ class YouTubeAnalyzerGUI:
         self.config = self.load_config()
         self.analyzer = None
         self.results = []
+        self.running = False
+        self.thumbs = ThumbnailCache(THUMB_DIR)
+        self._thumb_images = []  # keep PhotoImage refs alive
+        self.profiler = None      # last profiled run; saved next to the next export
+        self.control = None       # RunControl of the current run
+        self.downloader = None    # running Download All, if any
+        self.exporting = None     # RunControl of the running export, if any
+        self._timing_job = None   # pending log_timing readout
 
         # Setup Logger
         self.setup_logging()
         self.create_3d_styles()
         self.setup_ui()
         self.load_api_key()
+        if self.config.get("metrics_port"):
+            port = int(self.config["metrics_port"])
+            try:
+                serve_metrics(lambda: self.analyzer.timer, port)
+            except OSError as e:
+                logging.getLogger('gui').warning(f"Metrics port {port} busy ({e}); running without the /metrics endpoint")
         Thread(target=update_ytdlp, daemon=True).start()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def load_config(self):
         if os.path.exists(CONFIG_FILE):
@@ -316,11 +523,16 @@ class YouTubeAnalyzerGUI:
 
     def setup_logging(self):
         logger = logging.getLogger('gui')
-        logger.setLevel(logging.INFO)
+        configured = self.config.get("log_level", "INFO")
+        level = configured if isinstance(configured, int) else logging.getLevelName(str(configured).strip().upper())
+        self.log_level = level if isinstance(level, int) else logging.INFO
+        logger.setLevel(self.log_level)
         if not logger.handlers:
             handler = logging.StreamHandler(sys.stdout)
             handler.setFormatter(logging.Formatter('%(asctime)s | %(message)s', '%H:%M:%S'))
             logger.addHandler(handler)
+        if not isinstance(level, int):
+            logger.warning(f"Unknown log_level {configured!r} in {CONFIG_FILE}; using INFO")
 
     def create_3d_styles(self):
         style = ttk.Style()
@@ -363,7 +575,7 @@ class YouTubeAnalyzerGUI:
         # FIXED: Removed duplicate 'highlightthickness=0'
         btn = tk.Canvas(parent, bg=THEME["bg"], highlightthickness=0, height=50)
         rect = self.create_rounded_rect(btn, 0, 0, 240, 50, radius=12, fill=color, outline="")
-        txt = btn.create_text(120, 25, text=text, fill="white", font=('Segoe UI', 12, 'bold'))
+        txt = btn.create_text(120, 25, text=text, fill="white", font=('Segoe UI', 12, 'bold'), tags='label')
         def enter(e): btn.itemconfig(rect, fill=self.lighten(color, 25))
         def leave(e): btn.itemconfig(rect, fill=color)
         def press(e): btn.itemconfig(rect, fill=self.darken(color, 20)); self.root.after(100, command)
@@ -436,6 +648,15 @@ class YouTubeAnalyzerGUI:
         btn_f = tk.Frame(left, bg=THEME["bg"])
         btn_f.pack(pady=20)
         self.analyze_btn = self.create_3d_button(btn_f, "START BULK ANALYSIS", self.start_analysis, THEME["success"])
+        run_f = tk.Frame(btn_f, bg=THEME["bg"])
+        run_f.pack()
+        self.pause_btn = self.create_3d_button(run_f, "PAUSE", self.toggle_pause, THEME["warning"])
+        self.pause_btn.pack(side='left')
+        self.create_3d_button(run_f, "CANCEL", self.cancel_analysis, THEME["danger"]).pack(side='left')
+        self.profile_var = tk.BooleanVar(value=bool(self.config.get("profile_runs")))
+        tk.Checkbutton(left, text="Profile runs (cProfile + tracemalloc)", variable=self.profile_var,
+                       command=self.toggle_profiling, fg=THEME["subtext"], bg=THEME["bg"],
+                       selectcolor=THEME["card"], activebackground=THEME["bg"], font=('Segoe UI', 10)).pack()
 
         # Status
         self.status_label = tk.Label(left, text="Ready", fg=THEME["subtext"], bg=THEME["bg"], font=('Segoe UI', 11))
@@ -453,7 +674,8 @@ class YouTubeAnalyzerGUI:
         self.log_text.pack(fill='both', expand=True, padx=15, pady=15)
 
         # Setup GUI Logger
-        gui_handler = GUILogger(self.log_text)
+        gui_handler = GUILogger(self.log_text, int(self.config.get("log_max_lines", LOG_MAX_LINES)),
+                                self.log_level)
         logging.getLogger('gui').addHandler(gui_handler)
 
     def setup_results_tab(self):
@@ -464,18 +686,41 @@ class YouTubeAnalyzerGUI:
         actions = tk.Frame(action_bar, bg=THEME["card"])
         actions.pack(pady=12)
 
-        self.create_3d_button(actions, "Export CSV", lambda: self.export('csv'), THEME["success"]).pack(side='left', padx=8)
-        self.create_3d_button(actions, "Export Excel", lambda: self.export('xlsx'), THEME["accent"]).pack(side='left', padx=8)
-        self.create_3d_button(actions, "Export JSON", lambda: self.export('json'), THEME["warning"]).pack(side='left', padx=8)
+        self.create_3d_button(actions, "Export", self.export, THEME["success"]).pack(side='left', padx=8)
+        self.create_3d_button(actions, "Cancel Export", self.cancel_export, THEME["warning"]).pack(side='left', padx=8)
+        self.create_3d_button(actions, "Thumbnails", self.fetch_thumbnails, "#9c27b0").pack(side='left', padx=8)
         self.create_3d_button(actions, "Download All", self.download_all, "#e91e63").pack(side='right', padx=8)
         self.create_3d_button(actions, "Clear Results", self.clear_results, THEME["danger"]).pack(side='right', padx=8)
 
+        export_bar = tk.Frame(frame, bg=THEME["card"])
+        export_bar.pack(fill='x', padx=20, pady=(0, 10))
+        chosen = self.config.get("export_formats", ['csv'])
+        self.format_vars = {}
+        for fmt, label in zip(FORMATS, ("CSV", "Excel", "JSON")):
+            var = self.format_vars[fmt] = tk.BooleanVar(value=fmt in chosen)
+            tk.Checkbutton(export_bar, text=label, variable=var, fg=THEME["text"], bg=THEME["card"],
+                           selectcolor=THEME["terminal_bg"], activebackground=THEME["card"],
+                           font=('Segoe UI', 10)).pack(side='left', padx=(12, 0), pady=8)
+        self.export_progress = ttk.Progressbar(export_bar, mode='determinate', length=400)
+        self.export_progress.pack(side='left', padx=12)
+        self.export_label = tk.Label(export_bar, text="", fg=THEME["subtext"], bg=THEME["card"], font=('Segoe UI', 10))
+        self.export_label.pack(side='left')
+
+        filter_bar = tk.Frame(frame, bg=THEME["card"])
+        filter_bar.pack(fill='x', padx=20)
+        tk.Label(filter_bar, text="Filter all runs:", fg=THEME["subtext"], bg=THEME["card"], font=('Segoe UI', 10)).pack(side='left', padx=(12, 6))
+        self.filter_entry = tk.Entry(filter_bar, bg=THEME["terminal_bg"], fg=THEME["text"], insertbackground=THEME["accent"], font=('Consolas', 11))
+        self.filter_entry.pack(side='left', fill='x', expand=True, pady=8)
+        self.filter_entry.bind('<Return>', self.apply_filter)
+        tk.Label(filter_bar, text='channel:"Name" category:Music views>1m after:2024-01-01 sort:-likes',
+                 fg=THEME["subtext"], bg=THEME["card"], font=('Segoe UI', 9)).pack(side='left', padx=12)
+
         table_frame = tk.Frame(frame, bg=THEME["bg"])
         table_frame.pack(fill='both', expand=True, padx=20, pady=10)
 
         self.tree = ttk.Treeview(table_frame, style="Glass.Treeview", columns=(
             'title', 'views', 'likes', 'duration', 'country', 'score', 'eng', 'download'
-        ), show='headings')
+        ), show='tree headings')
 
         vsb = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
         hsb = ttk.Scrollbar(table_frame, orient="horizontal", command=self.tree.xview)
@@ -485,6 +730,8 @@ class YouTubeAnalyzerGUI:
         vsb.pack(side='right', fill='y')
         hsb.pack(side='bottom', fill='x')
 
+        self.tree.heading('#0', text='Thumb')
+        self.tree.column('#0', width=PREVIEW_SIZE[0] + 12, stretch=False)
         headers = [
             ('title', 'Title', 450, 'w'),
             ('views', 'Views', 110, 'e'),
@@ -504,7 +751,7 @@ class YouTubeAnalyzerGUI:
     def load_api_key(self):
         key = self.config.get("api_key", "")
         self.api_entry.insert(0, key)
-        self.analyzer = YouTubeAnalyzerPro(key)
+        self.analyzer = YouTubeAnalyzerPro(key, self.config.get("api_columns"), ProxyPool(self.config.get("proxies")))
         self.update_status()
 
     def update_status(self):
@@ -525,7 +772,7 @@ class YouTubeAnalyzerGUI:
             return
         self.config["api_key"] = key
         self.save_config()
-        self.analyzer = YouTubeAnalyzerPro(key)
+        self.analyzer = YouTubeAnalyzerPro(key, self.config.get("api_columns"), ProxyPool(self.config.get("proxies")))
         self.update_status()
         messagebox.showinfo("Success", "API Key Saved!")
 
@@ -535,15 +782,64 @@ class YouTubeAnalyzerGUI:
             self.file_entry.delete(0, tk.END)
             self.file_entry.insert(0, path)
 
+    def toggle_profiling(self):
+        self.config["profile_runs"] = self.profile_var.get()
+        self.save_config()
+
     def start_analysis(self):
         if not self.analyzer:
             messagebox.showerror("Error", "Save API Key!")
             return
+        if self.running:
+            return
+        self.profiler = RunProfiler() if self.profile_var.get() else None
+        self.control = RunControl()
         self.analyze_btn.itemconfig("bg", fill=self.darken(THEME["success"], 20))
         self.progress.start(10)
-        Thread(target=self.run_analysis, daemon=True).start()
+        self.running = True
+        self._timing_job = self.root.after(TIMING_READOUT_MS, self.log_timing)
+        Thread(target=self.run_analysis, args=(self.control,), daemon=True).start()
+
+    def toggle_pause(self):
+        if not self.running:
+            return
+        if self.control.paused:
+            self.control.resume()
+            self.pause_btn.itemconfig('label', text="PAUSE")
+            self.progress.start(10)
+            logging.getLogger('gui').info("Resumed.")
+        else:
+            self.control.pause()
+            self.pause_btn.itemconfig('label', text="RESUME")
+            self.progress.stop()
+            logging.getLogger('gui').info("Paused after the video in progress.")
+
+    def cancel_analysis(self):
+        """Abort the run; its partial results still land in the table. A new run can start at once."""
+        if not self.running:
+            return
+        self.control.cancel()
+        logging.getLogger('gui').info("Cancelling...")
+        self.stop_analysis()
+
+    def on_close(self):
+        if self.control:
+            self.control.cancel()
+        if self.downloader:
+            self.downloader.cancel()  # .part files stay; the next Download All resumes them
+        if self.exporting:
+            self.exporting.cancel()
+        self.root.destroy()
+
+    def log_timing(self):
+        if not self.running:
+            return
+        readout = self.analyzer.timer.readout()
+        if readout:
+            logging.getLogger('gui').info(f"Timing: {readout}")
+        self._timing_job = self.root.after(TIMING_READOUT_MS, self.log_timing)
 
-    def run_analysis(self):
+    def run_analysis(self, control: RunControl):
         urls = []
         url = self.url_entry.get().strip()
         file_path = self.file_entry.get().strip()
@@ -565,35 +861,112 @@ class YouTubeAnalyzerGUI:
             return
 
         logging.getLogger('gui').info(f"Starting analysis of {len(urls)} videos...")
-        self.results = self.analyzer.analyze_urls(urls)
-        self.root.after(0, self.show_results)
+        profiler = self.profiler
+        if profiler:
+            profiler.start()
+        try:
+            results = self.analyzer.analyze_urls(urls, control)
+            if self.config.get("fetch_thumbnails") and not control.cancelled:
+                self.thumbs.fetch_all(results)
+            if self.config.get("fetch_transcripts") and self.analyzer.ytdlp_pool and not control.cancelled:
+                index = TranscriptIndex(TRANSCRIPTS_DB, self.analyzer.ytdlp_pool, self.analyzer.proxies,
+                                        self.config.get("transcript_langs"))
+                st = index.index([r.get('video_id') for r in results])
+                logging.getLogger('gui').info(f"Transcripts: {st['indexed']} indexed, {st['none']} without captions, "
+                                              f"{st['cached']} cached, {st['failed']} failed → {TRANSCRIPTS_DB}")
+        finally:
+            if profiler:
+                profiler.stop()
+        if control is not self.control:
+            return  # superseded by a newer run; leave its table alone
+        self.results = results
+        if profiler:
+            for line in profiler.report().splitlines():
+                logging.getLogger('gui').info(line)
+            logging.getLogger('gui').info("Profile will be saved next to the next export.")
+        self.root.after(0, lambda: self.show_results(notify=not control.cancelled))
         self.root.after(0, self.stop_analysis)
-        logging.getLogger('gui').info("Analysis completed.")
+        logging.getLogger('gui').info("Analysis cancelled." if control.cancelled else "Analysis completed.")
 
-    def show_results(self):
+    def show_results(self, notify=True):
         for item in self.tree.get_children():
             self.tree.delete(item)
+        self._thumb_images = []
+        previews = self.thumbs.previews
+        if any(previews.get(r.get('video_id')) for r in self.results):
+            ttk.Style().configure("Glass.Treeview", rowheight=max(32, PREVIEW_SIZE[1] + 6))
         for r in self.results:
             title = r.get('title', 'N/A')[:70] + '...' if len(r.get('title', '')) > 70 else r.get('title', 'N/A')
             views = f"{r.get('views', 0)//1000}K" if r.get('views', 0) >= 1000 else str(r.get('views', 0))
             likes = f"{r.get('likes', 0)//1000}K" if r.get('likes', 0) >= 1000 else str(r.get('likes', 0))
             dl_text = "Download" if r.get('download_url') else "N/A"
-            self.tree.insert('', 'end', values=(
+            img = ''
+            preview = previews.get(r.get('video_id'))
+            if preview:
+                try:
+                    img = tk.PhotoImage(file=preview)
+                    self._thumb_images.append(img)
+                except tk.TclError:
+                    img = ''
+            self.tree.insert('', 'end', image=img, values=(
                 title, views, likes, r.get('duration', 'N/A'), r.get('country', 'N/A'),
                 r.get('performance_score', 0), f"{r.get('engagement_rate_%', 0):.1f}%", dl_text
             ), tags=(r.get('download_url'),))
-        messagebox.showinfo("Done", f"Analyzed {len(self.results)} videos!")
+        if notify:
+            messagebox.showinfo("Done", f"Analyzed {len(self.results)} videos!")
 
     def stop_analysis(self):
+        self.running = False
+        if self._timing_job:
+            # A pending readout would see the next run's running=True and start a second chain
+            self.root.after_cancel(self._timing_job)
+            self._timing_job = None
         self.progress.stop()
         self.analyze_btn.itemconfig("bg", fill=THEME["success"])
+        self.pause_btn.itemconfig('label', text="PAUSE")
 
     def clear_results(self):
+        if self.running:
+            self.control.cancel()
+            self.stop_analysis()
+            self.control = None  # drop the cancelled run's partial results too
         self.results = []
+        self._thumb_images = []
         for item in self.tree.get_children():
             self.tree.delete(item)
         logging.getLogger('gui').info("Results cleared.")
 
+    def apply_filter(self, event=None):
+        """Query the results store (every stored run) and show the matches; empty filter = last run."""
+        if not self.analyzer:
+            return
+        text = self.filter_entry.get().strip() or 'run:last'
+        Thread(target=self._apply_filter, args=(text,), daemon=True).start()
+
+    def _apply_filter(self, text):
+        try:
+            rows = self.analyzer.store.query(text)
+        except ValueError as e:
+            logging.getLogger('gui').error(f"Filter: {e}")
+            return
+        logging.getLogger('gui').info(f"Filter '{text}': {len(rows)} rows")
+        self.results = rows
+        self.root.after(0, lambda: self.show_results(notify=False))
+
+    def fetch_thumbnails(self):
+        if not self.results:
+            messagebox.showwarning("No Data", "Analyze first!")
+            return
+        logging.getLogger('gui').info(f"Fetching thumbnails for {len(self.results)} videos...")
+        Thread(target=self._fetch_thumbnails, args=(list(self.results),), daemon=True).start()
+
+    def _fetch_thumbnails(self, rows):
+        self.thumbs.fetch_all(rows)
+        st = self.thumbs.stats
+        logging.getLogger('gui').info(
+            f"Thumbnails: {st['downloads']} downloaded, {st['hits']} cached, {st['missing']} missing")
+        self.root.after(0, lambda: self.show_results(notify=False))
+
     def open_download_link(self, event):
         item = self.tree.selection()
         if not item: return
@@ -608,31 +981,108 @@ class YouTubeAnalyzerGUI:
         folder = filedialog.askdirectory()
         if not folder: return
         logging.getLogger('gui').info(f"Downloading all to: {folder}")
-        Thread(target=self._download_all, args=(folder,), daemon=True).start()
+        Thread(target=self._download_all, args=(folder, list(self.results)), daemon=True).start()
 
-    def _download_all(self, folder):
-        for r in self.results:
-            if r.get('download_url'):
-                try:
-                    subprocess.run(["yt-dlp", "-o", f"{folder}/%(title)s.%(ext)s", r['download_url']], check=True)
-                except: pass
+    def _download_all(self, folder, rows):
+        log = logging.getLogger('gui')
+        if self.downloader:
+            self.downloader.cancel()
+        downloader = self.downloader = Downloader(
+            folder, float(self.config.get("download_rate", DEFAULT_RATE)),
+            int(self.config.get("download_workers", DOWNLOAD_WORKERS)),
+            proxies=self.analyzer.proxies if self.analyzer else None, progress=self._download_progress)
+        try:
+            downloader.download_all(rows)
+        except RuntimeError as e:
+            log.error(f"Download failed: {e}")
+            return
+        st = downloader.stats
+        log.info(f"Downloads: {st['done']} done, {st['failed']} failed, {st['cancelled']} cancelled | "
+                 f"{st['resumed']} resumed, {st['fresh']} re-extracted | {st['bytes'] / 2**20:.1f} MB")
 
-    def export(self, format_type):
+    def _download_progress(self, ev):
+        log = logging.getLogger('gui')
+        if ev['status'] == 'downloading' and ev['total']:
+            speed = f" at {ev['speed'] / 2**20:.1f} MB/s" if ev['speed'] else ''
+            log.info(f"Downloading {ev['video_id']}: {100 * ev['downloaded'] / ev['total']:.0f}%{speed}")
+        elif ev['status'] == 'finished':
+            log.info(f"Downloaded: {os.path.basename(ev['filename'] or '')}")
+        elif ev['status'] == 'failed':
+            log.error(f"Download failed {ev['video_id']}: {ev.get('error')}")
+
+    def export(self):
         if not self.results:
             messagebox.showwarning("No Data", "Analyze first!")
             return
-        path = filedialog.asksaveasfilename(defaultextension=f".{format_type}")
+        if self.exporting:
+            messagebox.showinfo("Export Running", "Wait for the current export or cancel it.")
+            return
+        formats = [fmt for fmt in FORMATS if self.format_vars[fmt].get()]
+        if not formats:
+            messagebox.showwarning("No Format", "Tick CSV, Excel and/or JSON.")
+            return
+        self.config["export_formats"] = formats
+        self.save_config()
+        path = filedialog.asksaveasfilename(defaultextension=f".{formats[0]}")
         if not path: return
-        df = pd.DataFrame(self.results)
-        df['hashtags'] = df['hashtags'].apply(lambda x: ', '.join(x) if isinstance(x, list) else '')
-        if format_type == 'csv':
-            df.to_csv(path, index=False, encoding='utf-8')
-        elif format_type == 'xlsx':
-            df.to_excel(path, index=False)
-        elif format_type == 'json':
-            df.to_json(path, orient='records', indent=2, force_ascii=False)
-        logging.getLogger('gui').info(f"Exported: {path}")
-        messagebox.showinfo("Exported", f"Saved to {path}")
+        paths = export_paths(path, formats)
+        # Snapshot: a run finishing (or Clear) mid-export swaps self.results, not this list
+        rows = list(self.results)
+        control = self.exporting = RunControl()
+        self.export_progress.config(maximum=len(rows), value=0)
+        self.export_label.config(text=f"Exporting {len(rows)} rows...")
+        logging.getLogger('gui').info(f"Exporting {len(rows)} rows: {', '.join(paths.values())}")
+        Thread(target=self._export, args=(rows, paths, control), daemon=True).start()
+
+    def cancel_export(self):
+        if not self.exporting: return
+        self.exporting.cancel()
+        self.export_label.config(text="Cancelling export...")
+
+    def _export(self, rows, paths, control):
+        log = logging.getLogger('gui')
+        profiler = self.profiler
+        if profiler: profiler.start()
+        error = None
+        try:
+            columns = export_columns(rows, self.analyzer.columns if self.analyzer else None)
+            export_rows(rows, paths, columns, control=control,
+                        progress=lambda done, total: self.root.after(0, self._export_progress, done, total))
+        except Cancelled:
+            error = "cancelled"
+        except Exception as e:
+            error = str(e)
+        finally:
+            if profiler: profiler.stop()
+        if error is None:
+            for p in paths.values():
+                log.info(f"Exported: {p}")
+            if profiler:
+                prof = profiler.write(profile_base(next(iter(paths.values()))))
+                for line in profiler.report().splitlines():
+                    log.info(line)
+                log.info(f"Profile: {prof['prof']} | flamegraph stacks: {prof['collapsed']}")
+        elif error == "cancelled":
+            log.warning("Export cancelled; no files written.")
+        else:
+            log.error(f"Export failed: {error}")
+        self.root.after(0, self._export_done, paths, error)
+
+    def _export_progress(self, done, total):
+        self.export_progress.config(value=done)
+        self.export_label.config(text=f"Exporting {done}/{total} rows...")
+
+    def _export_done(self, paths, error):
+        self.exporting = None
+        if error == "cancelled":
+            self.export_progress.config(value=0)
+            self.export_label.config(text="Export cancelled")
+        elif error:
+            self.export_label.config(text="Export failed")
+            messagebox.showerror("Export Failed", error)
+        else:
+            self.export_label.config(text="Export complete")
+            messagebox.showinfo("Exported", "Saved to:\n" + "\n".join(paths.values()))
 
 
 # ========================================
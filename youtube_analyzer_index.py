@@ -0,0 +1,220 @@
+"""
+YOUTUBE ANALYZER PRO - HASHTAG & KEYWORD INDEX
+- Inverted index: hashtag / title keyword -> video IDs
+- Updated per video as results stream in, persisted across runs
+- Top-K by video count and by total views
+- Sketch mode: bounded memory (Space-Saving counters + Bloom filter of
+  seen videos) for multi-million-video corpora
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+STOPWORDS = {
+    'the', 'and', 'for', 'with', 'you', 'your', 'this', 'that', 'from', 'are',
+    'was', 'but', 'not', 'all', 'how', 'what', 'why', 'who', 'new', 'our',
+    'out', 'its', 'has', 'have', 'will', 'can', 'get', 'top', 'official',
+    'video', 'full', 'part', 'episode', 'vs', 'amp',
+}
+
+
+def extract_terms(row: Dict) -> List[str]:
+    """Hashtags (lowercased, with '#') and title keywords for one result row."""
+    terms = {t.lower() for t in row.get('hashtags') or [] if len(t) > 1}
+    title = row.get('title') or ''
+    for word in re.findall(r"[^\W\d_]{3,}", title.lower()):
+        if word not in STOPWORDS:
+            terms.add(word)
+    return sorted(terms)
+
+
+# ========================================
+#           BOUNDED SKETCH STRUCTURES
+# ========================================
+class SpaceSaving:
+    """Weighted Space-Saving top-K: at most `capacity` counters, overestimates by <= err."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: Dict[str, List[float]] = {}  # term -> [count, err]
+        self._heap: List[Tuple[float, str]] = []
+
+    def add(self, term: str, weight: float = 1):
+        c = self.counts.get(term)
+        if c is not None:
+            c[0] += weight
+        elif len(self.counts) < self.capacity:
+            self.counts[term] = [weight, 0]
+        else:
+            floor, victim = self._pop_min()
+            del self.counts[victim]
+            self.counts[term] = [floor + weight, floor]
+        heapq.heappush(self._heap, (self.counts[term][0], term))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c[0], t) for t, c in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self) -> Tuple[float, str]:
+        # Heap entries go stale as counts grow; skip until one is current
+        while True:
+            count, term = heapq.heappop(self._heap)
+            c = self.counts.get(term)
+            if c is not None and c[0] == count:
+                return count, term
+
+    def top(self, k: int) -> List[Tuple[str, float]]:
+        return [(t, c[0]) for t, c in heapq.nlargest(k, self.counts.items(), key=lambda kv: kv[1][0])]
+
+    def to_json(self) -> Dict:
+        return {'capacity': self.capacity, 'counts': self.counts}
+
+    @classmethod
+    def from_json(cls, data: Dict) -> 'SpaceSaving':
+        ss = cls(data['capacity'])
+        ss.counts = {t: list(c) for t, c in data['counts'].items()}
+        ss._heap = [(c[0], t) for t, c in ss.counts.items()]
+        heapq.heapify(ss._heap)
+        return ss
+
+
+class BloomFilter:
+    def __init__(self, bits: int = 1 << 24, hashes: int = 4, data: Optional[bytes] = None):
+        self.bits = bits
+        self.hashes = hashes
+        self.array = bytearray(data) if data else bytearray(bits // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8 * self.hashes).digest()
+        for i in range(self.hashes):
+            yield int.from_bytes(digest[8 * i:8 * i + 8], 'little') % self.bits
+
+    def add(self, key: str) -> bool:
+        """Add key; True if it was (probably) already present."""
+        seen = True
+        for p in self._positions(key):
+            byte, bit = divmod(p, 8)
+            if not self.array[byte] & (1 << bit):
+                seen = False
+                self.array[byte] |= 1 << bit
+        return seen
+
+
+# ========================================
+#           TAG INDEX
+# ========================================
+class TagIndex:
+    def __init__(self, path: str = "tag_index.json", sketch_capacity: int = 0):
+        self.path = path
+        self.sketch_capacity = sketch_capacity
+        self._lock = threading.Lock()
+        # Exact mode
+        self.postings: Dict[str, set] = {}
+        self.views: Dict[str, int] = {}
+        self.videos: Dict[str, Tuple[int, List[str]]] = {}
+        # Sketch mode
+        self.count_sketch: Optional[SpaceSaving] = None
+        self.views_sketch: Optional[SpaceSaving] = None
+        self.seen: Optional[BloomFilter] = None
+        self.load()
+
+    @property
+    def sketch(self) -> bool:
+        return self.count_sketch is not None
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('mode') == 'sketch':
+                self.count_sketch = SpaceSaving.from_json(data['count'])
+                self.views_sketch = SpaceSaving.from_json(data['views'])
+                self.seen = BloomFilter(data['bloom_bits'], data['bloom_hashes'],
+                                        bytes.fromhex(data['bloom']))
+            else:
+                self.videos = {v: (views, terms) for v, (views, terms) in data.get('videos', {}).items()}
+                for vid, (views, terms) in self.videos.items():
+                    for t in terms:
+                        self.postings.setdefault(t, set()).add(vid)
+                        self.views[t] = self.views.get(t, 0) + views
+            return
+        if self.sketch_capacity:
+            self.count_sketch = SpaceSaving(self.sketch_capacity)
+            self.views_sketch = SpaceSaving(self.sketch_capacity)
+            self.seen = BloomFilter()
+
+    def save(self):
+        with self._lock:
+            if self.sketch:
+                data = {
+                    'mode': 'sketch',
+                    'count': self.count_sketch.to_json(),
+                    'views': self.views_sketch.to_json(),
+                    'bloom_bits': self.seen.bits, 'bloom_hashes': self.seen.hashes,
+                    'bloom': self.seen.array.hex(),
+                }
+            else:
+                data = {'mode': 'exact', 'videos': self.videos}
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+
+    def add(self, row: Dict):
+        video_id = row.get('video_id')
+        if not video_id or video_id == 'N/A':
+            return
+        views = int(row.get('views') or 0)
+        terms = extract_terms(row)
+        with self._lock:
+            if self.sketch:
+                # Re-fetched videos are skipped so counts stay per-video
+                if self.seen.add(video_id):
+                    return
+                for t in terms:
+                    self.count_sketch.add(t, 1)
+                    self.views_sketch.add(t, views)
+                return
+            old = self.videos.get(video_id)
+            if old:
+                for t in old[1]:
+                    self.views[t] -= old[0]
+                    self.postings[t].discard(video_id)
+                    if not self.postings[t]:
+                        del self.postings[t], self.views[t]
+            self.videos[video_id] = (views, terms)
+            for t in terms:
+                self.postings.setdefault(t, set()).add(video_id)
+                self.views[t] = self.views.get(t, 0) + views
+
+    def top(self, k: int = 20, by: str = 'count', kind: Optional[str] = None) -> List[Tuple[str, int]]:
+        """Top-K terms by 'count' (videos) or 'views'; kind: 'hashtag', 'keyword' or None."""
+        def keep(term: str) -> bool:
+            if kind == 'hashtag':
+                return term.startswith('#')
+            if kind == 'keyword':
+                return not term.startswith('#')
+            return True
+
+        with self._lock:
+            if self.sketch:
+                sketch = self.views_sketch if by == 'views' else self.count_sketch
+                # Filtering after the fact: ask for more candidates than k
+                ranked = [(t, int(c)) for t, c in sketch.top(len(sketch.counts)) if keep(t)]
+                return ranked[:k]
+            if by == 'views':
+                items = ((t, v) for t, v in self.views.items() if keep(t))
+            else:
+                items = ((t, len(ids)) for t, ids in self.postings.items() if keep(t))
+            return heapq.nlargest(k, items, key=lambda kv: kv[1])
+
+    def lookup(self, term: str) -> List[str]:
+        """Video IDs for a hashtag or keyword (exact mode only)."""
+        term = term.strip().lower()
+        with self._lock:
+            return sorted(self.postings.get(term, ()))
@@ -9,17 +9,11 @@ import os
 import sys
 import json
 import pandas as pd
+from concurrent.futures import Future
 from datetime import datetime
 from typing import List, Dict, Optional
 import re
-import requests
-
-# Optional: YouTube API
-try:
-    from googleapiclient.discovery import build
-    API_AVAILABLE = True
-except ImportError:
-    API_AVAILABLE = False
+import time
 
 # Fallback: yt-dlp
 try:
@@ -30,21 +24,73 @@ except ImportError:
 
 from tqdm import tqdm
 
+from youtube_analyzer_apiclient import API_AVAILABLE, ClientPool
+from youtube_analyzer_fields import build_api_request, parse_columns, wants
+from youtube_analyzer_snapshots import SnapshotStore
+from youtube_analyzer_metrics import apply_metrics
+from youtube_analyzer_index import TagIndex
+from youtube_analyzer_comments import CommentHarvester, PARQUET_AVAILABLE
+from youtube_analyzer_timing import StageTimer
+from youtube_analyzer_profile import RunProfiler, profile_base
+from youtube_analyzer_ytdlp_pool import shared_pool
+from youtube_analyzer_proxies import ProxyPool
+from youtube_analyzer_queue import QueueWorker, open_queue, serve_queue
+from youtube_analyzer_xlsx import MAX_ROWS, export_columns, write_xlsx
+from youtube_analyzer_refresh import RefreshScheduler, refresh_due
+from youtube_analyzer_discovery import Discovery, rfc3339
+from youtube_analyzer_reference import ReferenceData, CHANNEL_COLUMNS
+from youtube_analyzer_store import ResultsStore
+from youtube_analyzer_transcripts import TranscriptIndex
+from youtube_analyzer_dedup import DedupIndex
+from youtube_analyzer_retry import RetryPolicy, FetchError, LABELS, NOT_FOUND, EXTRACTOR, as_fetch_error, check_response
+
+SNAPSHOT_DIR = "snapshots"
+TAG_INDEX_FILE = "tag_index.json"
+TAG_INDEX_SKETCH = 0  # >0: bounded top-K sketch with this many counters
+COMMENTS_DIR = "comments"
+RUN_SUMMARY_FILE = "run_summary.json"
+METRICS_FILE = "metrics.prom"
+PROXY_FILE = "proxies.txt"  # one '<url|direct> [req/s]' per line; optional
+YTDLP_OPTS = {'quiet': True, 'no_warnings': True}
+QUEUE_FILE = "crawl_queue.db"
+REFRESH_DB = "refresh.db"
+DISCOVERY_CACHE = "discovery_cache.json"
+REFERENCE_CACHE = "reference_cache.json"
+RESULTS_DB = "results.db"  # every run upserted by video_id (menu option 7 queries it)
+TRANSCRIPTS_DB = "transcripts.db"  # captions + full-text index (menu option 8 searches it)
+DEDUP_DB = "dedup.db"  # near-duplicate clusters, updated every run (menu option 9 lists them)
+DEDUP_EXPORT = "duplicate_clusters.json"
+DISCOVERY_REGIONS = ["US", "GB", "IN", "PK"]
+DISCOVERY_QUOTA = 1000  # units per discovery run (search.list = 100/page)
+
 
 # ========================================
 #           YOUTUBE ANALYZER PRO CLASS
 # ========================================
 class YouTubeAnalyzerPro:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, columns: Optional[List[str]] = None,
+                 proxies: Optional[ProxyPool] = None):
         self.api_key = api_key or os.getenv("ENTER API KEY")
+        self.columns = columns
+        self.api_part, self.api_fields = build_api_request(columns)
+        self.response_bytes = 0
+        self.snapshots = SnapshotStore(SNAPSHOT_DIR)
+        self.tag_index = TagIndex(TAG_INDEX_FILE, TAG_INDEX_SKETCH)
+        self.store = ResultsStore(RESULTS_DB)
+        self.dedup = DedupIndex(DEDUP_DB)
+        self.timer = StageTimer()
+        self.ytdlp_pool = shared_pool() if YTDLP_AVAILABLE else None
+        self.proxies = proxies or ProxyPool()
+        self.retry = RetryPolicy()
         self.use_api = API_AVAILABLE and bool(self.api_key)
         self.youtube = None
         if self.use_api:
             try:
-                self.youtube = build('youtube', 'v3', developerKey=self.api_key)
+                self.youtube = ClientPool(self.api_key)  # per-thread clients, discovery doc cached per process
             except Exception as e:
                 print(f"API init failed: {e}. Using yt-dlp fallback.")
                 self.use_api = False
+        self.reference = ReferenceData(self.youtube, REFERENCE_CACHE, self._execute) if self.use_api else None
 
         # ReturnYouTubeDislike API
         self.rtd_api = "https://returnyoutubedislikeapi.com/votes?videoId="
@@ -79,168 +125,206 @@ class YouTubeAnalyzerPro:
             seconds = duration.replace('S', '')
         try:
             return f"{int(hours):02d}:{int(minutes):02d}:{int(seconds):02d}"
-        except:
+        except ValueError:
             return "N/A"
 
-    def get_dislikes(self, video_id: str) -> int:
-        try:
-            resp = requests.get(self.rtd_api + video_id, timeout=5)
-            if resp.status_code == 200:
-                return resp.json().get("dislikes", 0)
-        except:
-            pass
-        return 0
-
-    def get_video_data_api(self, video_id: str) -> Optional[Dict]:
-        try:
-            req = self.youtube.videos().list(
-                part='snippet,contentDetails,statistics,topicDetails',
-                id=video_id
-            )
-            res = req.execute()
-            if not res['items']:
+    def _retry(self, fn):
+        return self.retry.call(fn, on_retry=lambda e, wait: print(f"   Retry in {wait:.1f}s ({e.error_class}): {e}"))
+
+    def get_dislikes(self, video_id: str) -> Optional[int]:
+        """None when the dislike service has no answer; the video itself is fine."""
+        with self.timer.stage('dislikes') as st:
+            try:
+                return self._retry(lambda: check_response(
+                    self.proxies.get(self.rtd_api + video_id, timeout=5)).json().get("dislikes", 0))
+            except FetchError as e:
+                st.error(e)
                 return None
 
-            item = res['items'][0]
-            sn = item['snippet']
-            st = item['statistics']
-            cd = item['contentDetails']
-
-            # Duration
-            duration = self.format_duration(cd.get('duration', ''))
-
-            # Views, Likes
-            views = int(st.get('viewCount', 0))
-            likes = int(st.get('likeCount', 0))
-            comments = int(st.get('commentCount', 0))
-            dislikes = self.get_dislikes(video_id)
-
-            # Engagement
-            engagement = round((likes / views) * 100, 2) if views > 0 else 0
-
-            # Performance Score (0-100)
-            score = 0
-            if views > 1_000_000: score += 30
-            elif views > 100_000: score += 20
-            elif views > 10_000: score += 10
-            if engagement > 5: score += 20
-            elif engagement > 2: score += 10
-            if likes > 10_000: score += 20
-            score = min(score, 100)
-
-            # Country
-            country = sn.get('country', 'N/A')
-            if country == 'N/A' and sn.get('defaultLanguage'):
-                lang = sn['defaultLanguage']
-                country = {
-                    'en': 'US', 'es': 'ES', 'hi': 'IN', 'ar': 'SA',
-                    'pt': 'BR', 'fr': 'FR', 'de': 'DE', 'ru': 'RU'
-                }.get(lang[:2], 'Global')
-
-            # Category
-            cat_id = sn.get('categoryId', '')
-            categories = {
-                '1': 'Film & Animation', '2': 'Autos', '10': 'Music', '15': 'Pets',
-                '17': 'Sports', '20': 'Gaming', '22': 'People & Blogs', '23': 'Comedy',
-                '24': 'Entertainment', '25': 'News', '26': 'Howto', '27': 'Education',
-                '28': 'Science & Tech'
-            }
-            category = categories.get(cat_id, 'Unknown')
-
-            published_at = sn['publishedAt']
-            dt = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
-
-            return {
-                'video_id': video_id,
-                'title': sn['title'],
-                'upload_date': dt.date().isoformat(),
-                'upload_time': dt.time().strftime('%H:%M:%S'),
-                'upload_datetime': published_at,
-                'duration': duration,
-                'views': views,
-                'likes': likes,
-                'dislikes': dislikes,
-                'comments': comments,
-                'engagement_rate_%': engagement,
-                'performance_score': score,
-                'description': sn['description'],
-                'channel_title': sn['channelTitle'],
-                'channel_id': sn['channelId'],
-                'country': country,
-                'category': category,
-                'hashtags': self.extract_hashtags(sn['description'] + ' ' + sn['title']),
-                'thumbnail': f"https://img.youtube.com/vi/{video_id}/maxresdefault.jpg",
-                'url': f'https://www.youtube.com/watch?v={video_id}'
-            }
-        except Exception as e:
-            print(f"   API Error: {e}")
-            return None
+    def _execute(self, req):
+        """Execute a request, counting raw response bytes."""
+        postproc = req.postproc
+        def counting(resp, content):
+            self.response_bytes += len(content or b'')
+            return postproc(resp, content)
+        req.postproc = counting
+        return req.execute()
+
+    def get_video_data_api(self, video_id: str) -> Dict:
+        """Raises FetchError (classified) when the video cannot be fetched."""
+        with self.timer.stage('api') as st:
+            try:
+                # A fresh request per attempt: an executed HttpRequest is not reusable
+                res = self._retry(lambda: self._execute(self.youtube.videos().list(
+                    part=self.api_part,
+                    id=video_id,
+                    fields=self.api_fields
+                )))
+            except FetchError as e:
+                st.error(e)
+                raise
+            if not res.get('items'):
+                st.error(NOT_FOUND)
+                raise FetchError(NOT_FOUND, f"{video_id}: deleted, private or never existed")
+
+        item = res['items'][0]
+        sn = item.get('snippet', {})
+        stats = item.get('statistics', {})
+        cd = item.get('contentDetails', {})
+
+        # Duration
+        duration = self.format_duration(cd.get('duration', ''))
+
+        # Views, Likes
+        views = int(stats.get('viewCount', 0))
+        likes = int(stats.get('likeCount', 0))
+        comments = int(stats.get('commentCount', 0))
+        dislikes = self.get_dislikes(video_id) if wants(self.columns, 'dislikes', 'like_dislike_ratio') else 0
+
+        # Country
+        country = sn.get('country', 'N/A')
+        if country == 'N/A' and sn.get('defaultLanguage'):
+            lang = sn['defaultLanguage']
+            country = {
+                'en': 'US', 'es': 'ES', 'hi': 'IN', 'ar': 'SA',
+                'pt': 'BR', 'fr': 'FR', 'de': 'DE', 'ru': 'RU'
+            }.get(lang[:2], 'Global')
+
+        # Category
+        cat_id = sn.get('categoryId', '')
+        categories = {
+            '1': 'Film & Animation', '2': 'Autos', '10': 'Music', '15': 'Pets',
+            '17': 'Sports', '20': 'Gaming', '22': 'People & Blogs', '23': 'Comedy',
+            '24': 'Entertainment', '25': 'News', '26': 'Howto', '27': 'Education',
+            '28': 'Science & Tech'
+        }
+        category = categories.get(cat_id, 'Unknown')
+
+        published_at = sn.get('publishedAt')
+        dt = datetime.fromisoformat(published_at.replace('Z', '+00:00')) if published_at else None
+        description = sn.get('description', '')
+
+        return {
+            'video_id': video_id,
+            'title': sn.get('title', 'N/A'),
+            'upload_date': dt.date().isoformat() if dt else 'N/A',
+            'upload_time': dt.time().strftime('%H:%M:%S') if dt else 'N/A',
+            'upload_datetime': published_at or 'N/A',
+            'duration': duration,
+            'views': views,
+            'likes': likes,
+            'dislikes': dislikes,
+            'comments': comments,
+            # Engagement + score: filled by the metrics stage
+            'engagement_rate_%': 0,
+            'performance_score': 0,
+            'description': description,
+            'channel_title': sn.get('channelTitle', 'N/A'),
+            'channel_id': sn.get('channelId', 'N/A'),
+            'country': country,
+            'category': category,
+            'category_id': cat_id,
+            'hashtags': self.extract_hashtags(description + ' ' + sn.get('title', '')),
+            'thumbnail': f"https://img.youtube.com/vi/{video_id}/maxresdefault.jpg",
+            'url': f'https://www.youtube.com/watch?v={video_id}'
+        }
+
+    def enrich(self, rows: List[Dict]):
+        """Channel stats + category names from the cached reference data (API mode only)."""
+        if not self.reference or not rows:
+            return
+        with self.timer.stage('reference') as st:
+            try:
+                self.reference.enrich(rows, channels=wants(self.columns, *CHANNEL_COLUMNS),
+                                      categories=wants(self.columns, 'category', 'performance_score'))
+            except Exception as e:
+                st.error(e)
+                print(f"   Reference data failed: {e}")
 
-    def get_video_data_ytdlp(self, url: str) -> Optional[Dict]:
+    def _submit_metadata(self, url: str) -> Future:
+        # Routed through the proxy pool, sticky per video
+        return self.proxies.call_async(
+            lambda p: self.ytdlp_pool.submit(url, {**YTDLP_OPTS, **p.ytdlp_opts}), key=url)
+
+    def get_video_data_ytdlp(self, url: str, pending: Optional[Future] = None) -> Dict:
+        """pending: metadata already submitted to the yt-dlp pool (bulk prefetch); retries resubmit.
+        Raises FetchError (classified) when the video cannot be fetched."""
         if not YTDLP_AVAILABLE:
-            return None
-        ydl_opts = {'quiet': True, 'no_warnings': True}
-        try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                if not info:
-                    return None
-
-                video_id = info.get('id')
-                upload_date = info.get('upload_date')
-                if upload_date:
-                    dt = datetime.strptime(upload_date, '%Y%m%d')
-                    date_str = dt.date().isoformat()
-                    time_str = '00:00:00'
-                else:
-                    date_str = time_str = 'N/A'
-
-                duration = info.get('duration', 0)
-                dur_str = f"{duration//3600:02d}:{(duration%3600)//60:02d}:{duration%60:02d}" if duration else "N/A"
-
-                views = info.get('view_count', 0)
-                likes = info.get('like_count', 0)
-                dislikes = self.get_dislikes(video_id) if video_id else 0
-                comments = info.get('comment_count', 0)
-
-                return {
-                    'video_id': video_id,
-                    'title': info.get('title', 'N/A'),
-                    'upload_date': date_str,
-                    'upload_time': time_str,
-                    'upload_datetime': upload_date or 'N/A',
-                    'duration': dur_str,
-                    'views': views,
-                    'likes': likes,
-                    'dislikes': dislikes,
-                    'comments': comments,
-                    'engagement_rate_%': round((likes/views)*100, 2) if views else 0,
-                    'performance_score': 0,
-                    'description': info.get('description', 'N/A'),
-                    'channel_title': info.get('uploader', 'N/A'),
-                    'channel_id': info.get('channel_id', 'N/A'),
-                    'country': 'N/A',
-                    'category': info.get('category', 'N/A'),
-                    'hashtags': self.extract_hashtags(
-                        info.get('description', '') + ' ' + info.get('title', '')
-                    ),
-                    'thumbnail': info.get('thumbnail', ''),
-                    'url': url
-                }
-        except Exception as e:
-            print(f"   yt-dlp Error: {e}")
-            return None
+            raise FetchError(EXTRACTOR, "yt-dlp is not installed")
+        first = [pending]
 
-    def analyze_single(self, url: str) -> Optional[Dict]:
-        video_id = self.extract_video_id(url)
-        if not video_id:
-            print("   Invalid YouTube URL!")
-            return None
+        def fetch():
+            future, first[0] = first[0] or self._submit_metadata(url), None
+            return future.result()
 
-        if self.use_api:
-            return self.get_video_data_api(video_id)
+        with self.timer.stage('ytdlp_metadata') as st:
+            try:
+                info = self._retry(fetch)
+            except FetchError as e:
+                st.error(e)
+                raise
+            if not info or not info.get('id'):
+                st.error(NOT_FOUND)
+                raise FetchError(NOT_FOUND, f"No single video at {url}")
+
+        video_id = info.get('id')
+        upload_date = info.get('upload_date')
+        if upload_date:
+            dt = datetime.strptime(upload_date, '%Y%m%d')
+            date_str = dt.date().isoformat()
+            time_str = '00:00:00'
         else:
-            return self.get_video_data_ytdlp(url)
+            date_str = time_str = 'N/A'
+
+        duration = info.get('duration', 0)
+        dur_str = f"{duration//3600:02d}:{(duration%3600)//60:02d}:{duration%60:02d}" if duration else "N/A"
+
+        views = info.get('view_count', 0)
+        likes = info.get('like_count', 0)
+        dislikes = self.get_dislikes(video_id)
+        comments = info.get('comment_count', 0)
+
+        return {
+            'video_id': video_id,
+            'title': info.get('title', 'N/A'),
+            'upload_date': date_str,
+            'upload_time': time_str,
+            'upload_datetime': upload_date or 'N/A',
+            'duration': dur_str,
+            'views': views,
+            'likes': likes,
+            'dislikes': dislikes,
+            'comments': comments,
+            'engagement_rate_%': 0,
+            'performance_score': 0,
+            'description': info.get('description', 'N/A'),
+            'channel_title': info.get('uploader', 'N/A'),
+            'channel_id': info.get('channel_id', 'N/A'),
+            'country': 'N/A',
+            'category': info.get('category', 'N/A'),
+            'hashtags': self.extract_hashtags(
+                info.get('description', '') + ' ' + info.get('title', '')
+            ),
+            'thumbnail': info.get('thumbnail', ''),
+            'url': url
+        }
+
+    def analyze_single(self, url: str, pending: Optional[Future] = None) -> Dict:
+        """Row for one video; raises FetchError (classified) on failure."""
+        with self.timer.stage('extract_video_id') as st:
+            video_id = self.extract_video_id(url)
+            if not video_id:
+                st.error(NOT_FOUND)
+        if not video_id:
+            raise FetchError(NOT_FOUND, f"Invalid YouTube URL: {url}")
+
+        try:
+            if self.use_api:
+                return self.get_video_data_api(video_id)
+            else:
+                return self.get_video_data_ytdlp(url, pending)
+        except Exception as e:
+            raise as_fetch_error(e) from e  # parse errors etc. get a class too
 
     def analyze_bulk_from_file(self, file_path: str) -> List[Dict]:
         if not os.path.exists(file_path):
@@ -253,22 +337,53 @@ class YouTubeAnalyzerPro:
         if not urls:
             print("   No valid URLs found.")
             return []
+        return self.analyze_bulk(urls)
 
+    def analyze_bulk(self, urls: List[str]) -> List[Dict]:
         print(f"\n   Analyzing {len(urls)} video(s)...")
         results = []
+        self.response_bytes = 0
+        self.timer.reset()
+        # yt-dlp mode: metadata extraction runs ahead in the worker processes
+        prefetch = None
+        if not self.use_api and self.ytdlp_pool:
+            prefetch = self.ytdlp_pool.prefetch(urls, YTDLP_OPTS, submit=self._submit_metadata)
         for url in tqdm(urls, desc="   Progress", unit="vid", leave=False):
-            data = self.analyze_single(url)
+            with self.timer.stage('video') as st:
+                try:
+                    data, error = self.analyze_single(url, next(prefetch) if prefetch else None), None
+                except FetchError as e:
+                    data, error = None, e
+                    st.error(e)
             if data:
                 results.append(data)
+                self.snapshots.append([data])
+                self.tag_index.add(data)
             else:
                 vid = self.extract_video_id(url) or 'N/A'
                 results.append({
-                    'video_id': vid, 'title': 'ERROR', 'upload_date': 'N/A', 'duration': 'N/A',
-                    'views': 0, 'likes': 0, 'dislikes': 0, 'comments': 0,
+                    'video_id': vid, 'title': f"FAILED: {LABELS[error.error_class]}", 'upload_date': 'N/A',
+                    'duration': 'N/A', 'views': 0, 'likes': 0, 'dislikes': 0, 'comments': 0,
                     'engagement_rate_%': 0, 'performance_score': 0,
-                    'description': 'Failed', 'channel_title': 'N/A', 'country': 'N/A',
-                    'hashtags': [], 'url': url
+                    'description': str(error), 'channel_title': 'N/A', 'country': 'N/A',
+                    'hashtags': [], 'url': url, 'error': error.error_class
                 })
+        self.enrich(results)
+        with self.timer.stage('metrics'):
+            apply_metrics(results)
+        self.tag_index.save()
+        if self.use_api:
+            print(f"   API payload: {self.response_bytes / 1024:.1f} KB")
+        self.timer.write_json(RUN_SUMMARY_FILE)
+        self.timer.write_prometheus(METRICS_FILE)
+        print(f"   Timing → {RUN_SUMMARY_FILE}, {METRICS_FILE}")
+        if self.proxies.enabled:
+            for p in self.proxies.stats():
+                print(f"   proxy {p['proxy']:<28} score={p['score']:.2f} n={p['requests']} 429s={p['throttled']} "
+                      f"lat={p['latency_ms']:.0f}ms")
+        for name, st in self.timer.summary()['stages'].items():
+            errors = f"  errors: {st['errors']}" if st['errors'] else ''
+            print(f"   {name:<20} n={st['count']:<6} p50={st['p50_ms']:.0f}ms p95={st['p95_ms']:.0f}ms{errors}")
         return results
 
     def print_table(self, data: List[Dict]):
@@ -286,24 +401,308 @@ class YouTubeAnalyzerPro:
             print(f"{i:<3} {title:<45} {views:<10} {likes:<8} {r['duration']:<8} {r['country']:<8} {r['performance_score']:<6} {r['engagement_rate_%']}")
         print("="*160 + "\n")
 
-    def export_to_csv(self, data: List[Dict], filename: str):
+    def _export_frame(self, data: List[Dict]) -> pd.DataFrame:
         df = pd.DataFrame(data)
         df['hashtags'] = df['hashtags'].apply(lambda x: ', '.join(x))
+        if self.columns:
+            df = df[[c for c in self.columns if c in df.columns]]
+        return df
+
+    def export_to_csv(self, data: List[Dict], filename: str):
+        df = self._export_frame(data)
         df.to_csv(filename, index=False, encoding='utf-8')
         print(f"   CSV → {filename}")
 
     def export_to_excel(self, data: List[Dict], filename: str):
-        df = pd.DataFrame(data)
-        df['hashtags'] = df['hashtags'].apply(lambda x: ', '.join(x))
-        df.to_excel(filename, index=False)
-        print(f"   Excel → {filename}")
+        rows = write_xlsx(filename, data, export_columns(data, self.columns))
+        print(f"   Excel → {filename}" + (f" ({rows:,} rows, split across sheets)" if rows >= MAX_ROWS else ""))
 
     def export_to_json(self, data: List[Dict], filename: str):
+        cols = export_columns(data, self.columns)  # same selected columns as CSV and Excel
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+            json.dump([{c: r.get(c) for c in cols} for r in data], f, indent=2, ensure_ascii=False)
         print(f"   JSON → {filename}")
 
 
+# ========================================
+#           HASHTAG / KEYWORD INDEX QUERY
+# ========================================
+def query_tag_index(index: TagIndex):
+    if not index.top(1):
+        print("\n   Index is empty. Analyze some videos first.")
+        return
+    kind = {'1': 'hashtag', '2': 'keyword'}.get(
+        input("\n   1. Hashtags  2. Keywords  3. Both: ").strip())
+    k = input("   Top K [20]: ").strip()
+    k = int(k) if k.isdigit() else 20
+
+    for by in ('count', 'views'):
+        print(f"\n   Top {k} by {'video count' if by == 'count' else 'total views'}:")
+        for i, (term, value) in enumerate(index.top(k, by=by, kind=kind), 1):
+            print(f"   {i:<3} {term:<35} {value:,}")
+
+    if index.sketch:
+        return
+    while True:
+        term = input("\n   Look up a term (Enter to finish): ").strip()
+        if not term:
+            break
+        ids = index.lookup(term)
+        print(f"   {len(ids)} video(s)")
+        for vid in ids[:50]:
+            print(f"   https://www.youtube.com/watch?v={vid}")
+
+
+# ========================================
+#           COMMENT HARVEST (TOP VIDEOS)
+# ========================================
+def harvest_comments(analyzer: YouTubeAnalyzerPro, data: List[Dict]):
+    n = input("\n   Harvest comments for top N videos by views? (N / Enter = skip): ").strip()
+    if not n.isdigit() or int(n) == 0:
+        return
+    fmt = 'ndjson'
+    if PARQUET_AVAILABLE and input("   Parquet instead of NDJSON? (y/n): ").lower() == 'y':
+        fmt = 'parquet'
+    cap = input("   Max comments per video [all]: ").strip()
+
+    top = sorted((r for r in data if r.get('views')), key=lambda r: r['views'], reverse=True)[:int(n)]
+    harvester = CommentHarvester(
+        api_key=analyzer.api_key if analyzer.use_api else None, out_dir=COMMENTS_DIR, fmt=fmt,
+        max_comments=int(cap) if cap.isdigit() else None
+    )
+    print(f"   Harvesting {len(top)} video(s) → {COMMENTS_DIR}/")
+    totals = harvester.harvest([r['video_id'] for r in top],
+                               progress=lambda vid, cnt: print(f"   {vid}: {cnt:,} comments"))
+    print(f"   Done: {sum(totals.values()):,} comments | quota used: {harvester.quota_used}")
+    pending = [v for v in totals if not harvester.state.get(v, {}).get('done')]
+    if pending:
+        print(f"   {len(pending)} video(s) incomplete - run again to resume.")
+
+
+# ========================================
+#           TRANSCRIPTS (INDEX / SEARCH)
+# ========================================
+def index_transcripts(analyzer: YouTubeAnalyzerPro, data: List[Dict]):
+    if not analyzer.ytdlp_pool or input("\n   Index transcripts (subtitles/auto-captions)? (y/n): ").lower() != 'y':
+        return
+    langs = [l.strip() for l in input("   Languages (comma-separated) [en]: ").split(',') if l.strip()]
+    index = TranscriptIndex(TRANSCRIPTS_DB, analyzer.ytdlp_pool, analyzer.proxies, langs or None)
+    st = index.index([r.get('video_id') for r in data],
+                     progress=lambda n, total: print(f"   {n:,}/{total:,} video(s)", end='\r'))
+    print(f"   Indexed {st['indexed']:,} | no captions {st['none']:,} | already indexed {st['cached']:,} | "
+          f"failed {st['failed']:,} | {st['chunks']:,} chunks → {TRANSCRIPTS_DB}")
+    if st['failed']:
+        print("   Failed videos stay pending - run again to resume.")
+
+
+def search_transcripts():
+    index = TranscriptIndex(TRANSCRIPTS_DB)
+    st = index.stats()
+    if not st['tracks']:
+        print("\n   No transcripts indexed yet. Analyze videos and answer 'y' to 'Index transcripts'.")
+        return
+    print(f"\n   {st['videos']:,} video(s), {st['tracks']:,} transcript(s), {st['chunks']:,} chunks")
+    print('   Words must all appear; also "exact phrase", a OR b, prefix*')
+    while True:
+        query = input("\n   Search (Enter to finish): ").strip()
+        if not query:
+            break
+        try:
+            hits = index.search(query)
+        except ValueError as e:
+            print(f"   {e}")
+            continue
+        print(f"   {len(hits)} hit(s)")
+        for h in hits:
+            print(f"   {h['time']}  {h['url']:<40} {h['snippet']}")
+
+
+def crawl_queue(analyzer: YouTubeAnalyzerPro) -> List[Dict]:
+    """Shared multi-host queue: load, work, serve or collect. Returns rows to show/export."""
+    where = input(f"\n   Queue (SQLite path on a shared volume, or http://host:port) [{QUEUE_FILE}]: ").strip() or QUEUE_FILE
+    print("   1. Load URLs from TXT (coordinator)")
+    print("   2. Run worker")
+    print("   3. Serve this queue over HTTP (stand-in server)")
+    print("   4. Status + collect results")
+    role = input("   Choose (1/2/3/4): ").strip()
+
+    if role == '3':
+        host = input("   Bind host [0.0.0.0]: ").strip() or "0.0.0.0"
+        port = input("   Port [8765]: ").strip()
+        server = serve_queue(open_queue(where), int(port) if port.isdigit() else 8765, host)
+        print(f"   Serving {where} on http://{host}:{server.server_port} (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+        return []
+
+    queue = open_queue(where)
+    if role == '1':
+        path = input("   TXT File Path: ").strip()
+        if not os.path.exists(path):
+            print(f"   File not found: {path}")
+            return []
+        with open(path, 'r', encoding='utf-8') as f:
+            urls = [line.strip() for line in f if line.strip() and ('youtube.com' in line or 'youtu.be' in line)]
+        print(f"   Queued {queue.load(urls):,} new URL(s) | {queue.stats()}")
+        return []
+    if role == '2':
+        worker = QueueWorker(analyzer, queue)
+        print(f"   Worker {worker.worker_id} started (Ctrl+C to stop; leased URLs return to the queue)")
+        analyzer.timer.reset()
+        worker.run(progress=lambda c: print(
+            f"   batches={c['batches']} done={c['done']} failed={c['failed']} lost={c['lost']}"))
+        if worker.quota_exhausted:
+            print(f"   Stopped: API quota exhausted; the remaining URLs stay queued | {queue.stats()}")
+        else:
+            print(f"   Queue drained | {queue.stats()}")
+        return []
+    if role == '4':
+        print(f"   {queue.stats()}")
+        if input("   Collect finished results? (y/n): ").lower() != 'y':
+            return []
+        data = list(queue.results())
+        analyzer.snapshots.append(data)
+        for row in data:
+            analyzer.tag_index.add(row)
+        analyzer.tag_index.save()
+        analyzer.enrich(data)
+        apply_metrics(data)
+        return data
+    print("   Invalid.")
+    return []
+
+
+def discover_videos(analyzer: YouTubeAnalyzerPro) -> List[str]:
+    """Keyword search + regional trending charts → deduplicated watch URLs."""
+    discovery = Discovery(api_key=analyzer.api_key if analyzer.use_api else None,
+                          cache_path=DISCOVERY_CACHE, quota_budget=DISCOVERY_QUOTA)
+    queries = [q.strip() for q in input("\n   Keywords (comma-separated, Enter = none): ").split(',') if q.strip()]
+    regions = []
+    if discovery.use_api:
+        raw = input(f"   Trending regions (comma-separated, Enter = {','.join(DISCOVERY_REGIONS)}, '-' = none): ").strip()
+        regions = [] if raw == '-' else [r.strip().upper() for r in raw.split(',') if r.strip()] or DISCOVERY_REGIONS
+    elif queries:
+        print("   No API key: searching via yt-dlp (no trending charts, date filter = newest first).")
+    if not queries and not regions:
+        print("   Nothing to discover.")
+        return []
+    n = input("   Max videos per source [50]: ").strip()
+    filters = {}
+    if queries:
+        days = input("   Published within N days (Enter = any): ").strip()
+        if days.isdigit():
+            filters['published_after'] = rfc3339(int(days))
+            filters['order'] = 'date'
+        if discovery.use_api:
+            region = input("   Search region code (Enter = any): ").strip().upper()
+            if region:
+                filters['region'] = region
+    records = discovery.discover(queries, regions, int(n) if n.isdigit() else 50, **filters)
+    print(f"   Discovered {len(records):,} unique video(s) | quota used: {discovery.quota_used} "
+          f"| cached sources: {discovery.cache_hits}")
+    for failure in discovery.failures:
+        print(f"   Failed {failure['source']}: {failure['error']}")
+    return [f"https://www.youtube.com/watch?v={r['video_id']}" for r in records]
+
+
+def refresh_tracked(analyzer: YouTubeAnalyzerPro):
+    """Fetch the tracked videos that are due, within today's budget."""
+    scheduler = RefreshScheduler(REFRESH_DB)
+    st = scheduler.stats()
+    print(f"\n   Tracked: {st['tracked']:,} | due: {st['due']:,} | budget left today: {st['budget_left']:,}")
+    if not st['due']:
+        nxt = scheduler.next_due()
+        if nxt:
+            print(f"   Nothing due; next in {max(0, nxt - time.time()) / 60:.0f} min.")
+        return
+    analyzer.timer.reset()
+    rows = refresh_due(analyzer, scheduler, progress=lambda n: print(f"   refreshed {n:,}", end='\r'))
+    st = scheduler.stats()
+    print(f"   Refreshed {len(rows):,} video(s) | still due: {st['due']:,} | budget used today: {st['budget_used']:,}")
+    print(f"   Intervals: <1h {st['hourly']:,} | <1d {st['daily']:,} | slower {st['slower']:,}")
+    print("\n   Fastest growing:")
+    for r in scheduler.fastest(10):
+        print(f"   {r['video_id']}  {r['views']:>14,} views  {r['views_per_hour']:>12,.1f}/h  every {r['interval_s'] / 3600:.1f}h")
+
+
+# ========================================
+#           RESULTS STORE QUERY
+# ========================================
+def query_results(store: ResultsStore) -> List[Dict]:
+    """Filter every stored run; the last result set goes on to show/export."""
+    runs = store.runs(5)
+    if not runs:
+        print("\n   Results store is empty. Analyze some videos first.")
+        return []
+    print("\n   Recent runs:")
+    for r in runs:
+        print(f"   #{r['run']:<5} {r['started']}  {r['source']:<10} {r['backend']:<6} {r['rows']:,} rows")
+    print('\n   Filters: channel:"Name" category:Music country:PK views>1m likes>=10k score>90 (score: 0-100)')
+    print("            after:2024-01-01 before:2024-12-31 run:last run:12 sort:-views <title words>")
+    rows = []
+    while True:
+        text = input("\n   Filter (Enter to finish): ").strip()
+        if not text:
+            break
+        start = time.perf_counter()
+        try:
+            rows = store.query(text)
+            total = store.count(text)
+        except ValueError as e:
+            print(f"   {e}")
+            continue
+        print(f"   {total:,} match(es), showing {len(rows):,} ({(time.perf_counter() - start) * 1000:.0f} ms)")
+        for r in rows[:20]:
+            print(f"   {r.get('views', 0):>14,}  {r.get('title', 'N/A')[:55]:<55}  {r.get('channel_title', 'N/A')[:25]}")
+    return rows
+
+
+# ========================================
+#           NEAR-DUPLICATE CLUSTERS
+# ========================================
+def show_duplicates(analyzer: YouTubeAnalyzerPro):
+    index = analyzer.dedup
+    stored = analyzer.store.count()
+    st = index.stats()
+    if stored > st['videos'] and input(f"\n   {stored - st['videos']:,} stored video(s) not indexed yet. "
+                                       f"Index them now? (y/n): ").lower() == 'y':
+        start = time.perf_counter()
+        index.add(analyzer.store.iter_rows(),
+                  progress=lambda s: print(f"   {s['added'] + s['known']:,} video(s), "
+                                           f"{s['duplicates']:,} duplicate(s)", end='\r'))
+        print(f"\n   Indexed in {time.perf_counter() - start:.1f}s")
+        st = index.stats()
+    if not st['clusters']:
+        print("\n   No near-duplicates found yet.")
+        return
+    print(f"\n   {st['videos']:,} video(s) indexed | {st['clusters']:,} cluster(s) | "
+          f"{st['duplicates']:,} likely duplicate(s)")
+    k = input("   Top clusters [10]: ").strip()
+    clusters = index.clusters(limit=int(k) if k.isdigit() else 10)
+    for c in clusters:
+        print(f"\n   {c['size']} videos, similarity >= {c['min_similarity']:.2f}")
+        for m in c['members'][:10]:
+            tag = 'original' if m['video_id'] == c['original'] else f"{m['similarity']:.2f}"
+            print(f"   {tag:>8}  {m['upload_date'] or 'N/A':<10}  {(m['title'] or 'N/A')[:50]:<50}  "
+                  f"{(m['channel_title'] or 'N/A')[:20]:<20}  {m['url']}")
+        if c['size'] > 10:
+            print(f"   ... {c['size'] - 10} more")
+    if input(f"\n   Save these clusters to {DEDUP_EXPORT}? (y/n): ").lower() == 'y':
+        with open(DEDUP_EXPORT, 'w', encoding='utf-8') as f:
+            json.dump(clusters, f, indent=2, ensure_ascii=False)
+        print(f"   Clusters → {DEDUP_EXPORT}")
+    while True:
+        vid = input("\n   Duplicates of video ID (Enter to finish): ").strip()
+        if not vid:
+            break
+        dups = index.duplicates_of(analyzer.extract_video_id(vid) or vid)
+        print(f"   {len(dups)} likely duplicate(s)")
+        for m in dups[:50]:
+            print(f"   {m['similarity']:.2f}  {(m['title'] or 'N/A')[:55]:<55}  {m['url']}")
+
+
 # ========================================
 #              INTERACTIVE MENU
 # ========================================
@@ -325,7 +724,19 @@ def interactive_menu():
     else:
         print("   API Key loaded.")
 
-    analyzer = YouTubeAnalyzerPro(api_key=api_key)
+    columns = None
+    if api_key:
+        cols = input("   Columns (comma-separated, Enter = all): ").strip()
+        try:
+            columns = parse_columns(cols)
+        except ValueError as e:
+            print(f"   {e}. Using all columns.")
+
+    proxies = None
+    if os.path.exists(PROXY_FILE):
+        proxies = ProxyPool.from_file(PROXY_FILE)
+        print(f"   {len(proxies.proxies)} egress endpoint(s) loaded from {PROXY_FILE}")
+    analyzer = YouTubeAnalyzerPro(api_key=api_key, columns=columns, proxies=proxies)
 
     if analyzer.use_api:
         print("   Using YouTube API v3 (Full Stats)")
@@ -338,30 +749,90 @@ def interactive_menu():
     # Mode
     print("\n   1. Single Video")
     print("   2. Bulk from TXT File")
-    mode = input("   Choose (1/2): ").strip()
+    print("   3. Query Hashtag/Keyword Index")
+    print("   4. Crawl Queue (multi-host)")
+    print("   5. Refresh Tracked Videos (due only)")
+    print("   6. Discover (keyword search / trending)")
+    print("   7. Query Stored Results (all runs)")
+    print("   8. Search Transcripts")
+    print("   9. Near-Duplicate Clusters")
+    mode = input("   Choose (1/2/3/4/5/6/7/8/9): ").strip()
+
+    profiler = None
+    if mode in ('1', '2', '6') and input("   Profile this run? (y/n): ").strip().lower() == 'y':
+        profiler = RunProfiler()
 
     data = []
-    if mode == '1':
-        url = input("\n   YouTube URL: ").strip()
-        if not url: return
-        print("   Analyzing...")
-        res = analyzer.analyze_single(url)
-        if res:
+    try:
+        if mode == '1':
+            url = input("\n   YouTube URL: ").strip()
+            if not url: return
+            print("   Analyzing...")
+            if profiler: profiler.start()
+            try:
+                res = analyzer.analyze_single(url)
+            except FetchError as e:
+                print(f"   Failed ({LABELS[e.error_class]}): {e}")
+                return
             data = [res]
+            analyzer.snapshots.append(data)
+            analyzer.tag_index.add(res)
+            analyzer.tag_index.save()
+            analyzer.enrich(data)
+            apply_metrics(data)
             print("   Done!")
+        elif mode == '2':
+            path = input("\n   TXT File Path: ").strip()
+            if not path: return
+            if profiler: profiler.start()
+            data = analyzer.analyze_bulk_from_file(path)
+            if not data: return
+        elif mode == '3':
+            query_tag_index(analyzer.tag_index)
+            return
+        elif mode == '4':
+            data = crawl_queue(analyzer)
+            if not data: return
+        elif mode == '5':
+            refresh_tracked(analyzer)
+            return
+        elif mode == '6':
+            urls = discover_videos(analyzer)
+            if not urls: return
+            if profiler: profiler.start()
+            data = analyzer.analyze_bulk(urls)
+            if not data: return
+        elif mode == '7':
+            data = query_results(analyzer.store)
+            if not data: return
+        elif mode == '8':
+            search_transcripts()
+            return
+        elif mode == '9':
+            show_duplicates(analyzer)
+            return
         else:
+            print("   Invalid.")
             return
-    elif mode == '2':
-        path = input("\n   TXT File Path: ").strip()
-        if not path: return
-        data = analyzer.analyze_bulk_from_file(path)
-        if not data: return
-    else:
-        print("   Invalid.")
-        return
+    finally:
+        if profiler: profiler.stop()  # also on a failed or empty run; paused while waiting on prompts
+
+    if mode != '7':
+        source = {'1': 'single', '2': 'bulk', '4': 'queue', '6': 'discovery'}[mode]
+        run = analyzer.store.record_run(data, source, 'api' if analyzer.use_api else 'ytdlp')
+        print(f"   Stored as run {run} → {RESULTS_DB} (menu option 7 queries every run)")
+        dup = analyzer.dedup.add(data)
+        if dup['duplicates']:
+            print(f"   Near-duplicates: {dup['duplicates']:,} of {dup['added']:,} new video(s) match earlier ones "
+                  f"(menu option 9 lists the clusters)")
 
     # Show
     analyzer.print_table(data)
+    harvest_comments(analyzer, data)
+    index_transcripts(analyzer, data)
+    if input("\n   Track these videos for scheduled refresh? (y/n): ").lower() == 'y':
+        added = RefreshScheduler(REFRESH_DB).track(data)
+        print(f"   {added:,} new video(s) tracked → {REFRESH_DB} (menu option 5 refreshes the due ones)")
 
     # Export
     print("\n   Export:")
@@ -370,15 +841,22 @@ def interactive_menu():
     json_exp = input("   JSON? (y/n): ").lower() == 'y'
 
     base = "youtube_analysis"
-    if csv:
-        f = input(f"   CSV name [{base}.csv]: ") or f"{base}.csv"
-        analyzer.export_to_csv(data, f)
-    if xlsx:
-        f = input(f"   Excel name [{base}.xlsx]: ") or f"{base}.xlsx"
-        analyzer.export_to_excel(data, f)
-    if json_exp:
-        f = input(f"   JSON name [{base}.json]: ") or f"{base}.json"
-        analyzer.export_to_json(data, f)
+    exported = []
+    for wanted, label, ext, export in ((csv, "CSV", "csv", analyzer.export_to_csv),
+                                       (xlsx, "Excel", "xlsx", analyzer.export_to_excel),
+                                       (json_exp, "JSON", "json", analyzer.export_to_json)):
+        if not wanted:
+            continue
+        f = input(f"   {label} name [{base}.{ext}]: ") or f"{base}.{ext}"
+        if profiler: profiler.start()
+        export(data, f)
+        if profiler: profiler.stop()
+        exported.append(f)
+
+    if profiler:
+        paths = profiler.write(profile_base(exported[0]) if exported else f"{base}.profile")
+        print("\n" + "\n".join("   " + line for line in profiler.report().splitlines()))
+        print(f"   Profile → {paths['prof']}, {paths['collapsed']}, {paths['alloc']}")
 
     print("\n   All done! Follow @YLdplayer85479 for updates!\n")
 
@@ -0,0 +1,128 @@
+"""
+YOUTUBE ANALYZER PRO - METRICS STAGE
+- Runs once over the whole result set (NumPy/pandas, no per-row Python math)
+- Same formulas for API and yt-dlp rows
+- engagement_rate_%, like_dislike_ratio, views_per_day
+- performance_score: percentile within category x upload-age cohort; a cohort
+  under MIN_COHORT rows widens to the category, then to the whole batch, and
+  a batch that small gets an absolute score (a lone video is not the best of one)
+- Non-finite values (ratio without dislikes) reach the rows as None, never NaN
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# Upload-age cohorts in days: <1w, <1m, <3m, <1y, <3y, older
+AGE_BINS = np.array([7, 30, 90, 365, 1095])
+MIN_COHORT = 20               # fewer rows than this and a percentile says nothing
+ABS_VIEWS_PER_DAY = 1e6       # absolute score: this speed (log scale) earns the full 70
+ABS_ENGAGEMENT = 10.0         # absolute score: this engagement % earns the full 30
+
+METRIC_COLUMNS = ['engagement_rate_%', 'like_dislike_ratio', 'views_per_day', 'performance_score']
+INPUT_COLUMNS = ['views', 'likes', 'dislikes', 'upload_date', 'category']
+
+
+def _numeric(df: pd.DataFrame, col: str) -> np.ndarray:
+    if col not in df.columns:
+        return np.zeros(len(df))
+    return pd.to_numeric(df[col], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+
+
+def cohort_percentile(values: np.ndarray, cohorts: np.ndarray) -> np.ndarray:
+    """Percentile rank (0-1] of each value within its cohort; ties share the top rank."""
+    n = len(values)
+    out = np.zeros(n)
+    if not n:
+        return out
+    # Sort by value, then stable-sort by cohort: ties share a rank, so the
+    # value pass need not be stable, and small cohort codes radix-sort fast
+    order = np.argsort(values)
+    key = cohorts[order]
+    order = order[np.argsort(key.astype(np.int16) if key.max() < 2 ** 15 else key, kind='stable')]
+    sc, sv = cohorts[order], values[order]
+    idx = np.arange(n)
+    new_group = np.r_[True, sc[1:] != sc[:-1]]
+    group_start = np.maximum.accumulate(np.where(new_group, idx, 0))
+    run_end_flag = np.r_[new_group[1:] | (sv[1:] != sv[:-1]), True]
+    run_end = np.minimum.accumulate(np.where(run_end_flag, idx, n)[::-1])[::-1]
+    group_size = np.bincount(sc)[sc]
+    out[order] = (run_end - group_start + 1) / group_size
+    return out
+
+
+def compute_metrics(df: pd.DataFrame, now: Optional[datetime] = None) -> pd.DataFrame:
+    """Return a frame of METRIC_COLUMNS aligned with df."""
+    now = pd.Timestamp(now or datetime.now())
+    views = _numeric(df, 'views')
+    likes = _numeric(df, 'likes')
+    dislikes = _numeric(df, 'dislikes')
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        engagement = np.where(views > 0, np.round(likes / views * 100, 2), 0.0)
+        ratio = np.where(dislikes > 0, np.round(likes / dislikes, 2), np.nan)
+
+    if 'upload_date' in df.columns:
+        # Upload dates repeat heavily; parse each distinct string once
+        codes, uniques = pd.factorize(df['upload_date'])
+        uploaded = pd.to_datetime(pd.Series(uniques, dtype=object), errors='coerce', format='%Y-%m-%d')
+        unique_age = np.r_[((now - uploaded).dt.total_seconds() / 86400).to_numpy(dtype=np.float64), np.nan]
+        age = unique_age[codes]  # code -1 (missing) picks the trailing NaN
+    else:
+        age = np.full(len(df), np.nan)
+    known_age = ~np.isnan(age)
+    # Anything uploaded less than a day ago counts as one day old
+    per_day = np.where(known_age, np.round(views / np.clip(age, 1, None), 1), 0.0)
+
+    category = df['category'] if 'category' in df.columns else pd.Series('Other', index=df.index)
+    cat_codes = pd.factorize(category.fillna('Other').astype(str))[0].astype(np.int64)
+    age_codes = np.where(known_age, np.searchsorted(AGE_BINS, np.nan_to_num(age), side='right'), len(AGE_BINS) + 1)
+    cohorts = cat_codes * (len(AGE_BINS) + 2) + age_codes
+
+    # Only rows with real counts compete; failed rows score 0
+    valid = views > 0
+    score = np.zeros(len(df))
+    if valid.any():
+        speed = np.where(known_age, per_day, views)[valid]
+        eng = engagement[valid]
+        # Absolute fallback for rows whose every cohort is too small to rank in
+        result = 100 * (0.7 * np.clip(np.log10(1 + speed) / np.log10(1 + ABS_VIEWS_PER_DAY), 0, 1)
+                        + 0.3 * np.clip(eng / ABS_ENGAGEMENT, 0, 1))
+        # Widest cohort last, so the finest one with enough rows wins
+        pending = np.ones(len(speed), dtype=bool)
+        for groups in (cohorts[valid], cat_codes[valid], np.zeros(len(speed), dtype=np.int64)):
+            c = pd.factorize(groups)[0]
+            use = pending & (np.bincount(c)[c] >= MIN_COHORT)
+            if use.any():
+                ranked = 100 * (0.7 * cohort_percentile(speed, c) + 0.3 * cohort_percentile(eng, c))
+                result[use] = ranked[use]
+                pending &= ~use
+        score[valid] = np.round(result, 1)
+
+    return pd.DataFrame({
+        'engagement_rate_%': engagement,
+        'like_dislike_ratio': ratio,
+        'views_per_day': per_day,
+        'performance_score': score,
+    }, index=df.index)
+
+
+def apply_metrics(rows: List[Dict], now: Optional[datetime] = None) -> List[Dict]:
+    """Fill the metric columns of analyzer result dicts in place."""
+    if not rows:
+        return rows
+    # object columns: pandas' type inference over 1M Python values costs more than the metrics
+    df = pd.DataFrame({c: pd.Series([r.get(c) for r in rows], dtype=object) for c in INPUT_COLUMNS})
+    metrics = compute_metrics(df, now)
+    for c in METRIC_COLUMNS:
+        col = metrics[c].to_numpy()
+        values = col.tolist()
+        if c == 'like_dislike_ratio':
+            # The only column that can be NaN; json.dump would write a bare NaN token
+            values = np.where(np.isfinite(col), col.astype(object), None).tolist()
+        for r, v in zip(rows, values):
+            r[c] = v
+    return rows
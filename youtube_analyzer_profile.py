@@ -0,0 +1,154 @@
+"""
+YOUTUBE ANALYZER PRO - PROFILING MODE
+- cProfile of the thread driving the run (analysis, metrics, exports)
+- Stack sampler over all threads -> flamegraph collapsed-stack file
+- tracemalloc top allocation sites and peak traced memory
+- Can be paused and resumed, so exports land in the same profile
+- Files are written next to the export: <name>.profile.{prof,collapsed,alloc.txt}
+"""
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Dict, List, Optional
+
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+TRACE_FRAMES = 25        # tracemalloc traceback depth
+
+
+def _short(path: str) -> str:
+    return '/'.join(path.replace('\\', '/').split('/')[-2:])
+
+
+def profile_base(export_path: str) -> str:
+    """'out/results.xlsx' -> 'out/results.profile'."""
+    return os.path.splitext(export_path)[0] + '.profile'
+
+
+class RunProfiler:
+    def __init__(self, interval: float = SAMPLE_INTERVAL, frames: int = TRACE_FRAMES):
+        self.interval = interval
+        self.frames = frames
+        self.profile = cProfile.Profile()
+        self.stacks: Counter = Counter()
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self.peak_bytes = 0
+        self.wall = 0.0
+        self.running = False
+        self._owns_tracemalloc = False
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._labels: Dict[object, str] = {}
+        self._t0 = 0.0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    # ---------------- capture ----------------
+
+    def start(self):
+        """Start (or resume) profiling in the calling thread."""
+        if self.running:
+            return
+        self.running = True
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._owns_tracemalloc = True
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._sample_loop, name='profiler-sampler', daemon=True)
+        self._sampler.start()
+        self._t0 = time.perf_counter()
+        self.profile.enable()
+
+    def stop(self):
+        """Pause profiling; the next start() keeps accumulating."""
+        if not self.running:
+            return
+        self.profile.disable()
+        self.wall += time.perf_counter() - self._t0
+        self._stop.set()
+        self._sampler.join()
+        self.peak_bytes = max(self.peak_bytes, tracemalloc.get_traced_memory()[1])
+        self.snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+        ])
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+        self.running = False
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _sample_loop(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    # ---------------- reporting ----------------
+
+    def hotspots(self, n: int = 15) -> List[str]:
+        """Top functions by own time, as printable lines."""
+        stats = pstats.Stats(self.profile).stats
+        total = sum(v[2] for v in stats.values()) or 1
+        ranked = sorted(stats.items(), key=lambda kv: kv[1][2], reverse=True)[:n]
+        lines = []
+        for (filename, line, func), (cc, nc, tt, ct, _) in ranked:
+            where = f"{_short(filename)}:{line}" if line else filename
+            lines.append(f"{tt / total * 100:5.1f}%  own {tt:7.3f}s  cum {ct:7.3f}s  {nc:>9,}x  {func} ({where})")
+        return lines
+
+    def top_allocations(self, n: int = 15) -> List[str]:
+        if self.snapshot is None:
+            return []
+        lines = []
+        for stat in self.snapshot.statistics('lineno')[:n]:
+            frame = stat.traceback[0]
+            lines.append(f"{stat.size / 1024 / 1024:8.2f} MiB  {stat.count:>9,} blocks  "
+                         f"{_short(frame.filename)}:{frame.lineno}")
+        return lines
+
+    def report(self, n: int = 15) -> str:
+        out = [f"Profile: {self.wall:.2f}s wall, {sum(self.stacks.values())} stack samples, "
+               f"peak traced memory {self.peak_bytes / 1024 / 1024:.1f} MiB",
+               "Top hotspots (own time):"]
+        out += ['  ' + line for line in self.hotspots(n)]
+        out.append("Top allocations (live at stop):")
+        out += ['  ' + line for line in self.top_allocations(n)]
+        return '\n'.join(out)
+
+    def write(self, base: str) -> Dict[str, str]:
+        """Write <base>.prof, <base>.collapsed and <base>.alloc.txt; returns the paths."""
+        paths = {'prof': base + '.prof', 'collapsed': base + '.collapsed', 'alloc': base + '.alloc.txt'}
+        self.profile.dump_stats(paths['prof'])
+        with open(paths['collapsed'], 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(paths['alloc'], 'w', encoding='utf-8') as f:
+            f.write(f"peak traced memory: {self.peak_bytes / 1024 / 1024:.1f} MiB\n")
+            f.write('\n'.join(self.top_allocations(50)) + '\n')
+        return paths
@@ -0,0 +1,210 @@
+"""
+YOUTUBE ANALYZER PRO - EGRESS PROXY POOL
+- Configurable egress endpoints ("direct" = no proxy) for yt-dlp and requests
+- Per-endpoint token-bucket rate limit
+- Health score from recent 429s/blocks and latency; cooldown with Retry-After
+- Routing: best-scoring endpoint with a free token (cooling endpoints score 0,
+  so they are only used when nothing else is available)
+- Sticky per video, so a video's stream URL is resolved and used via one IP
+- With no proxies configured the pool is a single unlimited "direct" endpoint
+"""
+
+import random
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, TypeVar, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+T = TypeVar('T')
+
+DEFAULT_RATE = 1.0        # requests/second per endpoint
+DEFAULT_BURST = 3
+WINDOW = 50               # outcomes kept for the health score
+LATENCY_REF = 2.0         # seconds; latency at which the score halves
+COOLDOWN_BASE = 30.0      # seconds after a 429, doubled per consecutive 429
+COOLDOWN_MAX = 900.0
+COOLDOWN_RATE = 0.25      # a cooling endpoint refills tokens at this fraction of its rate
+STICKY_MAX = 10000        # video -> endpoint assignments kept (LRU)
+STICKY_MIN_SCORE = 0.3    # below this a sticky endpoint is abandoned
+THROTTLE_STATUS = (403, 429)
+THROTTLE_TEXT = re.compile(r'HTTP Error (429|403)|Too Many Requests|rate.?limit|Sign in to confirm', re.I)
+
+
+def is_throttle(err: BaseException) -> bool:
+    return bool(THROTTLE_TEXT.search(str(err)))
+
+
+class Proxy:
+    def __init__(self, url: Optional[str], rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        self.url = url  # None = direct
+        self.name = url or 'direct'
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.refilled = time.monotonic()
+        self.outcomes = deque(maxlen=WINDOW)  # 1 = throttled/failed, 0 = ok
+        self.latency = 0.0
+        self.cooldown_until = 0.0
+        self.strikes = 0
+        self.requests = 0
+        self.throttled = 0
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=16)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if url:
+            self.session.proxies = {'http': url, 'https': url}
+
+    @property
+    def ytdlp_opts(self) -> Dict:
+        return {'proxy': self.url} if self.url else {}
+
+    def _refill(self, now: float):
+        if self.rate > 0:
+            rate = self.rate * (COOLDOWN_RATE if now < self.cooldown_until else 1)
+            self.tokens = min(self.burst, self.tokens + (now - self.refilled) * rate)
+        else:
+            self.tokens = float(self.burst)  # rate 0 = unlimited
+        self.refilled = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until this endpoint has a token. Cooldown lowers score and rate, never blocks."""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / (self.rate * (COOLDOWN_RATE if now < self.cooldown_until else 1))
+
+    def score(self, now: float) -> float:
+        if now < self.cooldown_until:
+            return 0.0
+        bad = sum(self.outcomes)
+        success = (len(self.outcomes) - bad + 1) / (len(self.outcomes) + 2)  # Laplace prior
+        return success / (1 + self.latency / LATENCY_REF)
+
+    def snapshot(self, now: float) -> Dict:
+        return {
+            'proxy': self.name, 'score': round(self.score(now), 3), 'requests': self.requests,
+            'throttled': self.throttled, 'latency_ms': round(self.latency * 1000, 1),
+            'cooldown_s': round(max(0.0, self.cooldown_until - now), 1),
+        }
+
+
+class ProxyPool:
+    def __init__(self, proxies: Optional[List[Union[str, Dict]]] = None,
+                 rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        self.proxies: List[Proxy] = []
+        for spec in proxies or []:
+            if isinstance(spec, dict):
+                url = spec.get('url')
+                self.proxies.append(Proxy(None if url in (None, '', 'direct') else url,
+                                          float(spec.get('rate', rate)), int(spec.get('burst', burst))))
+            else:
+                parts = str(spec).split()
+                if not parts or parts[0].startswith('#'):
+                    continue
+                url = None if parts[0] == 'direct' else parts[0]
+                self.proxies.append(Proxy(url, float(parts[1]) if len(parts) > 1 else rate, burst))
+        if not self.proxies:
+            self.proxies = [Proxy(None, rate=0)]
+        self._cond = threading.Condition()
+        self._sticky: 'OrderedDict[str, Proxy]' = OrderedDict()
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> 'ProxyPool':
+        """One endpoint per line: '<url|direct> [requests/sec]'; '#' comments."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls([line.strip() for line in f if line.strip()], **kwargs)
+
+    @property
+    def enabled(self) -> bool:
+        return any(p.url for p in self.proxies)
+
+    # ---------------- routing ----------------
+
+    def acquire(self, key: Optional[str] = None) -> Proxy:
+        """Take a token from the best endpoint (or the key's sticky one), waiting if all are busy."""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                p = self._sticky.get(key) if key else None
+                if p is not None and p.score(now) >= STICKY_MIN_SCORE:
+                    # Stay on the video's endpoint while it is healthy, even if that means waiting
+                    wait = p.wait_time(now)
+                    if wait == 0:
+                        self._sticky.move_to_end(key)
+                        return self._take(p)
+                    self._cond.wait(wait)
+                    continue
+                ready = [p for p in self.proxies if p.wait_time(now) == 0]
+                if ready:
+                    best = max(ready, key=lambda p: (p.score(now), p.tokens, random.random()))
+                    if key:
+                        self._sticky[key] = best
+                        self._sticky.move_to_end(key)
+                        if len(self._sticky) > STICKY_MAX:
+                            self._sticky.popitem(last=False)
+                    return self._take(best)
+                self._cond.wait(min(p.wait_time(now) for p in self.proxies))
+
+    def _take(self, p: Proxy) -> Proxy:
+        p.tokens -= 1
+        p.requests += 1
+        return p
+
+    def report(self, p: Proxy, latency: float, throttled: bool = False, failed: bool = False,
+               retry_after: Optional[float] = None):
+        with self._cond:
+            p.latency = latency if not p.latency else 0.8 * p.latency + 0.2 * latency
+            p.outcomes.append(1 if throttled or failed else 0)
+            if throttled:
+                p.throttled += 1
+                p.strikes += 1
+                cooldown = min(COOLDOWN_MAX, COOLDOWN_BASE * 2 ** (p.strikes - 1))
+                p.cooldown_until = time.monotonic() + max(cooldown, retry_after or 0)
+            elif not failed:
+                p.strikes = 0
+            self._cond.notify_all()
+
+    def call(self, fn: Callable[[Proxy], T], key: Optional[str] = None) -> T:
+        """Run fn(proxy) on a routed endpoint and feed the outcome back into its health."""
+        p = self.acquire(key)
+        t0 = time.monotonic()
+        try:
+            result = fn(p)
+        except Exception as e:
+            self.report(p, time.monotonic() - t0, throttled=is_throttle(e), failed=True)
+            raise
+        status = getattr(result, 'status_code', None)
+        retry_after = None
+        if status in THROTTLE_STATUS:
+            value = result.headers.get('Retry-After', '')
+            retry_after = float(value) if value.isdigit() else None
+        self.report(p, time.monotonic() - t0, throttled=status in THROTTLE_STATUS,
+                    failed=bool(status and status >= 500), retry_after=retry_after)
+        return result
+
+    def call_async(self, submit: Callable[[Proxy], Future], key: Optional[str] = None) -> Future:
+        """Like call() for work that returns a Future; the outcome is reported when it completes."""
+        p = self.acquire(key)
+        t0 = time.monotonic()
+
+        def done(f: Future):
+            e = f.exception()
+            self.report(p, time.monotonic() - t0, throttled=e is not None and is_throttle(e), failed=e is not None)
+
+        future = submit(p)
+        future.add_done_callback(done)
+        return future
+
+    def get(self, url: str, key: Optional[str] = None, **kwargs) -> requests.Response:
+        return self.call(lambda p: p.session.get(url, **kwargs), key)
+
+    def stats(self) -> List[Dict]:
+        now = time.monotonic()
+        with self._cond:
+            return [p.snapshot(now) for p in self.proxies]
@@ -0,0 +1,330 @@
+"""
+YOUTUBE ANALYZER PRO - SHARED CRAWL QUEUE
+- Coordinator loads URLs once; workers on any number of hosts claim batches
+- Claims are time-limited leases, kept alive by heartbeats
+- Expired leases go back to the queue on the next claim (dead box = no lost work);
+  a URL whose leases keep expiring (it crashes or hangs its worker) is marked
+  failed after MAX_ATTEMPTS, so one poison URL cannot cycle forever
+- Lease tokens fence late commits from a worker whose batch was re-leased
+- Backends: SQLite file on a shared volume, or a small HTTP stand-in server
+  (serve_queue + RemoteQueue) when hosts share no filesystem
+- Failures are classified: permanent ones (deleted, private) are marked failed
+  at once instead of being re-leased; an exhausted quota stops the worker and
+  leaves the URL (and the rest of the batch) queued for later
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import requests
+
+from youtube_analyzer_retry import NOT_FOUND, PRIVATE, QUOTA, as_fetch_error
+
+BATCH_SIZE = 25
+LEASE_SECONDS = 300   # a batch must heartbeat (or commit) within this window
+MAX_ATTEMPTS = 3      # leases granted per URL before it is marked failed
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id       INTEGER PRIMARY KEY,
+    url      TEXT NOT NULL UNIQUE,
+    state    TEXT NOT NULL DEFAULT 'queued',   -- queued | leased | done | failed
+    lease    TEXT,
+    owner    TEXT,
+    expires  REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error    TEXT,
+    result   TEXT,
+    updated  REAL
+);
+CREATE INDEX IF NOT EXISTS tasks_state ON tasks(state, expires);
+"""
+
+
+class _QueueAPI:
+    def results(self, page: int = 1000) -> Iterator[Dict]:
+        """All committed result rows, in load order."""
+        after = 0
+        while True:
+            batch = self.results_page(after, page)
+            if not batch:
+                return
+            for _, row in batch:
+                yield row
+            after = batch[-1][0]
+
+
+# ========================================
+#           SQLITE BACKEND
+# ========================================
+class WorkQueue(_QueueAPI):
+    def __init__(self, path: str = "crawl_queue.db"):
+        self.path = path
+        self._local = threading.local()
+        self._db().executescript(SCHEMA)
+
+    def _db(self) -> sqlite3.Connection:
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            # Rollback journal, not WAL: WAL needs shared memory, which network volumes lack
+            db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            self._local.db = db
+        return db
+
+    @contextmanager
+    def _tx(self):
+        db = self._db()
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            yield db
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+
+    def load(self, urls: List[str]) -> int:
+        """Queue URLs; ones already known (in any state) are skipped. Returns the number added."""
+        with self._tx() as db:
+            before = db.total_changes
+            db.executemany("INSERT OR IGNORE INTO tasks (url, updated) VALUES (?, ?)",
+                           ((u, time.time()) for u in urls))
+            return db.total_changes - before
+
+    def claim(self, owner: str, n: int = BATCH_SIZE, lease_s: float = LEASE_SECONDS,
+              max_attempts: int = MAX_ATTEMPTS) -> Tuple[Optional[str], List[Tuple[int, str]]]:
+        """Lease up to n queued URLs: (lease token, [(task id, url)]). Token is None when nothing is left."""
+        now = time.time()
+        with self._tx() as db:
+            db.execute("UPDATE tasks SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+                       "error = CASE WHEN attempts >= ? THEN 'lease expired' ELSE error END, "
+                       "lease = NULL, owner = NULL, expires = NULL, updated = ? "
+                       "WHERE state = 'leased' AND expires < ?", (max_attempts, max_attempts, now, now))
+            rows = db.execute("SELECT id, url FROM tasks WHERE state = 'queued' ORDER BY id LIMIT ?",
+                              (n,)).fetchall()
+            if not rows:
+                return None, []
+            lease = uuid.uuid4().hex
+            db.executemany("UPDATE tasks SET state = 'leased', lease = ?, owner = ?, expires = ?, "
+                           "attempts = attempts + 1, updated = ? WHERE id = ?",
+                           ((lease, owner, now + lease_s, now, tid) for tid, _ in rows))
+        return lease, [(tid, url) for tid, url in rows]
+
+    def heartbeat(self, lease: str, lease_s: float = LEASE_SECONDS) -> int:
+        """Extend a lease; returns tasks still held (0 = lease lost)."""
+        with self._tx() as db:
+            return db.execute("UPDATE tasks SET expires = ? WHERE lease = ? AND state = 'leased'",
+                              (time.time() + lease_s, lease)).rowcount
+
+    def commit(self, lease: str, results: Dict[int, Dict]) -> int:
+        """Store results for tasks still held under this lease; returns how many were accepted."""
+        now = time.time()
+        with self._tx() as db:
+            before = db.total_changes
+            db.executemany("UPDATE tasks SET state = 'done', result = ?, error = NULL, lease = NULL, "
+                           "expires = NULL, updated = ? WHERE id = ? AND lease = ? AND state = 'leased'",
+                           ((json.dumps(row, ensure_ascii=False, default=str), now, int(tid), lease)
+                            for tid, row in results.items()))
+            return db.total_changes - before
+
+    def fail(self, lease: str, errors: Dict[int, str], max_attempts: int = MAX_ATTEMPTS) -> int:
+        """Return failed tasks to the queue, or mark them failed after max_attempts leases."""
+        now = time.time()
+        with self._tx() as db:
+            before = db.total_changes
+            db.executemany("UPDATE tasks SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+                           "error = ?, lease = NULL, owner = NULL, expires = NULL, updated = ? "
+                           "WHERE id = ? AND lease = ? AND state = 'leased'",
+                           ((max_attempts, err[:300], now, int(tid), lease) for tid, err in errors.items()))
+            return db.total_changes - before
+
+    def release(self, lease: str) -> int:
+        """Hand unfinished tasks back without counting an attempt (graceful shutdown)."""
+        with self._tx() as db:
+            return db.execute("UPDATE tasks SET state = 'queued', lease = NULL, owner = NULL, expires = NULL, "
+                              "attempts = MAX(attempts - 1, 0) WHERE lease = ? AND state = 'leased'",
+                              (lease,)).rowcount
+
+    def stats(self) -> Dict[str, int]:
+        counts = {'queued': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        for state, n in self._db().execute("SELECT state, COUNT(*) FROM tasks GROUP BY state"):
+            counts[state] = n
+        counts['workers'] = self._db().execute(
+            "SELECT COUNT(DISTINCT owner) FROM tasks WHERE state = 'leased' AND expires >= ?",
+            (time.time(),)).fetchone()[0]
+        return counts
+
+    def results_page(self, after: int, limit: int) -> List[Tuple[int, Dict]]:
+        rows = self._db().execute("SELECT id, result FROM tasks WHERE state = 'done' AND id > ? "
+                                  "ORDER BY id LIMIT ?", (after, limit)).fetchall()
+        return [(tid, json.loads(result)) for tid, result in rows]
+
+
+# ========================================
+#           HTTP STAND-IN SERVER
+# ========================================
+REMOTE_METHODS = ('load', 'claim', 'heartbeat', 'commit', 'fail', 'release', 'stats', 'results_page')
+
+
+def serve_queue(queue: WorkQueue, port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """Expose a WorkQueue as POST /<method> with JSON kwargs. Call serve_forever() on the result."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            method = self.path.strip('/')
+            if method not in REMOTE_METHODS:
+                self.send_response(404)
+                self.end_headers()
+                return
+            length = int(self.headers.get('Content-Length') or 0)
+            kwargs = json.loads(self.rfile.read(length) or b'{}')
+            try:
+                body = json.dumps({'result': getattr(queue, method)(**kwargs)}, default=str).encode('utf-8')
+                self.send_response(200)
+            except Exception as e:
+                body = json.dumps({'error': f"{type(e).__name__}: {e}"}).encode('utf-8')
+                self.send_response(500)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+class RemoteQueue(_QueueAPI):
+    """Client for serve_queue(); same methods as WorkQueue."""
+
+    def __init__(self, base_url: str, timeout: float = 30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _call(self, method: str, **kwargs):
+        r = self.session.post(f"{self.base_url}/{method}", json=kwargs, timeout=self.timeout)
+        data = r.json()
+        if r.status_code != 200:
+            raise RuntimeError(data.get('error', f"HTTP {r.status_code}"))
+        return data['result']
+
+    def load(self, urls: List[str]) -> int:
+        return self._call('load', urls=urls)
+
+    def claim(self, owner: str, n: int = BATCH_SIZE, lease_s: float = LEASE_SECONDS,
+              max_attempts: int = MAX_ATTEMPTS):
+        lease, tasks = self._call('claim', owner=owner, n=n, lease_s=lease_s, max_attempts=max_attempts)
+        return lease, [tuple(t) for t in tasks]
+
+    def heartbeat(self, lease: str, lease_s: float = LEASE_SECONDS) -> int:
+        return self._call('heartbeat', lease=lease, lease_s=lease_s)
+
+    def commit(self, lease: str, results: Dict[int, Dict]) -> int:
+        return self._call('commit', lease=lease, results=results)
+
+    def fail(self, lease: str, errors: Dict[int, str], max_attempts: int = MAX_ATTEMPTS) -> int:
+        return self._call('fail', lease=lease, errors=errors, max_attempts=max_attempts)
+
+    def release(self, lease: str) -> int:
+        return self._call('release', lease=lease)
+
+    def stats(self) -> Dict[str, int]:
+        return self._call('stats')
+
+    def results_page(self, after: int, limit: int) -> List[Tuple[int, Dict]]:
+        return [tuple(r) for r in self._call('results_page', after=after, limit=limit)]
+
+
+def open_queue(location: str):
+    """'http://host:port' -> RemoteQueue, anything else is a SQLite path."""
+    if location.startswith(('http://', 'https://')):
+        return RemoteQueue(location)
+    return WorkQueue(location)
+
+
+# ========================================
+#           WORKER
+# ========================================
+class QueueWorker:
+    def __init__(self, analyzer, queue, worker_id: Optional[str] = None, batch: int = BATCH_SIZE,
+                 lease_s: float = LEASE_SECONDS, max_attempts: int = MAX_ATTEMPTS):
+        self.analyzer = analyzer
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.batch = batch
+        self.lease_s = lease_s
+        self.max_attempts = max_attempts
+        self.counts = {'batches': 0, 'done': 0, 'failed': 0, 'lost': 0}
+        self.quota_exhausted = False
+
+    def _heartbeat(self, lease: str, stop: threading.Event, lost: threading.Event):
+        while not stop.wait(self.lease_s / 3):
+            try:
+                if not self.queue.heartbeat(lease, self.lease_s):
+                    lost.set()
+                    return
+            except Exception:
+                pass  # transient; the lease has slack for two more tries
+
+    def run(self, stop: Optional[threading.Event] = None,
+            progress: Optional[Callable[[Dict], None]] = None) -> Dict[str, int]:
+        """Claim and process batches until the queue is drained, stop is set or the quota runs out."""
+        stop = stop or threading.Event()
+        while not stop.is_set() and not self.quota_exhausted:
+            lease, tasks = self.queue.claim(self.worker_id, self.batch, self.lease_s, self.max_attempts)
+            if not lease:
+                break
+            hb_stop, lost = threading.Event(), threading.Event()
+            hb = threading.Thread(target=self._heartbeat, args=(lease, hb_stop, lost), daemon=True)
+            hb.start()
+            results, errors, permanent = {}, {}, {}
+            try:
+                for tid, url in tasks:
+                    if stop.is_set() or lost.is_set() or self.quota_exhausted:
+                        break
+                    with self.analyzer.timer.stage('video') as st:
+                        try:
+                            row = self.analyzer.analyze_single(url)
+                        except Exception as e:
+                            row, err = None, as_fetch_error(e)
+                            st.error(err)
+                            if err.error_class == QUOTA:
+                                # Nothing else succeeds on this key today; the URL goes back with the rest
+                                self.quota_exhausted = True
+                                continue
+                            # Retrying a deleted or private video on another lease cannot help
+                            permanent_err = err.error_class in (NOT_FOUND, PRIVATE)
+                            (permanent if permanent_err else errors)[tid] = f"{err.error_class}: {err}"
+                    if row:
+                        results[tid] = row
+            except BaseException:
+                # Ctrl+C / crash: keep what finished, hand the rest back now instead of at lease expiry
+                if results and not lost.is_set():
+                    self.queue.commit(lease, results)
+                self.queue.release(lease)
+                raise
+            finally:
+                hb_stop.set()
+                hb.join()
+            if lost.is_set():
+                self.counts['lost'] += len(tasks)
+                continue
+            if results:
+                self.counts['done'] += self.queue.commit(lease, results)
+            if errors:
+                self.counts['failed'] += self.queue.fail(lease, errors, self.max_attempts)
+            if permanent:
+                self.counts['failed'] += self.queue.fail(lease, permanent, max_attempts=1)
+            self.queue.release(lease)  # anything skipped because of stop or quota
+            self.counts['batches'] += 1
+            if progress:
+                progress(dict(self.counts))
+        return self.counts
@@ -0,0 +1,116 @@
+"""
+YOUTUBE ANALYZER PRO - REFERENCE DATA
+- Channel stats (subscribers, video count, total views) via channels.list, 50 IDs per call
+- Category names via videoCategories.list, loaded once per region
+- Long-TTL JSON cache: a channel or region is fetched at most once per TTL,
+  so per-video rows never cost a call each
+- enrich(rows) adds channel_* columns and replaces guessed category names
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+CHANNEL_BATCH = 50           # channels.list accepts up to 50 IDs per call
+CHANNEL_TTL = 7 * 86400      # subscriber/view counts drift slowly
+CATEGORY_TTL = 30 * 86400    # category lists almost never change
+DEFAULT_REGION = 'US'
+CHANNEL_COLUMNS = ['channel_subscribers', 'channel_videos', 'channel_views']
+
+
+def _int(value) -> Optional[int]:
+    return int(value) if value not in (None, '') else None
+
+
+class ReferenceData:
+    def __init__(self, youtube, path: str = "reference_cache.json",
+                 execute: Optional[Callable] = None, region: str = DEFAULT_REGION):
+        """execute(request) -> response; defaults to request.execute() (pass the analyzer's _execute to count bytes)."""
+        self.youtube = youtube
+        self.path = path
+        self.execute = execute or (lambda req: req.execute())
+        self.region = region
+        self.calls = 0
+        self.data = {'channels': {}, 'categories': {}}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.data.update(json.load(f))
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+            self._dirty = False
+
+    # ---------------- channels ----------------
+
+    def channels(self, channel_ids: Iterable[str]) -> Dict[str, Dict]:
+        """Stats per channel ID; only missing or expired ones are fetched, 50 per call."""
+        now = time.time()
+        cache = self.data['channels']
+        wanted = list(dict.fromkeys(c for c in channel_ids if c and c != 'N/A'))
+        stale = [c for c in wanted if now - cache.get(c, {}).get('ts', 0) > CHANNEL_TTL]
+        for i in range(0, len(stale), CHANNEL_BATCH):
+            batch = stale[i:i + CHANNEL_BATCH]
+            res = self.execute(self.youtube.channels().list(
+                part='statistics', id=','.join(batch), maxResults=CHANNEL_BATCH,
+                fields='items(id,statistics(subscriberCount,hiddenSubscriberCount,videoCount,viewCount))'))
+            self.calls += 1
+            found = {}
+            for item in res.get('items', []):
+                st = item.get('statistics', {})
+                found[item['id']] = {
+                    'subscribers': None if st.get('hiddenSubscriberCount') else _int(st.get('subscriberCount')),
+                    'videos': _int(st.get('videoCount')), 'views': _int(st.get('viewCount')), 'ts': now,
+                }
+            with self._lock:
+                for c in batch:
+                    # Unknown/terminated channels are cached too, so they are not re-asked every run
+                    cache[c] = found.get(c, {'subscribers': None, 'videos': None, 'views': None, 'ts': now})
+                self._dirty = True
+        return {c: cache[c] for c in wanted if c in cache}
+
+    # ---------------- categories ----------------
+
+    def categories(self, region: Optional[str] = None) -> Dict[str, str]:
+        """Category ID -> title for a region, fetched once per CATEGORY_TTL."""
+        region = (region or self.region).upper()
+        entry = self.data['categories'].get(region)
+        if entry and time.time() - entry['ts'] < CATEGORY_TTL:
+            return entry['names']
+        res = self.execute(self.youtube.videoCategories().list(
+            part='snippet', regionCode=region, fields='items(id,snippet/title)'))
+        self.calls += 1
+        names = {item['id']: item['snippet']['title'] for item in res.get('items', [])}
+        with self._lock:
+            self.data['categories'][region] = {'ts': time.time(), 'names': names}
+            self._dirty = True
+        return names
+
+    # ---------------- rows ----------------
+
+    def enrich(self, rows: List[Dict], channels: bool = True, categories: bool = True) -> List[Dict]:
+        """Fill channel_* columns and category names in place (rows need channel_id / category_id)."""
+        if channels:
+            stats = self.channels(r.get('channel_id') for r in rows)
+            for r in rows:
+                st = stats.get(r.get('channel_id'), {})
+                r['channel_subscribers'] = st.get('subscribers')
+                r['channel_videos'] = st.get('videos')
+                r['channel_views'] = st.get('views')
+        if categories and any(r.get('category_id') for r in rows):
+            names = self.categories()
+            for r in rows:
+                name = names.get(r.get('category_id'))
+                if name:
+                    r['category'] = name
+        self.save()
+        return rows
@@ -0,0 +1,303 @@
+"""
+YOUTUBE ANALYZER PRO - REFRESH SCHEDULER
+- Tracked set of video IDs, each with its own next-due time (SQLite)
+- Interval per video from view velocity (refresh when views should have grown
+  ~TARGET_GROWTH), capped by upload age (young videos move fast) and by a
+  staleness bound (nothing waits longer than MAX_STALENESS)
+- Adaptive: intervals shrink at once when a video speeds up and at most double
+  per fetch when it goes quiet
+- Due IDs are taken most-overdue first and packed into 50-ID videos.list calls
+  (1 quota unit each) or yt-dlp batches (1 unit per video)
+- Per-day budget in backend units; whatever does not fit waits for tomorrow
+- Batches go through the analyzer's retry policy; an exhausted API quota ends
+  the pass instead of marking every remaining video as missed
+"""
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from youtube_analyzer_retry import NOT_FOUND, QUOTA, FetchError, as_fetch_error, classify
+
+API_BATCH = 50             # videos.list accepts up to 50 IDs per call
+YTDLP_BATCH = 8            # extractions in flight per batch (one unit each)
+DAILY_BUDGET = 5000        # backend units per UTC day
+MIN_INTERVAL = 15 * 60     # seconds
+MAX_STALENESS = 7 * 86400  # no tracked video goes longer than this without a fetch
+TARGET_GROWTH = 0.02       # refresh after ~2% expected view growth
+MIN_VIEWS = 1000           # growth target floor, so tiny videos are not hammered
+AGE_FRACTION = 0.25        # interval never exceeds this share of the video's age
+BACKOFF = 2.0              # max growth of an interval per fetch (and per miss)
+VELOCITY_ALPHA = 0.5       # EWMA weight of the newest views/hour sample
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracked (
+    video_id TEXT PRIMARY KEY,
+    uploaded REAL,                        -- epoch seconds, NULL if unknown
+    fetched  REAL,                        -- last successful fetch
+    views    INTEGER,
+    velocity REAL NOT NULL DEFAULT 0,     -- views/hour, smoothed
+    interval REAL NOT NULL,
+    due      REAL NOT NULL,
+    misses   INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS tracked_due ON tracked(due);
+CREATE TABLE IF NOT EXISTS budget (
+    day  TEXT PRIMARY KEY,
+    used INTEGER NOT NULL
+);
+"""
+
+
+def _utc_day(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).date().isoformat()
+
+
+def upload_ts(row: Dict) -> Optional[float]:
+    """Upload time from an analyzer row: ISO publishedAt, yt-dlp YYYYMMDD or YYYY-MM-DD."""
+    for key in ('upload_datetime', 'upload_date'):
+        value = row.get(key)
+        if not value or value == 'N/A':
+            continue
+        try:
+            if len(value) == 8 and value.isdigit():
+                dt = datetime.strptime(value, '%Y%m%d')
+            else:
+                dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+            return dt.timestamp()
+        except ValueError:
+            continue
+    return None
+
+
+def plan_interval(now: float, uploaded: Optional[float], views: int, velocity: float,
+                  prev: Optional[float]) -> float:
+    """Seconds until the next fetch."""
+    if velocity > 0:
+        interval = TARGET_GROWTH * max(views, MIN_VIEWS) / (velocity / 3600)
+    else:
+        interval = (prev or MIN_INTERVAL) * BACKOFF  # nothing moved: back off
+    if prev:
+        interval = min(interval, prev * BACKOFF)
+    if uploaded:
+        interval = min(interval, max(MIN_INTERVAL, (now - uploaded) * AGE_FRACTION))
+    return max(MIN_INTERVAL, min(interval, MAX_STALENESS))
+
+
+class RefreshScheduler:
+    def __init__(self, path: str = "refresh.db", daily_budget: int = DAILY_BUDGET):
+        self.path = path
+        self.daily_budget = daily_budget
+        self._local = threading.local()
+        self._db().executescript(SCHEMA)
+
+    def _db(self) -> sqlite3.Connection:
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        return db
+
+    @contextmanager
+    def _tx(self):
+        db = self._db()
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            yield db
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+
+    # ---------------- tracked set ----------------
+
+    def track(self, rows: Iterable[Dict], now: Optional[float] = None) -> int:
+        """Track analyzer rows (or bare {'video_id': ...} dicts); returns how many were new.
+
+        Rows that already carry views count as a first fetch, so the next one is planned from them.
+        """
+        now = now if now is not None else time.time()
+        rows = [r for r in rows if r.get('video_id') and r['video_id'] != 'N/A']
+        with self._tx() as db:
+            before = db.total_changes
+            db.executemany("INSERT OR IGNORE INTO tracked (video_id, uploaded, interval, due) VALUES (?, ?, ?, ?)",
+                           ((r['video_id'], upload_ts(r), MIN_INTERVAL, now) for r in rows))
+            added = db.total_changes - before
+        fetched = [r for r in rows if r.get('views')]
+        if fetched:
+            self.record(fetched, now)
+        return added
+
+    def untrack(self, video_ids: Iterable[str]) -> int:
+        with self._tx() as db:
+            return db.executemany("DELETE FROM tracked WHERE video_id = ?", ((v,) for v in video_ids)).rowcount
+
+    def record(self, rows: Iterable[Dict], now: Optional[float] = None):
+        """Feed fetched counts back: update velocity, plan the next fetch."""
+        now = now if now is not None else time.time()
+        with self._tx() as db:
+            for r in rows:
+                old = db.execute("SELECT uploaded, fetched, views, velocity, interval FROM tracked "
+                                 "WHERE video_id = ?", (r['video_id'],)).fetchone()
+                if old is None:
+                    continue
+                uploaded, fetched, old_views, velocity, prev = old
+                uploaded = uploaded or upload_ts(r)
+                views = int(r.get('views') or 0)
+                if fetched and now > fetched and old_views is not None:
+                    sample = max(0.0, (views - old_views) / ((now - fetched) / 3600))
+                    velocity = VELOCITY_ALPHA * sample + (1 - VELOCITY_ALPHA) * velocity if velocity else sample
+                    interval = plan_interval(now, uploaded, views, velocity, prev)
+                else:
+                    # First sample: lifetime average as the velocity prior, no backoff cap
+                    age_h = (now - uploaded) / 3600 if uploaded else 0
+                    velocity = views / age_h if age_h > 0 else 0.0
+                    interval = plan_interval(now, uploaded, views, velocity, None)
+                db.execute("UPDATE tracked SET uploaded = ?, fetched = ?, views = ?, velocity = ?, interval = ?, "
+                           "due = ?, misses = 0 WHERE video_id = ?",
+                           (uploaded, now, views, velocity, interval, now + interval, r['video_id']))
+
+    def missed(self, video_ids: Iterable[str], now: Optional[float] = None):
+        """No data came back (deleted, private, transient): retry later with a longer interval."""
+        now = now if now is not None else time.time()
+        with self._tx() as db:
+            db.executemany("UPDATE tracked SET misses = misses + 1, interval = MIN(interval * ?, ?), "
+                           "due = ? + MIN(interval * ?, ?) WHERE video_id = ?",
+                           ((BACKOFF, MAX_STALENESS, now, BACKOFF, MAX_STALENESS, v) for v in video_ids))
+
+    # ---------------- scheduling ----------------
+
+    def used(self, now: Optional[float] = None) -> int:
+        row = self._db().execute("SELECT used FROM budget WHERE day = ?",
+                                 (_utc_day(now if now is not None else time.time()),)).fetchone()
+        return row[0] if row else 0
+
+    def remaining(self, now: Optional[float] = None) -> int:
+        return max(0, self.daily_budget - self.used(now))
+
+    def charge(self, units: int, now: Optional[float] = None):
+        day = _utc_day(now if now is not None else time.time())
+        with self._tx() as db:
+            db.execute("INSERT INTO budget (day, used) VALUES (?, ?) "
+                       "ON CONFLICT(day) DO UPDATE SET used = used + excluded.used", (day, units))
+
+    def due(self, now: Optional[float] = None, limit: int = -1) -> List[str]:
+        """Due IDs, never-fetched first, then by how many intervals overdue."""
+        now = now if now is not None else time.time()
+        rows = self._db().execute(
+            "SELECT video_id FROM tracked WHERE due <= ? "
+            "ORDER BY fetched IS NOT NULL, (? - COALESCE(fetched, 0)) / interval DESC LIMIT ?",
+            (now, now, limit)).fetchall()
+        return [r[0] for r in rows]
+
+    def batches(self, size: int = API_BATCH, per_item: bool = False,
+                now: Optional[float] = None) -> List[List[str]]:
+        """Due IDs packed into batches that fit today's remaining budget.
+
+        per_item: the backend costs a unit per video (yt-dlp) rather than per batch (videos.list).
+        """
+        remaining = self.remaining(now)
+        if not remaining:
+            return []
+        ids = self.due(now, remaining if per_item else remaining * size)
+        return [ids[i:i + size] for i in range(0, len(ids), size)]
+
+    def next_due(self) -> Optional[float]:
+        row = self._db().execute("SELECT MIN(due) FROM tracked").fetchone()
+        return row[0] if row else None
+
+    def fastest(self, n: int = 10) -> List[Dict]:
+        rows = self._db().execute("SELECT video_id, views, velocity, interval FROM tracked "
+                                  "ORDER BY velocity DESC LIMIT ?", (n,)).fetchall()
+        return [{'video_id': v, 'views': views, 'views_per_hour': round(vel, 1), 'interval_s': round(iv)}
+                for v, views, vel, iv in rows]
+
+    def stats(self, now: Optional[float] = None) -> Dict:
+        now = now if now is not None else time.time()
+        db = self._db()
+        total, due = db.execute("SELECT COUNT(*), SUM(due <= ?) FROM tracked", (now,)).fetchone()
+        tiers = db.execute(
+            "SELECT SUM(interval < 3600), SUM(interval >= 3600 AND interval < 86400), SUM(interval >= 86400) "
+            "FROM tracked").fetchone()
+        return {'tracked': total, 'due': due or 0, 'budget_used': self.used(now), 'budget_left': self.remaining(now),
+                'hourly': tiers[0] or 0, 'daily': tiers[1] or 0, 'slower': tiers[2] or 0}
+
+
+# ========================================
+#           BACKEND FETCHES
+# ========================================
+def fetch_api(analyzer, video_ids: List[str]) -> List[Dict]:
+    """One videos.list call for up to 50 IDs; statistics + publish time only. Raises FetchError."""
+    with analyzer.timer.stage('api') as st:
+        try:
+            res = analyzer._retry(lambda: analyzer._execute(analyzer.youtube.videos().list(
+                part='snippet,statistics', id=','.join(video_ids),
+                fields='items(id,snippet(title,publishedAt),statistics(viewCount,likeCount,commentCount))')))
+        except FetchError as e:
+            st.error(e)
+            raise
+    rows = []
+    for item in res.get('items', []):
+        sn, stats = item.get('snippet', {}), item.get('statistics', {})
+        rows.append({
+            'video_id': item['id'], 'title': sn.get('title', 'N/A'),
+            'upload_datetime': sn.get('publishedAt') or 'N/A',
+            'views': int(stats.get('viewCount', 0)), 'likes': int(stats.get('likeCount', 0)),
+            'comments': int(stats.get('commentCount', 0)),
+        })
+    return rows
+
+
+def fetch_ytdlp(analyzer, video_ids: List[str]) -> List[Dict]:
+    """Extract a batch concurrently through the analyzer's yt-dlp pool."""
+    pending = [analyzer._submit_metadata(f'https://www.youtube.com/watch?v={v}') for v in video_ids]
+    rows = []
+    for f in pending:
+        with analyzer.timer.stage('ytdlp_metadata') as st:
+            try:
+                info = f.result()
+            except Exception as e:
+                st.error(classify(e)[0])
+                continue
+            if not info or not info.get('id'):
+                st.error(NOT_FOUND)
+                continue
+        rows.append({
+            'video_id': info['id'], 'title': info.get('title', 'N/A'),
+            'upload_datetime': info.get('upload_date') or 'N/A',
+            'views': info.get('view_count') or 0, 'likes': info.get('like_count') or 0,
+            'comments': info.get('comment_count') or 0,
+        })
+    return rows
+
+
+def refresh_due(analyzer, scheduler: RefreshScheduler, progress=None) -> List[Dict]:
+    """Fetch every due video that fits today's budget; snapshots get the new counts."""
+    if analyzer.use_api:
+        fetch, plan = fetch_api, scheduler.batches(API_BATCH)
+    else:
+        fetch, plan = fetch_ytdlp, scheduler.batches(YTDLP_BATCH, per_item=True)
+    refreshed = []
+    for batch in plan:
+        try:
+            rows = fetch(analyzer, batch)
+        except Exception as e:
+            err = as_fetch_error(e)
+            if err.error_class == QUOTA:
+                print(f"   Refresh stopped: {err}")
+                break  # nothing else will succeed today; the rest stays due
+            rows = []
+            print(f"   Refresh batch failed ({err.error_class}): {err}")
+        scheduler.charge(1 if analyzer.use_api else len(batch))
+        got = {r['video_id'] for r in rows}
+        scheduler.record(rows)
+        scheduler.missed([v for v in batch if v not in got])
+        analyzer.snapshots.append(rows)
+        refreshed.extend(rows)
+        if progress:
+            progress(len(refreshed))
+    return refreshed
@@ -0,0 +1,187 @@
+"""
+YOUTUBE ANALYZER PRO - RETRY POLICY
+- Classifies failures: not_found, private, quota, rate_limited, transient, extractor
+- Only retryable classes are retried (rate_limited, transient, extractor once),
+  with exponential backoff and full jitter
+- Retry-After (seconds or HTTP date) from requests responses and Data API
+  HttpErrors is honored as the minimum wait
+- Permanent classes (not_found, private, quota) fail at once instead of burning
+  the retry budget
+- FetchError carries the class (error_class, like the pool and control
+  exceptions), so stage timings and result rows record it
+"""
+
+import json
+import random
+import re
+import socket
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+
+import requests
+
+# Optional: Data API errors
+try:
+    from googleapiclient.errors import HttpError
+except ImportError:
+    HttpError = None
+
+T = TypeVar('T')
+
+NOT_FOUND = 'not_found'
+PRIVATE = 'private'
+QUOTA = 'quota'
+RATE_LIMITED = 'rate_limited'
+TRANSIENT = 'transient'
+EXTRACTOR = 'extractor'
+
+ATTEMPTS = {RATE_LIMITED: 5, TRANSIENT: 4, EXTRACTOR: 2}  # total tries; other classes get 1
+BACKOFF_BASE = 1.0       # seconds; attempt n waits up to BACKOFF_BASE * 2**n
+BACKOFF_CAP = 60.0
+MAX_RETRY_AFTER = 300.0  # a longer Retry-After fails now instead of stalling the run
+
+LABELS = {
+    NOT_FOUND: 'Deleted / not found',
+    PRIVATE: 'Private / restricted',
+    QUOTA: 'API quota exhausted',
+    RATE_LIMITED: 'Rate limited - try later',
+    TRANSIENT: 'Network error - try again',
+    EXTRACTOR: 'Extractor error - update yt-dlp',
+}
+
+# yt-dlp only reports through messages; first match wins
+MESSAGE_CLASSES = [
+    (RATE_LIMITED, re.compile(r"HTTP Error 429|Too Many Requests|rate.?limit|not a bot", re.I)),
+    (PRIVATE, re.compile(r"Private video|members.only|Join this channel|age.restricted|confirm your age|"
+                         r"inappropriate|not available in your country|geo.?restrict", re.I)),
+    (NOT_FOUND, re.compile(r"Video unavailable|has been removed|does not exist|no longer available|"
+                           r"account .*terminated|Incomplete YouTube ID|HTTP Error 404|Invalid URL", re.I)),
+    (TRANSIENT, re.compile(r"timed? ?out|Connection (reset|refused|aborted)|Temporary failure|Network is unreachable|"
+                           r"Unable to download (webpage|API page)|HTTP Error 5\d\d|RemoteDisconnected|"
+                           r"IncompleteRead|EOF occurred", re.I)),
+]
+API_REASONS = {
+    'quotaExceeded': QUOTA, 'dailyLimitExceeded': QUOTA,
+    'rateLimitExceeded': RATE_LIMITED, 'userRateLimitExceeded': RATE_LIMITED,
+    'videoNotFound': NOT_FOUND, 'notFound': NOT_FOUND, 'forbidden': PRIVATE,
+}
+NETWORK_ERRORS = (requests.ConnectionError, requests.Timeout, socket.timeout, ConnectionError, TimeoutError)
+
+
+class FetchError(Exception):
+    def __init__(self, error_class: str, message: str = '', retry_after: Optional[float] = None):
+        super().__init__(message or LABELS.get(error_class, error_class))
+        self.error_class = error_class
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.error_class in ATTEMPTS
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Retry-After header value (delta seconds or HTTP date) -> seconds from now."""
+    if not value:
+        return None
+    value = str(value).strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def status_class(status: int) -> Optional[str]:
+    if status in (404, 410):
+        return NOT_FOUND
+    if status == 429:
+        return RATE_LIMITED
+    if status in (401, 403):
+        return PRIVATE
+    if status >= 500 or status == 408:
+        return TRANSIENT
+    return None
+
+
+def check_response(resp: requests.Response) -> requests.Response:
+    """Raise a classified FetchError for a non-2xx response."""
+    if resp.status_code < 400:
+        return resp
+    cls = status_class(resp.status_code) or EXTRACTOR
+    raise FetchError(cls, f"HTTP {resp.status_code}", parse_retry_after(resp.headers.get('Retry-After')))
+
+
+def _api_error(e) -> Tuple[str, Optional[float]]:
+    status = int(getattr(e.resp, 'status', 0) or 0)
+    reason = ''
+    try:
+        errors = json.loads(e.content.decode('utf-8'))['error'].get('errors') or [{}]
+        reason = errors[0].get('reason', '')
+    except (ValueError, KeyError, AttributeError, TypeError):
+        pass
+    retry_after = parse_retry_after(e.resp.get('retry-after')) if hasattr(e.resp, 'get') else None
+    return API_REASONS.get(reason) or status_class(status) or EXTRACTOR, retry_after
+
+
+def as_fetch_error(err: BaseException) -> FetchError:
+    if isinstance(err, FetchError):
+        return err
+    cls, retry_after = classify(err)
+    return FetchError(cls, f"{type(err).__name__}: {err}", retry_after)
+
+
+def classify(err: BaseException) -> Tuple[str, Optional[float]]:
+    """Exception -> (error class, Retry-After seconds or None)."""
+    if isinstance(err, FetchError):
+        return err.error_class, err.retry_after
+    if HttpError is not None and isinstance(err, HttpError):
+        return _api_error(err)
+    if getattr(err, 'error_class', None) in ('TaskTimeout', 'WorkerCrashed'):
+        return TRANSIENT, None
+    if isinstance(err, NETWORK_ERRORS):
+        return TRANSIENT, None
+    message = str(err)
+    for cls, pattern in MESSAGE_CLASSES:
+        if pattern.search(message):
+            return cls, None
+    if isinstance(err, OSError):
+        return TRANSIENT, None
+    return EXTRACTOR, None
+
+
+class RetryPolicy:
+    def __init__(self, attempts: Optional[Dict[str, int]] = None, base: float = BACKOFF_BASE,
+                 cap: float = BACKOFF_CAP, max_retry_after: float = MAX_RETRY_AFTER):
+        self.attempts = ATTEMPTS if attempts is None else attempts
+        self.base = base
+        self.cap = cap
+        self.max_retry_after = max_retry_after
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full jitter: uniform(0, min(cap, base * 2**attempt)), never less than Retry-After."""
+        return max(retry_after or 0.0, random.uniform(0, min(self.cap, self.base * 2 ** attempt)))
+
+    def call(self, fn: Callable[[], T], sleep: Callable[[float], None] = time.sleep,
+             on_retry: Optional[Callable[[FetchError, float], None]] = None) -> T:
+        """fn() with retries for retryable classes; raises FetchError once it gives up.
+
+        sleep: a RunControl's sleep makes the backoff cancellable.
+        """
+        attempt = 0
+        while True:
+            try:
+                return fn()
+            except Exception as e:
+                err = as_fetch_error(e)
+                attempt += 1
+                if (attempt >= self.attempts.get(err.error_class, 1)
+                        or (err.retry_after or 0) > self.max_retry_after):
+                    if err is e:
+                        raise
+                    raise err from e
+                wait = self.delay(attempt, err.retry_after)
+                if on_retry:
+                    on_retry(err, wait)
+                sleep(wait)
@@ -0,0 +1,240 @@
+"""
+YOUTUBE ANALYZER PRO - SNAPSHOT STORE
+- Append-only time series of views/likes/comments/dislikes per video
+- One partition per UTC day, delta-encoded per video (int32 deltas)
+- Memory-mapped reads + per-partition video index for fast scans
+- Queries: views over time for one video, top N by 24h view velocity
+
+Layout of the store directory:
+  videos.txt          one video_id per line (line number = numeric id)
+  YYYY-MM-DD.key      keyframe per video: absolute counts at its first
+                      snapshot of the day
+  YYYY-MM-DD.rec      fixed-size records: delta vs the previous snapshot of
+                      the same video in the same partition (0 for the first)
+  YYYY-MM-DD.ord.npy  sealed partitions only: record order grouped by video
+  YYYY-MM-DD.off.npy  sealed partitions only: CSR offsets into .ord.npy
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+COUNTERS = ('views', 'likes', 'comments', 'dislikes')
+
+REC_DTYPE = np.dtype([('vid', '<u4'), ('ts', '<u4')] + [(c, '<i4') for c in COUNTERS])
+KEY_DTYPE = np.dtype([('vid', '<u4')] + [(c, '<i8') for c in COUNTERS])
+ABS_DTYPE = np.dtype([('vid', '<u4'), ('ts', '<u4')] + [(c, '<i8') for c in COUNTERS])
+
+INT32_MAX = np.iinfo(np.int32).max
+
+
+def _day(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).date().isoformat()
+
+
+def _read(path: str, dtype: np.dtype) -> np.ndarray:
+    # np.memmap refuses empty files; a missing or empty partition is just empty
+    if not os.path.exists(path):
+        return np.empty(0, dtype=dtype)
+    n = os.path.getsize(path) // dtype.itemsize
+    if n == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', shape=(n,))
+
+
+class SnapshotStore:
+    def __init__(self, root: str = "snapshots"):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._ids_path = os.path.join(root, "videos.txt")
+        self._ids: List[str] = []
+        self._vid: Dict[str, int] = {}
+        if os.path.exists(self._ids_path):
+            with open(self._ids_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    self._register(line.strip())
+        # Last absolute counts per numeric id for the partition being written
+        self._open_day: Optional[str] = None
+        self._last: Dict[int, Tuple[int, ...]] = {}
+
+    # ---------------- writing ----------------
+
+    def _register(self, video_id: str) -> int:
+        idx = self._vid.get(video_id)
+        if idx is None:
+            idx = len(self._ids)
+            self._ids.append(video_id)
+            self._vid[video_id] = idx
+        return idx
+
+    def _load_last(self, day: str):
+        self._open_day = day
+        self._last = {}
+        absolute = self._absolute(day)
+        if len(absolute):
+            # Records come back grouped by video in append order: last one wins
+            ends = np.flatnonzero(np.r_[absolute['vid'][1:] != absolute['vid'][:-1], True])
+            for row in absolute[ends]:
+                self._last[int(row['vid'])] = tuple(int(row[c]) for c in COUNTERS)
+
+    def append(self, rows: Iterable[Dict], ts: Optional[float] = None):
+        """Append one snapshot per row (analyzer result dicts)."""
+        ts = int(ts if ts is not None else time.time())
+        day = _day(ts)
+        with self._lock:
+            if day != self._open_day:
+                self._load_last(day)
+
+            new_ids, keys, recs = [], [], []
+            for r in rows:
+                video_id = r.get('video_id')
+                if not video_id or video_id == 'N/A':
+                    continue
+                if video_id not in self._vid:
+                    new_ids.append(video_id)
+                vid = self._register(video_id)
+                values = tuple(int(r.get(c) or 0) for c in COUNTERS)
+                prev = self._last.get(vid)
+                if prev is None:
+                    keys.append((vid,) + values)
+                    deltas = (0,) * len(COUNTERS)
+                else:
+                    # Counts never move by 2^31 within a day; clip defensively
+                    deltas = tuple(max(-INT32_MAX, min(INT32_MAX, v - p)) for v, p in zip(values, prev))
+                self._last[vid] = values
+                recs.append((vid, ts) + deltas)
+
+            if not recs:
+                return
+            if new_ids:
+                with open(self._ids_path, 'a', encoding='utf-8') as f:
+                    f.write(''.join(i + '\n' for i in new_ids))
+            # Keyframes first, so a record never references a missing key
+            if keys:
+                with open(self._path(day, 'key'), 'ab') as f:
+                    f.write(np.array(keys, dtype=KEY_DTYPE).tobytes())
+            with open(self._path(day, 'rec'), 'ab') as f:
+                f.write(np.array(recs, dtype=REC_DTYPE).tobytes())
+
+    # ---------------- reading ----------------
+
+    def _path(self, day: str, ext: str) -> str:
+        return os.path.join(self.root, f"{day}.{ext}")
+
+    def days(self) -> List[str]:
+        return sorted(f[:-4] for f in os.listdir(self.root) if f.endswith('.rec'))
+
+    def _index(self, day: str, rec: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(order, offsets): records grouped by numeric video id, CSR style."""
+        ord_path, off_path = self._path(day, 'ord.npy'), self._path(day, 'off.npy')
+        sealed = day < _day(time.time())
+        if sealed and os.path.exists(off_path):
+            off = np.load(off_path, mmap_mode='r')
+            if len(off) and off[-1] == len(rec):
+                return np.load(ord_path, mmap_mode='r'), off
+        order = np.argsort(rec['vid'], kind='stable')
+        counts = np.bincount(rec['vid'], minlength=len(self._ids))
+        off = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=off[1:])
+        if sealed:
+            np.save(ord_path, order)
+            np.save(off_path, off)
+        return order, off
+
+    def _keyframes(self, day: str) -> Tuple[np.ndarray, np.ndarray]:
+        keys = _read(self._path(day, 'key'), KEY_DTYPE)
+        sort = np.argsort(keys['vid'], kind='stable')
+        return keys['vid'][sort], keys[sort]
+
+    def _absolute(self, day: str, vids: Optional[np.ndarray] = None) -> np.ndarray:
+        """Absolute counts for a partition, grouped by video in time order."""
+        rec = _read(self._path(day, 'rec'), REC_DTYPE)
+        if not len(rec):
+            return np.empty(0, dtype=ABS_DTYPE)
+        order, off = self._index(day, rec)
+        if vids is not None:
+            vids = vids[vids < len(off) - 1]
+            pos = np.concatenate([order[off[v]:off[v + 1]] for v in vids]) if len(vids) else np.empty(0, np.int64)
+            sel = rec[pos]
+        else:
+            sel = rec[order]
+
+        out = np.empty(len(sel), dtype=ABS_DTYPE)
+        if not len(sel):
+            return out
+        out['vid'], out['ts'] = sel['vid'], sel['ts']
+        key_vids, keys = self._keyframes(day)
+        k = keys[np.searchsorted(key_vids, sel['vid'])]
+        starts = np.flatnonzero(np.r_[True, sel['vid'][1:] != sel['vid'][:-1]])
+        lengths = np.diff(np.r_[starts, len(sel)])
+        for c in COUNTERS:
+            run = np.cumsum(sel[c], dtype=np.int64)
+            before = run[starts] - sel[c][starts]
+            out[c] = run - np.repeat(before, lengths) + k[c]
+        return out
+
+    def series(self, video_id: str, start: Optional[float] = None,
+               end: Optional[float] = None) -> np.ndarray:
+        """All snapshots for one video as a structured array (ts + counts)."""
+        vid = self._vid.get(video_id)
+        if vid is None:
+            return np.empty(0, dtype=ABS_DTYPE)
+        first = _day(start) if start is not None else ''
+        last = _day(end) if end is not None else '9999-12-31'
+        parts = [self._absolute(d, np.array([vid])) for d in self.days() if first <= d <= last]
+        out = np.concatenate(parts) if parts else np.empty(0, dtype=ABS_DTYPE)
+        if start is not None:
+            out = out[out['ts'] >= start]
+        if end is not None:
+            out = out[out['ts'] <= end]
+        return out
+
+    def views_over_time(self, video_id: str, start: Optional[float] = None,
+                        end: Optional[float] = None) -> List[Tuple[datetime, int]]:
+        s = self.series(video_id, start, end)
+        return [(datetime.fromtimestamp(int(t), timezone.utc), int(v)) for t, v in zip(s['ts'], s['views'])]
+
+    def top_velocity(self, n: int = 10, now: Optional[float] = None,
+                     window: float = 86400) -> List[Dict]:
+        """Top N videos by views gained per 24h over the trailing window."""
+        now = int(now if now is not None else time.time())
+        cutoff = now - window
+        # One extra day back so there is a baseline at or before the cutoff
+        wanted = {_day(now - i * 86400) for i in range(int(window // 86400) + 2)}
+        parts = [self._absolute(d) for d in self.days() if d in wanted]
+        if not parts:
+            return []
+        a = np.concatenate(parts)
+        a = a[a['ts'] <= now]
+        if not len(a):
+            return []
+        # Partitions are in day order and time-ordered per video, so a stable
+        # sort by video keeps each video's snapshots chronological
+        a = a[np.argsort(a['vid'], kind='stable')]
+
+        idx = np.arange(len(a))
+        starts = np.flatnonzero(np.r_[True, a['vid'][1:] != a['vid'][:-1]])
+        ends = np.r_[starts[1:], len(a)] - 1
+        # Baseline: last snapshot at/before the cutoff, else the first in range
+        old = np.maximum.accumulate(np.where(a['ts'] <= cutoff, idx, -1))
+        base = np.maximum(old[ends], starts)
+        elapsed = a['ts'][ends].astype(np.int64) - a['ts'][base]
+        ok = (elapsed > 0) & (a['ts'][ends] > cutoff)
+        if not ok.any():
+            return []
+        gained = a['views'][ends] - a['views'][base]
+        velocity = np.where(ok, gained * 86400.0 / np.maximum(elapsed, 1), -np.inf)
+
+        top = np.argsort(-velocity, kind='stable')[:min(n, int(ok.sum()))]
+        return [{
+            'video_id': self._ids[int(a['vid'][ends[i]])],
+            'views_per_24h': round(float(velocity[i]), 1),
+            'views': int(a['views'][ends[i]]),
+            'hours_observed': round(float(elapsed[i]) / 3600, 2),
+        } for i in top]
@@ -0,0 +1,212 @@
+"""
+YOUTUBE ANALYZER PRO - RESULTS STORE
+- Embedded SQLite store: one row per video, upserted by every run
+- Run metadata: runs table (source, backend, time, row count); each video keeps
+  first_run, last_run and how many runs have seen it
+- Indexed: channel, category (+views), upload_date, views, last_run
+- Full result row kept as JSON, so query results export like a fresh run
+- One-line filter syntax for the interactive menu and the GUI filter box:
+    channel:"Some Channel"  category:Music  country:PK  views>1m  likes>=10k  score>90
+    after:2024-01-01  before:2024-06-30  run:last  run:12  sort:-views  <title words>
+  (score is performance_score, 0-100)
+"""
+
+import json
+import re
+import shlex
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+QUERY_LIMIT = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id       INTEGER PRIMARY KEY,
+    started  REAL NOT NULL,
+    source   TEXT,
+    backend  TEXT,
+    rows     INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS videos (
+    video_id      TEXT PRIMARY KEY,
+    title         TEXT,
+    channel_id    TEXT,
+    channel_title TEXT COLLATE NOCASE,
+    category      TEXT COLLATE NOCASE,
+    country       TEXT COLLATE NOCASE,
+    upload_date   TEXT,
+    views         INTEGER,
+    likes         INTEGER,
+    comments      INTEGER,
+    score         REAL,
+    engagement    REAL,
+    first_run     INTEGER,
+    last_run      INTEGER,
+    seen          INTEGER NOT NULL DEFAULT 1,
+    data          TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS videos_channel ON videos(channel_title);
+CREATE INDEX IF NOT EXISTS videos_channel_id ON videos(channel_id);
+CREATE INDEX IF NOT EXISTS videos_category ON videos(category, views);
+CREATE INDEX IF NOT EXISTS videos_upload ON videos(upload_date);
+CREATE INDEX IF NOT EXISTS videos_views ON videos(views);
+CREATE INDEX IF NOT EXISTS videos_run ON videos(last_run);
+"""
+
+# filter key -> column
+TEXT_FILTERS = {'channel': 'channel_title', 'channel_id': 'channel_id', 'category': 'category',
+                'country': 'country', 'id': 'video_id'}
+NUMERIC_FILTERS = {'views': 'views', 'likes': 'likes', 'comments': 'comments', 'score': 'score',
+                   'eng': 'engagement', 'seen': 'seen'}
+SORTABLE = {**NUMERIC_FILTERS, 'upload_date': 'upload_date', 'date': 'upload_date', 'title': 'title',
+            'channel': 'channel_title', 'run': 'last_run'}
+SUFFIX = {'k': 1e3, 'm': 1e6, 'b': 1e9}
+COMPARE = re.compile(r'^(\w+)(>=|<=|>|<|=)([\d.]+[kmb]?)$', re.I)
+
+
+def _number(text: str) -> float:
+    text = text.lower()
+    if text[-1] in SUFFIX:
+        return float(text[:-1]) * SUFFIX[text[-1]]
+    return float(text)
+
+
+def parse_filter(text: str) -> Tuple[str, List, str]:
+    """Filter line -> (WHERE clause, params, ORDER BY). Raises ValueError on unknown keys."""
+    where, params, order = [], [], 'views DESC'
+    try:
+        tokens = shlex.split(text or '')
+    except ValueError:  # unbalanced quote, e.g. an apostrophe in a title word
+        tokens = (text or '').split()
+    for token in tokens:
+        m = COMPARE.match(token)
+        if m:
+            key, op, value = m.group(1).lower(), m.group(2), m.group(3)
+            if key not in NUMERIC_FILTERS:
+                raise ValueError(f"Unknown numeric filter: {key}")
+            where.append(f"{NUMERIC_FILTERS[key]} {op} ?")
+            params.append(_number(value))
+            continue
+        key, sep, value = token.partition(':')
+        key = key.lower()
+        if not sep:
+            where.append("title LIKE ?")  # bare words: title substring, scanned not indexed
+            params.append(f"%{token}%")
+        elif key in TEXT_FILTERS:
+            where.append(f"{TEXT_FILTERS[key]} = ?")
+            params.append(value)
+        elif key in ('after', 'before'):
+            where.append(f"upload_date {'>=' if key == 'after' else '<='} ?")
+            params.append(value)
+        elif key == 'run':
+            if value == 'last':
+                where.append("last_run = (SELECT MAX(id) FROM runs)")
+            else:
+                where.append("last_run = ?")
+                params.append(int(value))
+        elif key == 'sort':
+            desc = value.startswith('-')
+            col = SORTABLE.get(value.lstrip('-+').lower())
+            if not col:
+                raise ValueError(f"Cannot sort by: {value}")
+            # SQLite sorts NULL (undated rows) first ascending; keep them last. DESC already does.
+            order = f"{col} DESC" if desc else f"{col} IS NULL, {col} ASC"
+        else:
+            raise ValueError(f"Unknown filter: {key}")
+    return (' AND '.join(where) or '1'), params, order
+
+
+def _date(value) -> Optional[str]:
+    """NULL for undated rows, so after:/before: exclude them instead of comparing 'N/A' as text."""
+    return value if value and value != 'N/A' else None
+
+
+class ResultsStore:
+    def __init__(self, path: str = "results.db"):
+        self.path = path
+        self._local = threading.local()
+        self._db().executescript(SCHEMA)
+        # Stores written before undated rows became NULL: 'N/A' passed every after: filter
+        self._db().execute("UPDATE videos SET upload_date = NULL WHERE upload_date IN ('N/A', '')")
+
+    def _db(self) -> sqlite3.Connection:
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')  # local file: readers never block the writer
+            db.execute('PRAGMA synchronous=NORMAL')
+        return db
+
+    @contextmanager
+    def _tx(self):
+        db = self._db()
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            yield db
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+
+    # ---------------- writing ----------------
+
+    def record_run(self, rows: Iterable[Dict], source: str = '', backend: str = '') -> int:
+        """Upsert a run's rows by video_id; failed placeholders (rows with an 'error' class) are
+        never stored over real data. Returns the run id."""
+        rows = [r for r in rows if r.get('video_id') not in (None, '', 'N/A') and not r.get('error')]
+        with self._tx() as db:
+            run = db.execute("INSERT INTO runs (started, source, backend, rows) VALUES (?, ?, ?, ?)",
+                             (time.time(), source, backend, len(rows))).lastrowid
+            db.executemany("""
+                INSERT INTO videos (video_id, title, channel_id, channel_title, category, country, upload_date,
+                                    views, likes, comments, score, engagement, first_run, last_run, data)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(video_id) DO UPDATE SET
+                    title = excluded.title, channel_id = excluded.channel_id,
+                    channel_title = excluded.channel_title, category = excluded.category,
+                    country = excluded.country, upload_date = excluded.upload_date, views = excluded.views,
+                    likes = excluded.likes, comments = excluded.comments, score = excluded.score,
+                    engagement = excluded.engagement, last_run = excluded.last_run,
+                    seen = seen + 1, data = excluded.data
+            """, ((r['video_id'], r.get('title'), r.get('channel_id'), r.get('channel_title'), r.get('category'),
+                   r.get('country'), _date(r.get('upload_date')), r.get('views'), r.get('likes'), r.get('comments'),
+                   r.get('performance_score'), r.get('engagement_rate_%'), run, run,
+                   json.dumps(r, ensure_ascii=False, default=str)) for r in rows))
+        return run
+
+    # ---------------- reading ----------------
+
+    def query(self, text: str = '', limit: int = QUERY_LIMIT, offset: int = 0) -> List[Dict]:
+        """Rows matching a filter line (see module docstring), as full result dicts."""
+        where, params, order = parse_filter(text)
+        cur = self._db().execute(
+            f"SELECT data, first_run, last_run, seen FROM videos WHERE {where} ORDER BY {order} LIMIT ? OFFSET ?",
+            params + [limit, offset])
+        out = []
+        for data, first_run, last_run, seen in cur:
+            row = json.loads(data)
+            row.update(first_run=first_run, last_run=last_run, seen=seen)
+            out.append(row)
+        return out
+
+    def iter_rows(self, batch: int = 1000) -> Iterator[Dict]:
+        """Every stored row, streamed (whole-corpus passes such as near-duplicate indexing)."""
+        cur = self._db().execute("SELECT data FROM videos")
+        while True:
+            chunk = cur.fetchmany(batch)
+            if not chunk:
+                return
+            for (data,) in chunk:
+                yield json.loads(data)
+
+    def count(self, text: str = '') -> int:
+        where, params, _ = parse_filter(text)
+        return self._db().execute(f"SELECT COUNT(*) FROM videos WHERE {where}", params).fetchone()[0]
+
+    def runs(self, n: int = 10) -> List[Dict]:
+        cur = self._db().execute("SELECT id, started, source, backend, rows FROM runs ORDER BY id DESC LIMIT ?", (n,))
+        return [{'run': i, 'started': time.strftime('%Y-%m-%d %H:%M', time.localtime(t)), 'source': s,
+                 'backend': b, 'rows': r} for i, t, s, b, r in cur]
@@ -0,0 +1,162 @@
+"""
+YOUTUBE ANALYZER PRO - THUMBNAIL STAGE
+- Concurrent downloads over one pooled requests.Session
+- Size fallback: maxres -> sd -> hq (many videos have no maxres)
+- Content-addressed on-disk cache (sha256), identical images stored once
+- Small PNG previews for the Results tab (needs Pillow)
+- Re-runs are served from the cache without touching the network
+- Result rows are left alone: local paths live in `previews` (video_id -> PNG),
+  so they never reach exports or the results store
+"""
+
+import hashlib
+import io
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Optional: previews
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+
+THUMB_URL = "https://i.ytimg.com/vi/{video_id}/{size}.jpg"
+THUMB_SIZES = ['maxresdefault', 'sddefault', 'hqdefault']
+PREVIEW_SIZE = (96, 54)
+
+
+class ThumbnailCache:
+    def __init__(self, root: str = "thumbnails", workers: int = 8, timeout: float = 10):
+        self.root = root
+        self.workers = workers
+        self.timeout = timeout
+        self.objects_dir = os.path.join(root, "objects")
+        self.previews_dir = os.path.join(root, "previews")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.previews_dir, exist_ok=True)
+        self.index_path = os.path.join(root, "index.json")
+        self.index: Dict[str, Dict] = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=workers, max_retries=2)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.stats = {'hits': 0, 'downloads': 0, 'missing': 0, 'bytes': 0}
+        self.previews: Dict[str, Optional[str]] = {}  # video_id -> preview PNG, for the Results tab
+
+    # ---------------- storage ----------------
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest + ".jpg")
+
+    def _preview_path(self, digest: str) -> str:
+        return os.path.join(self.previews_dir, digest + ".png")
+
+    def _store(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return digest
+
+    def _make_preview(self, digest: str, data: Optional[bytes] = None) -> Optional[str]:
+        if not PIL_AVAILABLE:
+            return None
+        path = self._preview_path(digest)
+        if os.path.exists(path):
+            return path
+        try:
+            src = io.BytesIO(data) if data is not None else self._object_path(digest)
+            with Image.open(src) as img:
+                img = img.convert('RGB')
+                img.thumbnail(PREVIEW_SIZE)
+                img.save(path, 'PNG')
+            return path
+        except Exception:
+            return None
+
+    def save(self):
+        with self._lock:
+            tmp = self.index_path + ".tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.index, f)
+            os.replace(tmp, self.index_path)
+
+    # ---------------- fetching ----------------
+
+    def lookup(self, video_id: str) -> Optional[Dict]:
+        entry = self.index.get(video_id)
+        if entry and os.path.exists(self._object_path(entry['sha256'])):
+            return entry
+        return None
+
+    def fetch(self, video_id: str, fallback_url: str = '') -> Optional[Dict]:
+        """Cached entry for a video: {'sha256', 'size', 'path', 'preview'}."""
+        entry = self.lookup(video_id)
+        if entry:
+            with self._lock:
+                self.stats['hits'] += 1
+            if not entry.get('preview'):
+                entry['preview'] = self._make_preview(entry['sha256'])
+            return entry
+
+        urls = [(size, THUMB_URL.format(video_id=video_id, size=size)) for size in THUMB_SIZES]
+        if fallback_url:
+            urls.append(('source', fallback_url))
+        for size, url in urls:
+            try:
+                r = self.session.get(url, timeout=self.timeout)
+            except requests.RequestException:
+                continue
+            if r.status_code != 200 or not r.content:
+                continue
+            digest = self._store(r.content)
+            entry = {
+                'sha256': digest, 'size': size,
+                'path': self._object_path(digest),
+                'preview': self._make_preview(digest, r.content),
+            }
+            with self._lock:
+                self.index[video_id] = entry
+                self.stats['downloads'] += 1
+                self.stats['bytes'] += len(r.content)
+            return entry
+        with self._lock:
+            self.stats['missing'] += 1
+        return None
+
+    def fetch_all(self, rows: List[Dict], progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Dict]:
+        """Fetch thumbnails for all rows concurrently; returns {video_id: entry} and fills `previews`."""
+        todo = [r for r in rows if r.get('video_id') and r['video_id'] != 'N/A']
+        done = 0
+        entries: Dict[str, Dict] = {}
+
+        def one(r: Dict):
+            entry = self.fetch(r['video_id'], r.get('thumbnail') or '')
+            if entry:
+                entries[r['video_id']] = entry
+            self.previews[r['video_id']] = entry.get('preview') if entry else None
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for _ in pool.map(one, todo):
+                done += 1
+                if progress:
+                    progress(done, len(todo))
+        self.save()
+        return entries
@@ -0,0 +1,179 @@
+"""
+YOUTUBE ANALYZER PRO - STAGE TIMING
+- Lightweight per-stage latency histograms, counts and error classes
+- Stages: extract_video_id, api, dislikes, ytdlp_metadata, ytdlp_download_url, sleep, reference, metrics, store,
+  dedup, video
+- Exports: JSON run summary, Prometheus text file, optional /metrics endpoint
+- Live p50/p95 readout string for log panes
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Union
+
+# Prometheus-style cumulative buckets (seconds)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SAMPLES = 2048  # recent samples kept per stage for percentiles
+
+
+class _Stage:
+    __slots__ = ('count', 'total', 'max', 'buckets', 'errors', 'samples')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.errors: Dict[str, int] = {}
+        self.samples = deque(maxlen=SAMPLES)
+
+
+class _Handle:
+    """Yielded by StageTimer.stage(); lets swallowed failures still be counted."""
+    __slots__ = ('error_class',)
+
+    def __init__(self):
+        self.error_class: Optional[str] = None
+
+    def error(self, err: Union[BaseException, str]):
+        if isinstance(err, str):
+            self.error_class = err
+        else:  # exceptions relayed from worker processes carry the original class name
+            self.error_class = getattr(err, 'error_class', None) or type(err).__name__
+
+
+class StageTimer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages: Dict[str, _Stage] = {}
+        self.started = time.time()
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+            self.started = time.time()
+
+    @contextmanager
+    def stage(self, name: str):
+        handle = _Handle()
+        t0 = time.perf_counter()
+        try:
+            yield handle
+        except BaseException as e:
+            handle.error(e)
+            raise
+        finally:
+            self.record(name, time.perf_counter() - t0, handle.error_class)
+
+    def record(self, name: str, seconds: float, error: Optional[str] = None):
+        i = 0
+        while i < len(BUCKETS) and seconds > BUCKETS[i]:
+            i += 1
+        with self._lock:
+            st = self.stages.get(name)
+            if st is None:
+                st = self.stages[name] = _Stage()
+            st.count += 1
+            st.total += seconds
+            st.max = max(st.max, seconds)
+            st.buckets[i] += 1
+            st.samples.append(seconds)
+            if error:
+                st.errors[error] = st.errors.get(error, 0) + 1
+
+    # ---------------- reporting ----------------
+
+    @staticmethod
+    def _pct(samples, q: float) -> float:
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self) -> Dict:
+        with self._lock:
+            stages = {}
+            for name, st in self.stages.items():
+                samples = list(st.samples)
+                stages[name] = {
+                    'count': st.count,
+                    'errors': dict(st.errors),
+                    'total_s': round(st.total, 4),
+                    'mean_ms': round(st.total / st.count * 1000, 2) if st.count else 0,
+                    'p50_ms': round(self._pct(samples, 0.50) * 1000, 2),
+                    'p95_ms': round(self._pct(samples, 0.95) * 1000, 2),
+                    'p99_ms': round(self._pct(samples, 0.99) * 1000, 2),
+                    'max_ms': round(st.max * 1000, 2),
+                    'histogram': {('+Inf' if i == len(BUCKETS) else str(BUCKETS[i])): c
+                                  for i, c in enumerate(st.buckets)},
+                }
+        return {
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            'wall_s': round(time.time() - self.started, 3),
+            'stages': stages,
+        }
+
+    def readout(self) -> str:
+        """One-line p50/p95 per stage, for the live log pane."""
+        s = self.summary()['stages']
+        return ' | '.join(f"{n} p50 {v['p50_ms']:.0f}ms p95 {v['p95_ms']:.0f}ms (n={v['count']}"
+                          + (f", err={sum(v['errors'].values())}" if v['errors'] else '') + ')'
+                          for n, v in s.items())
+
+    def prometheus_text(self) -> str:
+        lines = [
+            '# HELP ytanalyzer_stage_seconds Per-stage latency.',
+            '# TYPE ytanalyzer_stage_seconds histogram',
+        ]
+        errors = ['# HELP ytanalyzer_stage_errors_total Failures per stage and error class.',
+                  '# TYPE ytanalyzer_stage_errors_total counter']
+        with self._lock:
+            for name, st in sorted(self.stages.items()):
+                cumulative = 0
+                for i, c in enumerate(st.buckets):
+                    cumulative += c
+                    le = '+Inf' if i == len(BUCKETS) else repr(BUCKETS[i])
+                    lines.append(f'ytanalyzer_stage_seconds_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+                lines.append(f'ytanalyzer_stage_seconds_sum{{stage="{name}"}} {st.total:.6f}')
+                lines.append(f'ytanalyzer_stage_seconds_count{{stage="{name}"}} {st.count}')
+                for cls, n in sorted(st.errors.items()):
+                    errors.append(f'ytanalyzer_stage_errors_total{{stage="{name}",class="{cls}"}} {n}')
+        return '\n'.join(lines + errors) + '\n'
+
+    def write_json(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def write_prometheus(self, path: str):
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, path)
+
+
+def serve_metrics(get_timer: Callable[[], StageTimer], port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """Serve /metrics in Prometheus text format from a daemon thread."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip('/') not in ('/metrics', ''):
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = get_timer().prometheus_text().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,237 @@
+"""
+YOUTUBE ANALYZER PRO - TRANSCRIPTS
+- Subtitles and auto-captions through yt-dlp's subtitle support (no media download)
+- Videos fetched concurrently: extraction on the yt-dlp process pool, caption
+  files through the proxy pool (sticky per video)
+- The SQLite file doubles as the cache: one row per (video_id, language), also
+  for videos without captions, so nothing is fetched twice ("none" rows expire
+  after NONE_TTL, since auto-captions appear some hours after upload)
+- FTS5 full-text index over ~CHUNK_SECONDS windows of speech; every hit has a
+  timestamp and a youtu.be link that starts playback there
+- Incremental and resumable: each video commits on its own, a rerun only
+  fetches what is not in the store yet
+- The Data API only serves caption files to the video owner (OAuth), so this
+  stage always uses yt-dlp
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from youtube_analyzer_proxies import ProxyPool
+
+TRANSCRIPT_LANGS = ['en']     # exact yt-dlp language codes, in preference order
+WORKERS = 8                   # videos in flight (extraction itself is bounded by the yt-dlp pool)
+CHUNK_SECONDS = 20            # indexed window; phrase search works within a window
+NONE_TTL = 7 * 86400          # re-check videos that had no captions after this long
+SEARCH_LIMIT = 50
+SUB_FORMAT = 'json3/vtt/best'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    video_id  TEXT NOT NULL,
+    lang      TEXT NOT NULL,
+    kind      TEXT,                -- manual | auto
+    status    TEXT NOT NULL,       -- ok | none
+    chunks    INTEGER NOT NULL DEFAULT 0,
+    fetched   REAL NOT NULL,
+    PRIMARY KEY (video_id, lang)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5(
+    text, video_id UNINDEXED, lang UNINDEXED, start UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+VTT_TIME = re.compile(r'(?:(\d+):)?(\d+):(\d+)[.,](\d+)\s+-->')
+VTT_TAG = re.compile(r'<[^>]+>')
+FTS_SYNTAX = ('"', '*', ' OR ', ' AND ', ' NOT ', 'NEAR(')
+
+
+# ========================================
+#           CAPTION PARSING
+# ========================================
+def parse_json3(data: Dict) -> List[Tuple[float, str]]:
+    """YouTube json3 captions -> [(start_seconds, text)]."""
+    cues = []
+    for ev in data.get('events') or []:
+        text = ''.join(seg.get('utf8', '') for seg in ev.get('segs') or []).replace('\n', ' ').strip()
+        if text:
+            cues.append((ev.get('tStartMs', 0) / 1000, text))
+    return cues
+
+
+def parse_vtt(text: str) -> List[Tuple[float, str]]:
+    """WebVTT -> [(start_seconds, text)]; drops the rolling repeats of auto-captions."""
+    cues, last = [], None
+    for block in re.split(r'\n\s*\n', text.replace('\r', '')):
+        lines = block.strip().split('\n')
+        for i, line in enumerate(lines):
+            m = VTT_TIME.match(line)
+            if not m:
+                continue
+            h, mnt, sec, frac = m.groups()
+            start = int(h or 0) * 3600 + int(mnt) * 60 + int(sec) + int(frac) / 10 ** len(frac)
+            for cue_line in lines[i + 1:]:
+                cue_line = VTT_TAG.sub('', cue_line).strip()
+                if cue_line and cue_line != last:
+                    cues.append((start, cue_line))
+                    last = cue_line
+            break
+    return cues
+
+
+def chunk_cues(cues: List[Tuple[float, str]], seconds: float = CHUNK_SECONDS) -> List[Tuple[float, str]]:
+    """Merge consecutive cues into windows of about `seconds`, keyed by their first start."""
+    out, start, parts = [], None, []
+    for t, text in cues:
+        if start is not None and t - start >= seconds:
+            out.append((start, ' '.join(parts)))
+            start, parts = None, []
+        if start is None:
+            start = t
+        parts.append(text)
+    if parts:
+        out.append((start, ' '.join(parts)))
+    return out
+
+
+def timestamp(seconds: float) -> str:
+    s = int(seconds)
+    return f"{s // 3600:02d}:{(s % 3600) // 60:02d}:{s % 60:02d}"
+
+
+# ========================================
+#           TRANSCRIPT INDEX
+# ========================================
+class TranscriptIndex:
+    def __init__(self, path: str = "transcripts.db", pool=None, proxies: Optional[ProxyPool] = None,
+                 langs: Optional[List[str]] = None, workers: int = WORKERS):
+        """pool: a YtdlpPool (youtube_analyzer_ytdlp_pool.shared_pool()); needed for index() only."""
+        self.path = path
+        self.pool = pool
+        self.proxies = proxies or ProxyPool()
+        self.langs = langs or TRANSCRIPT_LANGS
+        self.workers = workers
+        self._local = threading.local()
+        self._db().executescript(SCHEMA)
+
+    def _db(self) -> sqlite3.Connection:
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')  # one commit per video; a lost tail is just refetched
+        return db
+
+    @contextmanager
+    def _tx(self):
+        db = self._db()
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            yield db
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+
+    # ---------------- indexing ----------------
+
+    def pending(self, video_ids: Iterable[str]) -> List[str]:
+        """Videos missing a current row for any wanted language."""
+        wanted = list(dict.fromkeys(v for v in video_ids if v and v != 'N/A'))
+        marks = ','.join('?' * len(self.langs))
+        done = {vid for (vid,) in self._db().execute(
+            f"SELECT video_id FROM transcripts WHERE lang IN ({marks}) AND (status = 'ok' OR fetched > ?) "
+            f"GROUP BY video_id HAVING COUNT(*) = ?", self.langs + [time.time() - NONE_TTL, len(self.langs)])}
+        return [v for v in wanted if v not in done]
+
+    def _ytdlp_opts(self, proxy_opts: Dict) -> Dict:
+        return {
+            'quiet': True, 'no_warnings': True, 'skip_download': True,
+            'writesubtitles': True, 'writeautomaticsub': True,
+            'subtitleslangs': self.langs, 'subtitlesformat': SUB_FORMAT,
+            'ignore_no_formats_error': True, 'socket_timeout': 30,
+            **proxy_opts,
+        }
+
+    def _fetch(self, video_id: str) -> List[Tuple[str, str, List[Tuple[float, str]]]]:
+        """[(lang, kind, chunks)] for the wanted languages this video has captions in."""
+        url = f"https://www.youtube.com/watch?v={video_id}"
+        info = self.proxies.call(lambda p: self.pool.extract(url, self._ytdlp_opts(p.ytdlp_opts), want='subtitles'),
+                                 key=url) or {}
+        tracks = []
+        for lang, sub in (info.get('requested_subtitles') or {}).items():
+            res = self.proxies.get(sub['url'], key=url, timeout=30)
+            res.raise_for_status()
+            cues = parse_json3(res.json()) if sub.get('ext') == 'json3' else parse_vtt(res.text)
+            kind = 'manual' if lang in info.get('manual', []) else 'auto'
+            tracks.append((lang, kind, chunk_cues(cues)))
+        return tracks
+
+    def _write(self, video_id: str, tracks: List[Tuple[str, str, List[Tuple[float, str]]]]):
+        now = time.time()
+        found = {lang for lang, _, _ in tracks}
+        with self._tx() as db:
+            indexed = {lang for (lang,) in db.execute(
+                "SELECT lang FROM transcripts WHERE video_id = ? AND status = 'ok'", (video_id,))}
+            for lang, kind, chunks in tracks:
+                if lang in indexed:
+                    continue  # refetched for another language; this one is already in the index
+                db.executemany("INSERT INTO chunks (text, video_id, lang, start) VALUES (?, ?, ?, ?)",
+                               ((text, video_id, lang, start) for start, text in chunks))
+                db.execute("INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, 'ok', ?, ?)",
+                           (video_id, lang, kind, len(chunks), now))
+            db.executemany("INSERT OR REPLACE INTO transcripts VALUES (?, ?, NULL, 'none', 0, ?)",
+                           ((video_id, lang, now) for lang in self.langs if lang not in found))
+
+    def index(self, video_ids: Iterable[str], progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+        """Fetch and index every pending video; failures are left pending for the next run."""
+        ids = list(dict.fromkeys(v for v in video_ids if v and v != 'N/A'))
+        todo = self.pending(ids)
+        stats = {'cached': len(ids) - len(todo), 'indexed': 0, 'none': 0, 'failed': 0, 'chunks': 0}
+        if not todo:
+            return stats
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='transcripts') as ex:
+            futures = {ex.submit(self._fetch, vid): vid for vid in todo}
+            for n, f in enumerate(as_completed(futures), 1):
+                try:
+                    tracks = f.result()
+                except Exception:
+                    stats['failed'] += 1
+                else:
+                    self._write(futures[f], tracks)  # committed per video: a killed run resumes here
+                    stats['indexed' if tracks else 'none'] += 1
+                    stats['chunks'] += sum(len(c) for _, _, c in tracks)
+                if progress:
+                    progress(n, len(todo))
+        return stats
+
+    # ---------------- search ----------------
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT, video_ids: Optional[List[str]] = None) -> List[Dict]:
+        """Best-ranked timestamped hits. Plain words must all appear; FTS5 syntax (\"phrase\", OR, NEAR, prefix*) passes through."""
+        match = query if any(op in query for op in FTS_SYNTAX) else ' '.join(
+            '"' + w.replace('"', '') + '"' for w in query.split())
+        sql = ("SELECT video_id, lang, start, snippet(chunks, 0, '[', ']', '...', 16) FROM chunks "
+               "WHERE chunks MATCH ?")
+        params: List = [match]
+        if video_ids:
+            sql += f" AND video_id IN ({','.join('?' * len(video_ids))})"
+            params += list(video_ids)
+        try:
+            cur = self._db().execute(sql + " ORDER BY rank LIMIT ?", params + [limit])
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Bad search: {e}")
+        return [{'video_id': vid, 'lang': lang, 'start': start, 'time': timestamp(start), 'snippet': snip,
+                 'url': f"https://youtu.be/{vid}?t={int(start)}"} for vid, lang, start, snip in cur]
+
+    def stats(self) -> Dict:
+        row = self._db().execute(
+            "SELECT COUNT(DISTINCT video_id), COALESCE(SUM(status = 'ok'), 0), COALESCE(SUM(chunks), 0) "
+            "FROM transcripts").fetchone()
+        return {'videos': row[0], 'tracks': row[1], 'chunks': row[2]}
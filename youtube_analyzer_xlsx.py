@@ -0,0 +1,148 @@
+"""
+YOUTUBE ANALYZER PRO - STREAMING EXCEL EXPORT
+- openpyxl write-only mode: each row is streamed to disk as it is appended
+- New numbered sheet (header repeated) at Excel's 1,048,576-row limit
+- Number formats: counts #,##0 | rates/scores 0.00 | durations [h]:mm:ss
+- Illegal control characters stripped, cells capped at Excel's 32,767 chars
+- Memory stays flat regardless of row count
+"""
+
+import json
+from typing import Dict, Iterable, List, Optional
+
+# Optional: Excel output
+try:
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+    from openpyxl.styles import Font
+    from openpyxl.utils import get_column_letter
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+
+MAX_ROWS = 1_048_576   # per sheet, header included
+MAX_CELL_CHARS = 32_767
+COUNT_COLUMNS = {'views', 'likes', 'dislikes', 'comments'}
+DECIMAL_COLUMNS = {'engagement_rate_%', 'like_dislike_ratio', 'views_per_day', 'performance_score'}
+DURATION_COLUMNS = {'duration'}
+COLUMN_WIDTHS = {'title': 50, 'description': 60, 'url': 45, 'download_url': 45, 'hashtags': 30}
+
+
+def export_columns(rows: List[Dict], wanted: Optional[List[str]] = None) -> List[str]:
+    """Column order for an export: `wanted` if given, else every key in order of first appearance."""
+    seen = dict.fromkeys(k for r in rows for k in r)
+    if wanted:
+        return [c for c in wanted if c in seen]
+    return list(seen)
+
+
+def _seconds(hms: str) -> Optional[int]:
+    parts = hms.split(':')
+    if not 2 <= len(parts) <= 3 or not all(p.isdigit() for p in parts):
+        return None
+    total = 0
+    for p in parts:
+        total = total * 60 + int(p)
+    return total
+
+
+class XlsxStreamWriter:
+    def __init__(self, path: str, columns: List[str], sheet_name: str = "Results", max_rows: int = MAX_ROWS):
+        if not OPENPYXL_AVAILABLE:
+            raise RuntimeError("Excel export needs: pip install openpyxl")
+        self.path = path
+        self.columns = columns
+        self.sheet_name = sheet_name
+        self.max_rows = max_rows
+        self.wb = Workbook(write_only=True)
+        self.ws = None
+        self.sheets = 0
+        self.sheet_rows = 0
+        self.rows = 0
+        self._bold = Font(bold=True)
+        # Per-column cell builders, resolved once
+        self._kinds = [
+            'count' if c in COUNT_COLUMNS else 'decimal' if c in DECIMAL_COLUMNS
+            else 'duration' if c in DURATION_COLUMNS else None
+            for c in columns
+        ]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.close()
+        return False
+
+    def _new_sheet(self):
+        self.sheets += 1
+        title = self.sheet_name if self.sheets == 1 else f"{self.sheet_name} {self.sheets}"
+        self.ws = self.wb.create_sheet(title)
+        for i, c in enumerate(self.columns):
+            if c in COLUMN_WIDTHS:
+                self.ws.column_dimensions[get_column_letter(i + 1)].width = COLUMN_WIDTHS[c]
+        header = []
+        for c in self.columns:
+            cell = WriteOnlyCell(self.ws, value=c)
+            cell.font = self._bold
+            header.append(cell)
+        self.ws.append(header)
+        self.sheet_rows = 1
+
+    def _cell(self, value, kind: Optional[str]):
+        if value is None:
+            return None
+        if isinstance(value, (list, tuple)):
+            value = ', '.join(str(v) for v in value)
+        elif isinstance(value, dict):
+            value = json.dumps(value, ensure_ascii=False)
+        if kind == 'duration' and isinstance(value, str):
+            secs = _seconds(value)
+            if secs is not None:
+                cell = WriteOnlyCell(self.ws, value=secs / 86400)
+                cell.number_format = '[h]:mm:ss'
+                return cell
+        elif kind in ('count', 'decimal') and isinstance(value, (int, float)) and not isinstance(value, bool):
+            cell = WriteOnlyCell(self.ws, value=value)
+            cell.number_format = '#,##0' if kind == 'count' else '0.00'
+            return cell
+        if isinstance(value, str):
+            value = ILLEGAL_CHARACTERS_RE.sub('', value)[:MAX_CELL_CHARS]
+        return value
+
+    def append(self, row: Dict):
+        if self.ws is None or self.sheet_rows >= self.max_rows:
+            self._new_sheet()
+        self.ws.append([self._cell(row.get(c), k) for c, k in zip(self.columns, self._kinds)])
+        self.sheet_rows += 1
+        self.rows += 1
+
+    def close(self):
+        if self.wb is None:
+            return
+        if self.ws is None:
+            self._new_sheet()  # header-only workbook rather than an invalid empty one
+        self.wb.save(self.path)
+        self.wb = None
+
+    def discard(self):
+        """Drop the workbook without saving; the sheets' temp files are removed now, not at exit."""
+        if self.wb is None:
+            return
+        for ws in self.wb.worksheets:
+            if not ws.closed:
+                ws.close()
+            if ws._writer is not None:
+                ws._writer.cleanup()
+        self.wb = None
+        self.ws = None
+
+
+def write_xlsx(path: str, rows: Iterable[Dict], columns: List[str], sheet_name: str = "Results") -> int:
+    """Stream rows into an .xlsx file; returns the number of data rows written."""
+    with XlsxStreamWriter(path, columns, sheet_name) as writer:
+        for row in rows:
+            writer.append(row)
+    return writer.rows
@@ -0,0 +1,230 @@
+"""
+YOUTUBE ANALYZER PRO - yt-dlp PROCESS POOL
+- yt-dlp extraction runs in worker processes (no GIL contention, scales across cores)
+- Hard wall-clock timeout per task: a stuck worker is killed and replaced
+- Workers are recycled after N tasks to cap memory growth
+- Only a compact dict (the fields the analyzers read) crosses the pipe
+- Same concurrent.futures-style initializer hook as ProcessPoolExecutor
+"""
+
+import multiprocessing as mp
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+TASK_TIMEOUT = 90            # seconds; well above yt-dlp's own socket_timeout
+MAX_TASKS_PER_WORKER = 200   # recycle to release leaked memory
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+METADATA_KEYS = (
+    'id', 'title', 'upload_date', 'duration', 'view_count', 'like_count', 'comment_count',
+    'description', 'uploader', 'channel_id', 'categories', 'category', 'thumbnail',
+)
+
+
+class TaskTimeout(Exception):
+    error_class = 'TaskTimeout'
+
+
+class WorkerCrashed(Exception):
+    error_class = 'WorkerCrashed'
+
+
+class TaskAborted(Exception):
+    """The task's run was cancelled; its worker was killed or it never started."""
+    error_class = 'Cancelled'
+
+
+class ExtractionFailed(Exception):
+    """yt-dlp raised inside a worker; error_class keeps the original exception name."""
+
+    def __init__(self, error_class: str, message: str):
+        super().__init__(message)
+        self.error_class = error_class
+
+
+def compact(info: Optional[Dict], want: str) -> Optional[Dict]:
+    if not info:
+        return None
+    if 'entries' in info:
+        return {'entries': True}  # playlist/channel: callers reject these
+    if want == 'url':
+        return {'url': info.get('url')}
+    if want == 'subtitles':
+        # Only the tracks selected by subtitleslangs/subtitlesformat, not every auto-translation
+        return {'id': info.get('id'), 'manual': sorted(info.get('subtitles') or {}),
+                'requested_subtitles': {lang: {'ext': sub.get('ext'), 'url': sub.get('url')}
+                                        for lang, sub in (info.get('requested_subtitles') or {}).items()}}
+    return {k: info[k] for k in METADATA_KEYS if k in info}
+
+
+def _worker_main(conn, initializer: Optional[Callable], initargs: Tuple):
+    if initializer:
+        initializer(*initargs)
+    import yt_dlp
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            return
+        if task is None:
+            return
+        url, opts, want = task
+        try:
+            with yt_dlp.YoutubeDL(opts) as ydl:
+                info = ydl.extract_info(url, download=False)
+            conn.send(('ok', compact(info, want)))
+        except Exception as e:
+            conn.send(('err', (type(e).__name__, str(e)[:500])))
+
+
+class _Worker:
+    def __init__(self, ctx, initializer, initargs):
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=_worker_main, args=(child, initializer, initargs), daemon=True)
+        self.proc.start()
+        child.close()
+        self.tasks = 0
+        self.token = None  # run that owns the task in flight
+
+    def retire(self):
+        try:
+            self.conn.send(None)
+        except (OSError, BrokenPipeError):
+            pass
+        self.proc.join(5)
+        if self.proc.is_alive():
+            self.proc.kill()
+            self.proc.join()
+        self.conn.close()
+
+    def kill(self):
+        self.proc.kill()
+        self.proc.join()
+        self.conn.close()
+
+
+class YtdlpPool:
+    def __init__(self, workers: int = DEFAULT_WORKERS, task_timeout: float = TASK_TIMEOUT,
+                 max_tasks: int = MAX_TASKS_PER_WORKER, initializer: Optional[Callable] = None,
+                 initargs: Tuple = ()):
+        self.workers = workers
+        self.task_timeout = task_timeout
+        self.max_tasks = max_tasks
+        self._initializer = initializer
+        self._initargs = initargs
+        # spawn: forking a process that runs Tk and HTTP threads is not safe
+        self._ctx = mp.get_context('spawn')
+        # One dispatch thread per worker process; each thread owns its worker
+        self._dispatch = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ytdlp-pool')
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._live = set()
+        self.stats = {'tasks': 0, 'timeouts': 0, 'crashes': 0, 'recycled': 0, 'spawned': 0, 'aborted': 0}
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _worker(self) -> _Worker:
+        w = getattr(self._local, 'worker', None)
+        if w is None:
+            w = self._local.worker = _Worker(self._ctx, self._initializer, self._initargs)
+            with self._lock:
+                self._live.add(w)
+            self._count('spawned')
+        return w
+
+    def _drop(self, w: _Worker, kill: bool):
+        self._local.worker = None
+        with self._lock:
+            self._live.discard(w)
+        w.kill() if kill else w.retire()
+
+    def _run(self, url: str, opts: Dict, want: str, token=None) -> Optional[Dict]:
+        w = self._worker()
+        with self._lock:
+            w.token = token
+        # Checked after publishing the token, so a concurrent abort() either sees it or we see the cancel
+        if token is not None and token.cancelled:
+            w.token = None
+            raise TaskAborted(f"cancelled before start: {url}")
+        try:
+            w.conn.send((url, opts, want))
+            if not w.conn.poll(self.task_timeout):
+                self._count('timeouts')
+                self._drop(w, kill=True)
+                raise TaskTimeout(f"yt-dlp exceeded {self.task_timeout:.0f}s: {url}")
+            status, payload = w.conn.recv()
+        except (EOFError, OSError) as e:
+            self._drop(w, kill=True)
+            if token is not None and token.cancelled:
+                self._count('aborted')
+                raise TaskAborted(f"cancelled: {url}")
+            self._count('crashes')
+            raise WorkerCrashed(f"yt-dlp worker died ({e.__class__.__name__}): {url}")
+        finally:
+            w.token = None
+        self._count('tasks')
+        w.tasks += 1
+        if w.tasks >= self.max_tasks:
+            self._count('recycled')
+            self._drop(w, kill=False)
+        if status == 'ok':
+            return payload
+        raise ExtractionFailed(*payload)
+
+    def submit(self, url: str, opts: Dict, want: str = 'metadata', token=None) -> Future:
+        """want: 'metadata' (compact info dict), 'url' ({'url': ...}) or 'subtitles' (selected caption tracks).
+
+        token: any object with a `cancelled` attribute (e.g. a RunControl); see abort().
+        """
+        return self._dispatch.submit(self._run, url, opts, want, token)
+
+    def extract(self, url: str, opts: Dict, want: str = 'metadata', token=None) -> Optional[Dict]:
+        return self.submit(url, opts, want, token).result()
+
+    def abort(self, token):
+        """Kill the workers running `token`'s tasks; its queued tasks fail without starting."""
+        with self._lock:
+            busy = [w for w in self._live if w.token is token]
+        for w in busy:
+            w.proc.kill()  # the dispatch thread sees EOF and cleans up
+
+    def prefetch(self, urls: Iterable[str], opts: Dict, want: str = 'metadata', window: Optional[int] = None,
+                 submit: Optional[Callable[[str], Future]] = None) -> Iterator[Future]:
+        """Futures in input order, keeping `window` tasks in flight ahead of the consumer.
+
+        submit(url) replaces the plain submit, e.g. to route each task through a proxy.
+        """
+        window = window or 2 * self.workers
+        submit = submit or (lambda url: self.submit(url, opts, want))
+        pending = deque()
+        for url in urls:
+            pending.append(submit(url))
+            if len(pending) >= window:
+                yield pending.popleft()
+        while pending:
+            yield pending.popleft()
+
+    def shutdown(self):
+        self._dispatch.shutdown(wait=True)
+        with self._lock:
+            live, self._live = list(self._live), set()
+        for w in live:
+            w.retire()
+
+
+_shared: Optional[YtdlpPool] = None
+_shared_lock = threading.Lock()
+
+
+def shared_pool() -> YtdlpPool:
+    """Process-wide pool; workers start on first use."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = YtdlpPool()
+        return _shared